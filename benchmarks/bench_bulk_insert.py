@@ -0,0 +1,87 @@
+"""Measure table insert throughput of chunked, concurrent bulk_insert against a sequential insert_many loop.
+
+Starts a local HTTP stand-in for the Poly tables API that takes a fixed
+latency plus a per-row cost to "write" each chunk. The baseline inserts
+1000-row chunks one after the other, like a hand-written loop over
+insert_many. bulk_write then sends the same rows streamed from a
+generator with increasing max_in_flight.
+
+    python benchmarks/bench_bulk_insert.py --rows 20000 --latency 0.03 --per-row 0.00002
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from polyapi import poly_tables  # noqa: E402
+from polyapi.poly_tables import bulk_write, execute_query  # noqa: E402
+
+
+def start_server(latency: float, per_row: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            rows = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["data"]
+            time.sleep(latency + len(rows) * per_row)
+            body = json.dumps({"results": [{"id": str(i)} for i in range(len(rows))], "pagination": None}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def table_rows(n: int):
+    for i in range(n):
+        yield {"name": f"Customer {i}", "email": f"customer{i}@example.com", "balance": round(i * 12.34, 2), "active": i % 3 != 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per request")
+    parser.add_argument("--per-row", type=float, default=0.00002, help="seconds per row written")
+    args = parser.parse_args()
+
+    server = start_server(args.latency, args.per_row)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    # point the tables api at the stand-in, no generated client (or client_id) needed
+    poly_tables._query_request = lambda table_id, method: (f"{base_url}/tables/{table_id}/{method}", {})
+
+    start = time.perf_counter()
+    rows = list(table_rows(args.rows))
+    for i in range(0, len(rows), 1000):
+        assert "results" in execute_query("bench", "insert", {"data": rows[i:i + 1000]})
+    elapsed = time.perf_counter() - start
+    print(f"{'strategy':26} {'seconds':>8} {'rows/s':>9}")
+    print(f"{'insert_many loop':26} {elapsed:8.2f} {args.rows / elapsed:9.0f}")
+
+    for max_in_flight in (1, 4, 8, 16):
+        start = time.perf_counter()
+        result = bulk_write("bench", "insert", table_rows(args.rows), chunk_size=1000, max_in_flight=max_in_flight)
+        elapsed = time.perf_counter() - start
+        assert result.ok and result.rows == args.rows, result
+        print(f"{f'bulk_insert in_flight={max_in_flight}':26} {elapsed:8.2f} {args.rows / elapsed:9.0f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
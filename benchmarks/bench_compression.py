@@ -0,0 +1,137 @@
+"""Compare bytes on the wire and latency of 1k-row table inserts with and without request compression.
+
+Starts a local HTTP stand-in for the Poly tables API that reads request
+bodies at a fixed bandwidth, adds a round-trip delay and decompresses
+what it receives. Each insert is posted the same way
+poly_tables.execute_query does, once per http_request_compression setting.
+zstd is skipped unless zstandard is installed.
+
+    pip install zstandard
+    python benchmarks/bench_compression.py --rows 1000 --mbit 20 --rtt 0.02
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from polyapi import http_client  # noqa: E402
+
+
+def decompress(body: bytes, encoding: str | None) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "zstd":
+        import zstandard  # type: ignore
+
+        return zstandard.ZstdDecompressor().decompress(body)
+    return body
+
+
+def start_server(bytes_per_second: float, rtt: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = -1
+
+        def do_POST(self):
+            remaining = int(self.headers.get("Content-Length", 0))
+            chunks = []
+            while remaining:
+                chunk = self.rfile.read(min(remaining, 16384))
+                remaining -= len(chunk)
+                chunks.append(chunk)
+                # emulate a slow uplink
+                time.sleep(len(chunk) / bytes_per_second)
+            rows = json.loads(decompress(b"".join(chunks), self.headers.get("Content-Encoding")))["data"]
+            time.sleep(rtt)
+            body = json.dumps({"inserted": len(rows)}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def table_rows(n: int):
+    return [
+        {
+            "id": f"8c1b7a9e-{i:04d}-4c7e-9a51-2f1d3c4b5a6{i % 10}",
+            "name": f"Customer {i}",
+            "email": f"customer{i}@example.com",
+            "balance": round(i * 12.34, 2),
+            "active": i % 3 != 0,
+            "address": {"city": "Springfield", "zip": f"{10000 + i}", "country": "US"},
+        }
+        for i in range(n)
+    ]
+
+
+def run(url: str, query: dict, inserts: int):
+    sent = []
+
+    def record(request: httpx.Request):
+        sent.append(len(request.content))
+
+    http_client.configure()
+    # count the body actually sent, after compression
+    http_client._get_sync_client().event_hooks["request"].append(record)
+    latencies = []
+    for _ in range(inserts):
+        start = time.perf_counter()
+        resp = http_client.post(url, json=query, headers={"Authorization": "Bearer bench-key"})
+        latencies.append(time.perf_counter() - start)
+        assert resp.json() == {"inserted": len(query["data"])}, resp.text
+    return statistics.mean(sent), statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--inserts", type=int, default=10)
+    parser.add_argument("--mbit", type=float, default=20, help="emulated uplink bandwidth in Mbit/s")
+    parser.add_argument("--rtt", type=float, default=0.02, help="emulated round trip time in seconds")
+    args = parser.parse_args()
+
+    server = start_server(args.mbit * 1e6 / 8, args.rtt)
+    url = f"http://127.0.0.1:{server.server_address[1]}/tables/bench/insert"
+    query = {"data": table_rows(args.rows)}
+
+    algorithms = ["none", "gzip"]
+    try:
+        import zstandard  # type: ignore # noqa: F401
+
+        algorithms.append("zstd")
+    except ImportError:
+        print("zstandard not installed, skipping zstd")
+
+    print(f"{args.inserts} inserts of {args.rows} rows, {args.mbit:g} Mbit/s uplink, {args.rtt * 1000:.0f}ms rtt")
+    print(f"{'compression':12} {'body bytes':>11} {'median ms':>10}")
+    for algorithm in algorithms:
+        os.environ["POLY_HTTP_REQUEST_COMPRESSION"] = algorithm
+        os.environ["POLY_HTTP_REQUEST_COMPRESSION_MIN_BYTES"] = "1024"
+        size, latency = run(url, query, args.inserts)
+        print(f"{algorithm:12} {size:11.0f} {latency * 1000:10.1f}")
+    http_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure the client-side cost of preparing an execute() call.
+
+Times the per-call setup (api key and url lookup, auth headers, url)
+the old way, re-running get_api_key_and_url() and rebuilding both on
+every call, against the cached ExecutionContext. Then times whole
+execute() calls against an in-memory transport to put the difference
+in proportion. Both the environment variable and the config file setups
+are measured.
+
+    python benchmarks/bench_execute_overhead.py --calls 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from polyapi import config, http_client  # noqa: E402
+from polyapi.config import get_api_key_and_url, get_execution_context  # noqa: E402
+from polyapi.execute import execute  # noqa: E402
+
+
+def prepare_before(function_id: str):
+    api_key, api_url = get_api_key_and_url()
+    headers = {"Authorization": f"Bearer {api_key}"}
+    url = f"{api_url}/functions/server/{function_id}/execute"
+    return url, headers
+
+
+def prepare_after(function_id: str):
+    context = get_execution_context()
+    return context.function_url("server", function_id), context.headers
+
+
+def per_call(fn, calls: int) -> float:
+    ids = [f"fn-{i % 50}" for i in range(calls)]
+    start = time.perf_counter()
+    for function_id in ids:
+        fn(function_id)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    http_client.configure(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True})))
+    print(f"{'setup':12} {'before ns':>10} {'after ns':>10} {'execute() us':>13}")
+    for setup in ("env vars", "config file"):
+        if setup == "env vars":
+            os.environ["POLY_API_KEY"] = "bench-key"
+            os.environ["POLY_API_BASE_URL"] = "https://na1.polyapi.io"
+        else:
+            os.environ.pop("POLY_API_KEY", None)
+            os.environ.pop("POLY_API_BASE_URL", None)
+            # what get_api_key_and_url caches after its first read of .config.env
+            config.API_KEY, config.API_URL = "bench-key", "https://na1.polyapi.io"
+        config.reset_execution_context()
+
+        before = per_call(prepare_before, args.calls)
+        after = per_call(prepare_after, args.calls)
+        full = per_call(lambda function_id: execute("server", function_id, {"a": 1}), args.calls // 100) / 1000
+        print(f"{setup:12} {before:10.0f} {after:10.0f} {full:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Compare HTTP/1.1 pooling against HTTP/2 multiplexing for execute_async().
+
+Starts a local TLS stand-in for the Poly API and fires concurrent
+execute_async() calls through the shared async client, once per protocol.
+HTTP/2 is served by hypercorn on --port. HTTP/1.1 is served on --port + 1 by a
+small keep-alive h11 server, since hypercorn's HTTP/1.1 path is too slow to
+be a fair baseline.
+
+    pip install -r dev_requirements.txt -e '.[http2]'
+    python benchmarks/bench_http2.py --requests 1000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import ssl
+import sys
+import subprocess
+import tempfile
+import time
+
+import h11
+import trustme
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from polyapi import config, http_client  # noqa: E402
+from polyapi.execute import execute_async  # noqa: E402
+
+
+def make_app(latency: float):
+    connections = set()
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["path"] == "/connections":
+            body = str(len(connections)).encode()
+            connections.clear()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": body})
+            return
+        connections.add(tuple(scope["client"]))
+        more_body = True
+        while more_body:
+            message = await receive()
+            more_body = message.get("more_body", False)
+        await asyncio.sleep(latency)
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"ok": true}'})
+
+    return app
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+async def serve_http1(app, port: int, cert_path: str) -> None:
+    """ serve the ASGI app over HTTP/1.1 with keep-alive, one h11 connection per socket """
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_context.load_cert_chain(cert_path)
+    ssl_context.set_alpn_protocols(["http/1.1"])
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = h11.Connection(h11.SERVER)
+        client = writer.get_extra_info("peername")[:2]
+        try:
+            while True:
+                event = conn.next_event()
+                if event is h11.NEED_DATA:
+                    conn.receive_data(await reader.read(65536))
+                elif isinstance(event, h11.Request):
+                    path = event.target.decode()
+                elif isinstance(event, h11.EndOfMessage):
+                    response = {}
+
+                    async def receive():
+                        return {"type": "http.request", "body": b"", "more_body": False}
+
+                    async def send(message):
+                        response.update(message)
+
+                    await app({"type": "http", "path": path, "client": client}, receive, send)
+                    body = response["body"]
+                    headers = response["headers"] + [(b"content-length", str(len(body)).encode())]
+                    writer.write(conn.send(h11.Response(status_code=response["status"], headers=headers)))
+                    writer.write(conn.send(h11.Data(data=body)))
+                    writer.write(conn.send(h11.EndOfMessage()))
+                    await writer.drain()
+                    if conn.our_state is not h11.DONE or conn.their_state is not h11.DONE:
+                        break
+                    conn.start_next_cycle()
+                elif isinstance(event, h11.ConnectionClosed) or event is h11.PAUSED:
+                    break
+        except (ConnectionError, h11.RemoteProtocolError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port, ssl=ssl_context, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+
+def serve_forever(port: int, latency: float, cert_path: str) -> None:
+    hypercorn_config = Config()
+    hypercorn_config.bind = [f"127.0.0.1:{port}"]
+    hypercorn_config.certfile = cert_path
+    hypercorn_config.keyfile = cert_path
+    hypercorn_config.alpn_protocols = ["h2"]
+    hypercorn_config.h2_max_concurrent_streams = 1000
+    hypercorn_config.keep_alive_max_requests = 10**9
+    hypercorn_config.loglevel = "WARNING"
+
+    async def both():
+        app = make_app(latency)
+        # a trigger that never fires keeps hypercorn from taking over SIGTERM, so terminate() stops us
+        forever = asyncio.Event()
+        await asyncio.gather(
+            serve(app, hypercorn_config, shutdown_trigger=forever.wait),  # type: ignore[arg-type]
+            serve_http1(app, port + 1, cert_path),
+        )
+
+    asyncio.run(both())
+
+
+def start_server(port: int, latency: float, tmpdir: str) -> subprocess.Popen:
+    """ run the stand-in server in its own process so it doesn't compete for our GIL """
+    ca = trustme.CA()
+    cert = ca.issue_cert("127.0.0.1", "localhost")
+    cert_path = os.path.join(tmpdir, "server.pem")
+    cert.private_key_and_cert_chain_pem.write_to_path(cert_path)
+    ca.cert_pem.write_to_path(os.path.join(tmpdir, "ca.pem"))
+
+    server = subprocess.Popen([
+        sys.executable, __file__, "--serve", cert_path, "--port", str(port), "--latency", str(latency),
+    ])
+    wait_for_port(port)
+    wait_for_port(port + 1)
+    return server
+
+
+async def run(total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            resp = await execute_async("server", f"fn-{i % 10}", {"i": i})
+            assert resp.status_code == 200, resp.text
+
+    # warm up so the handshake isn't counted
+    await one(0)
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    elapsed = time.perf_counter() - start
+    await http_client.close_async()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.01, help="server side delay per request in seconds")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--serve", metavar="CERT_PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_forever(args.port, args.latency, args.serve)
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = start_server(args.port, args.latency, tmpdir)
+        os.environ["SSL_CERT_FILE"] = os.path.join(tmpdir, "ca.pem")
+        os.environ["POLY_API_KEY"] = "bench-key"
+        # opening --concurrency TLS connections at once can take a while when client and server share a CPU
+        os.environ["POLY_HTTP_CONNECT_TIMEOUT"] = "60"
+
+        try:
+            print(f"{args.requests} requests, {args.concurrency} in flight, {args.latency * 1000:.0f}ms server latency")
+            modes = (
+                ("HTTP/1.1 default pool", "false", "20", args.port + 1),
+                ("HTTP/1.1 tuned pool", "false", str(args.concurrency), args.port + 1),
+                ("HTTP/2", "true", "20", args.port),
+            )
+            for label, http2, keepalive, port in modes:
+                base_url = f"https://127.0.0.1:{port}"
+                os.environ["POLY_API_BASE_URL"] = base_url
+                config.reset_execution_context()
+                os.environ["POLY_HTTP2"] = http2
+                os.environ["POLY_HTTP_MAX_CONNECTIONS"] = str(max(args.concurrency, 100))
+                os.environ["POLY_HTTP_MAX_KEEPALIVE_CONNECTIONS"] = keepalive
+                http_client.configure()
+                http_client.get(f"{base_url}/connections")
+                elapsed = asyncio.run(run(args.requests, args.concurrency))
+                sockets = http_client.get(f"{base_url}/connections").text
+                print(f"{label:22} {args.requests / elapsed:9.0f} req/s  {elapsed:6.2f}s  {sockets:>5} connections")
+        finally:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
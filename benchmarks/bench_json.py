@@ -0,0 +1,99 @@
+"""Compare JSON encode/decode throughput of the codecs polyapi.codec can use.
+
+Payloads mimic what flows through the client: a page of table rows,
+a nested API function response and a text-heavy document. Codecs that
+aren't installed are skipped.
+
+    pip install orjson msgspec
+    python benchmarks/bench_json.py --rows 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from polyapi import codec  # noqa: E402
+
+
+def table_rows(n: int):
+    return {
+        "results": [
+            {
+                "id": f"8c1b7a9e-{i:04d}-4c7e-9a51-2f1d3c4b5a6{i % 10}",
+                "name": f"Customer {i}",
+                "email": f"customer{i}@example.com",
+                "balance": i * 12.34,
+                "active": i % 3 != 0,
+                "visits": i * 7,
+                "tags": ["vip", "newsletter"] if i % 5 == 0 else [],
+                "address": {"city": "Springfield", "zip": f"{10000 + i}", "country": "US"},
+                "deletedAt": None,
+            }
+            for i in range(n)
+        ],
+        "pagination": {"nextPageToken": "abc123", "count": n},
+    }
+
+
+def api_payload(n: int):
+    return {
+        "status": 200,
+        "headers": {"content-type": "application/json", "x-request-id": "req-1"},
+        "data": {
+            "orders": [
+                {
+                    "orderId": i,
+                    "lines": [{"sku": f"SKU-{j}", "qty": j + 1, "price": 9.99 * (j + 1)} for j in range(5)],
+                    "meta": {"source": "web", "coupon": None, "flags": {"gift": i % 2 == 0, "rush": False}},
+                }
+                for i in range(n // 5)
+            ]
+        },
+    }
+
+
+def text_heavy(n: int):
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. " * 10
+    return {"documents": [{"id": i, "title": f"Doc {i} — ünïcödé", "body": paragraph} for i in range(n // 10)]}
+
+
+def throughput(fn, arg, size: int, min_time: float) -> float:
+    loops, elapsed = 0, 0.0
+    start = time.perf_counter()
+    while elapsed < min_time:
+        fn(arg)
+        loops += 1
+        elapsed = time.perf_counter() - start
+    return size * loops / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to run each measurement")
+    args = parser.parse_args()
+
+    codecs = []
+    for name in ("stdlib", "orjson", "msgspec"):
+        try:
+            codec.set_codec(name)
+            codecs.append(codec.get_codec())
+        except ImportError:
+            print(f"{name} not installed, skipping")
+
+    payloads = {"table rows": table_rows(args.rows), "api payload": api_payload(args.rows), "text heavy": text_heavy(args.rows)}
+    print(f"{'payload':12} {'size':>9}  {'codec':8} {'encode MB/s':>12} {'decode MB/s':>12}")
+    for label, payload in payloads.items():
+        encoded = codec.STDLIB.dumps(payload)
+        size = len(encoded)
+        for c in codecs:
+            enc = throughput(c.dumps, payload, size, args.min_time)
+            dec = throughput(c.loads, encoded, size, args.min_time)
+            print(f"{label:12} {size / 1e6:7.2f}MB  {c.name:8} {enc:12.0f} {dec:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure how sync execute() throughput scales with worker threads.
+
+Starts a local HTTP stand-in for the Poly API with a fixed per-request
+latency and calls execute() from a ThreadPoolExecutor, once per
+http_client_strategy and thread count. With a latency-bound server,
+throughput should grow roughly linearly with threads.
+
+    python benchmarks/bench_threads.py --threads 1 8 64 --calls 2000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from polyapi import http_client  # noqa: E402
+from polyapi.execute import execute  # noqa: E402
+
+
+def start_server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # send headers and body in one write, avoiding Nagle / delayed-ACK stalls
+        wbufsize = -1
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(threads: int, calls: int) -> float:
+    def one(i: int):
+        resp = execute("server", f"fn-{i % 10}", {"i": i})
+        assert resp.status_code == 200, resp.text
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        # warm up every worker so connection setup isn't counted
+        list(pool.map(one, range(threads)))
+        start = time.perf_counter()
+        list(pool.map(one, range(calls)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005, help="server side delay per request in seconds")
+    args = parser.parse_args()
+
+    server = start_server(args.latency)
+    os.environ["POLY_API_KEY"] = "bench-key"
+    os.environ["POLY_API_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["POLY_HTTP_MAX_KEEPALIVE_CONNECTIONS"] = str(max(args.threads))
+
+    print(f"{args.calls} calls, {args.latency * 1000:.0f}ms server latency")
+    for strategy in ("shared", "thread_local"):
+        os.environ["POLY_HTTP_CLIENT_STRATEGY"] = strategy
+        for threads in args.threads:
+            http_client.configure()
+            elapsed = run(threads, args.calls)
+            print(f"{strategy:13} {threads:3} threads {args.calls / elapsed:9.0f} calls/s  {elapsed:6.2f}s")
+    http_client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import copy
+import logging
 import os
 import sys
 from contextvars import ContextVar, Token
@@ -9,10 +10,11 @@ import truststore
 from typing_extensions import TypedDict
 
 from .cli_constants import CLI_COMMANDS
+from .deadlines import deadline
 
 truststore.inject_into_ssl()
 
-__all__ = ["poly"]
+__all__ = ["poly", "deadline", "warmup", "warmup_async"]
 
 
 if len(sys.argv) > 1 and sys.argv[1] not in CLI_COMMANDS:
@@ -161,3 +163,45 @@ class PolyCustom:
 _PolyCustom = PolyCustom
 
 polyCustom: PolyCustom = PolyCustom()
+
+
+def warmup(connections: int = 1, timeout: float = 10.0) -> int:
+    """Open pooled connections to the Poly instance before the first call, see polyapi.http_client.warmup."""
+    from .http_client import warmup as _warmup
+
+    return _warmup(connections, timeout)
+
+
+async def warmup_async(connections: int = 1, timeout: float = 10.0) -> int:
+    """Async twin of warmup, warms the client of the running event loop."""
+    from .http_client import warmup_async as _warmup_async
+
+    return await _warmup_async(connections, timeout)
+
+
+def _warmup_on_import_requested() -> bool:
+    # cheap check so importing polyapi stays fast when the option isn't used
+    if "POLY_WARMUP_ON_IMPORT" in os.environ:
+        return True
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".config.env")) as f:
+            return "warmup_on_import" in f.read()
+    except OSError:
+        return False
+
+
+def _warmup_on_import() -> None:
+    from .config import get_warmup_config
+    from .http_client import warmup_in_background
+
+    connections = get_warmup_config()
+    if connections:
+        warmup_in_background(connections)
+
+
+if not (len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS) and _warmup_on_import_requested():
+    try:
+        _warmup_on_import()
+    except Exception as e:
+        # never fail an import over an optimization
+        logging.getLogger("poly").debug(f"warmup on import failed: {e}")
@@ -28,11 +28,11 @@ def {function_name}(
         return {api_response_type}({{
             "status": resp.status_code,
             "headers": dict(resp.headers),
-            "data": resp.json()
+            "data": decode_response(resp)
         }})  # type: ignore
     else:
         resp = execute("{function_type}", "{function_id}", {data})
-        return {api_response_type}(resp.json())  # type: ignore
+        return {api_response_type}(decode_response(resp))  # type: ignore
 
 
 async def {function_name}_async(
@@ -47,11 +47,108 @@ async def {function_name}_async(
         return {api_response_type}({{
             "status": resp.status_code,
             "headers": dict(resp.headers),
-            "data": resp.json()
+            "data": decode_response(resp)
         }})  # type: ignore
     else:
         resp = await execute_async("{function_type}", "{function_id}", {data})
-        return {api_response_type}(resp.json())  # type: ignore
+        return {api_response_type}(decode_response(resp))  # type: ignore
+
+
+def {function_name}_batch(
+    calls: List[Dict[str, Any]],
+    max_in_flight: int = 10,
+) -> List[{api_response_type}]:
+    \"""Call {function_name} once per dict of keyword arguments in calls,
+    running at most max_in_flight at a time. Results keep the order of calls.
+    Unknown or missing required arguments raise TypeError before anything is sent.
+
+    Function ID: {function_id}
+    \"""
+    direct = get_direct_execute_config()
+    resps = execute_many([("{function_type}", "{function_id}", {batch_data}) for call in bind_batch_calls({function_name}, calls)], max_in_flight, direct)
+    if direct:
+        return [{api_response_type}({{
+            "status": resp.status_code,
+            "headers": dict(resp.headers),
+            "data": decode_response(resp)
+        }}) for resp in resps]  # type: ignore
+    return [{api_response_type}(decode_response(resp)) for resp in resps]  # type: ignore
+
+
+async def {function_name}_batch_async(
+    calls: List[Dict[str, Any]],
+    max_in_flight: int = 10,
+) -> List[{api_response_type}]:
+    \"""Call {function_name} once per dict of keyword arguments in calls,
+    running at most max_in_flight at a time. Results keep the order of calls.
+    Unknown or missing required arguments raise TypeError before anything is sent.
+
+    Function ID: {function_id}
+    \"""
+    direct = get_direct_execute_config()
+    resps = await execute_many_async([("{function_type}", "{function_id}", {batch_data}) for call in bind_batch_calls({function_name}, calls)], max_in_flight, direct)
+    if direct:
+        return [{api_response_type}({{
+            "status": resp.status_code,
+            "headers": dict(resp.headers),
+            "data": decode_response(resp)
+        }}) for resp in resps]  # type: ignore
+    return [{api_response_type}(decode_response(resp)) for resp in resps]  # type: ignore
+
+
+def {function_name}_stream(
+{args}
+) -> ResponseStream:
+    \"""Like {function_name}, but streams the response instead of buffering it.
+    With direct execute the stream is the API's own response body, otherwise it is
+    the {{"status", "headers", "data"}} envelope, so use stream.iter_items("data") for array results.
+
+    Function ID: {function_id}
+    \"""
+    if get_direct_execute_config():
+        return direct_execute_stream("{function_type}", "{function_id}", {data})
+    return execute_stream("{function_type}", "{function_id}", {data})
+
+
+def {function_name}_stream_async(
+{args}
+) -> AsyncResponseStream:
+    \"""Like {function_name}_stream, use with 'async with'.
+
+    Function ID: {function_id}
+    \"""
+    if get_direct_execute_config():
+        return direct_execute_stream_async("{function_type}", "{function_id}", {data})
+    return execute_stream_async("{function_type}", "{function_id}", {data})
+
+
+def {function_name}_download(
+    destination: DownloadTarget,
+{args}
+) -> int:
+    \"""Like {function_name}_stream, but writes the response body to destination (a file path
+    or binary file object) as it arrives and returns the number of bytes written.
+    Use {function_name}_stream(...).readinto(buffer) to fill a preallocated buffer instead.
+
+    Function ID: {function_id}
+    \"""
+    return {function_name}_stream({call_args}).download(destination)
+
+
+async def {function_name}_download_async(
+    destination: DownloadTarget,
+{args}
+) -> int:
+    \"""Like {function_name}_download, but async.
+
+    Function ID: {function_id}
+    \"""
+    return await {function_name}_stream_async({call_args}).download(destination)
+
+
+# lets polyapi.execute.enable_result_cache({function_name}) find the function
+{function_name}.function_id = "{function_id}"  # type: ignore[attr-defined]
+{function_name}_async.function_id = "{function_id}"  # type: ignore[attr-defined]
 
 
 """
@@ -71,6 +168,8 @@ def render_api_function(
     return_type_name, return_type_def = get_type_and_def(return_type)  # type: ignore
 
     data = "{" + ", ".join([f"'{arg}': {rewrite_arg_name(arg)}" for arg in arg_names]) + "}"
+    batch_data = "{" + ", ".join([f"'{arg}': call['{rewrite_arg_name(arg)}']" for arg in arg_names]) + "}"
+    call_args = ", ".join(rewrite_arg_name(arg) for arg in arg_names)
 
     api_response_type = f"{function_name}Response"
     func_type_defs = API_DEFS_TEMPLATE.format(
@@ -86,6 +185,8 @@ def render_api_function(
         function_description=function_description.replace('"', "'"),
         args=args,
         data=data,
+        batch_data=batch_data,
+        call_args=call_args,
         api_response_type=add_type_import_path(function_name, api_response_type),
     )
     return func_str, func_type_defs
\ No newline at end of file
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+def canonical_key(*parts: Any) -> str:
+    """ stable hash of json-like values, dict key order doesn't matter
+    """
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """ small thread-safe cache whose entries expire ttl seconds after being set
+
+    Once max_entries is reached the oldest entry is evicted.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            while len(self._data) >= self.max_entries:
+                del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LRUCache:
+    """ thread-safe LRU cache with per-entry ttl, bounded by entry count and total size in bytes
+
+    Sizes are supplied by the caller on set(). Values bigger than max_bytes are not stored.
+    """
+
+    STAT_NAMES = ("hits", "misses", "sets", "evictions", "expirations")
+
+    def __init__(self, max_entries: int | None = 1024, max_bytes: int | None = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = dict.fromkeys(self.STAT_NAMES, 0)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            expires_at, _, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: int = 0) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            while self._data and (
+                (self.max_entries is not None and len(self._data) >= self.max_entries)
+                or (self.max_bytes is not None and self._bytes + size > self.max_bytes)
+            ):
+                self._remove(next(iter(self._data)))
+                self._stats["evictions"] += 1
+            self._data[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            self._stats["sets"] += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """ counters since creation plus the current number of entries and bytes """
+        with self._lock:
+            return {**self._stats, "entries": len(self._data), "bytes": self._bytes}
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,137 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from polyapi.config import get_config_option
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    """ a JSON implementation, dumps returns utf-8 bytes and loads accepts bytes or str """
+
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes | str], Any]
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # same separators as httpx's json= so bodies don't change when falling back
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+STDLIB = JsonCodec("stdlib", _stdlib_dumps, json.loads)
+
+
+# orjson decodes integers outside [-2**63, 2**64) as floats, which land outside these bounds too
+_FLOAT_OVER_64_BITS = 2.0 ** 64
+_FLOAT_UNDER_64_BITS = -(2.0 ** 63)
+
+
+def _has_overflowed_int(value: Any) -> bool:
+    """ whether a decoded document holds a float that may have been an integer too big for 64 bits """
+    if type(value) is float:
+        return value >= _FLOAT_OVER_64_BITS or value <= _FLOAT_UNDER_64_BITS
+    if type(value) is not dict and type(value) is not list:
+        return False
+    # one flat loop over every container, this runs after each orjson decode
+    stack = [value]
+    append, pop = stack.append, stack.pop
+    while stack:
+        item = pop()
+        for child in (item.values() if type(item) is dict else item):
+            child_kind = type(child)
+            if child_kind is float:
+                if child >= _FLOAT_OVER_64_BITS or child <= _FLOAT_UNDER_64_BITS:
+                    return True
+            elif child_kind is dict or child_kind is list:
+                append(child)
+    return False
+
+
+def _load_orjson() -> JsonCodec:
+    import orjson  # type: ignore
+
+    def loads(data: bytes | str) -> Any:
+        value = orjson.loads(data)
+        # rare: such floats are re-read with the stdlib, which keeps big integers exact
+        if _has_overflowed_int(value):
+            return json.loads(data)
+        return value
+
+    return JsonCodec("orjson", orjson.dumps, loads)
+
+
+def _load_msgspec() -> JsonCodec:
+    import msgspec  # type: ignore
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    return JsonCodec("msgspec", encoder.encode, decoder.decode)
+
+
+_LOADERS: Dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _load_orjson,
+    "msgspec": _load_msgspec,
+    "stdlib": lambda: STDLIB,
+}
+
+_codec: JsonCodec | None = None
+
+
+def _load(name: str) -> JsonCodec:
+    if name == "auto":
+        for candidate in ("orjson", "msgspec"):
+            try:
+                return _LOADERS[candidate]()
+            except ImportError:
+                pass
+        return STDLIB
+    if name not in _LOADERS:
+        raise ValueError(f"json_codec must be one of auto, {', '.join(_LOADERS)}, got {name!r}")
+    return _LOADERS[name]()
+
+
+def get_codec() -> JsonCodec:
+    """ the codec in use, picked by the json_codec option (auto: orjson, then msgspec, then stdlib)
+    """
+    global _codec
+    if _codec is None:
+        _codec = _load((get_config_option("json_codec", "auto") or "auto").strip().lower())
+    return _codec
+
+
+def set_codec(codec: JsonCodec | str | None) -> None:
+    """ use a codec by name or a custom JsonCodec, None goes back to the json_codec option
+    """
+    global _codec
+    _codec = _load(codec) if isinstance(codec, str) else codec
+
+
+def dumps(obj: Any) -> bytes:
+    try:
+        return get_codec().dumps(obj)
+    except (TypeError, ValueError, OverflowError):
+        # fast encoders reject a few things the stdlib accepts (e.g. ints over 64 bits, non-str keys)
+        return _stdlib_dumps(obj)
+
+
+def loads(data: bytes | str) -> Any:
+    try:
+        return get_codec().loads(data)
+    except ValueError:
+        # e.g. ints over 64 bits, reraises a regular json.JSONDecodeError if the data is invalid
+        return json.loads(data)
+
+
+def decode_response(resp: Any) -> Any:
+    """ decode a response body as JSON with the fastest available codec
+
+    Used by the generated functions instead of resp.json(). Like httpx, the body is decoded
+    from its bytes. Objects that aren't httpx responses go through their own .json().
+    """
+    content = getattr(resp, "content", None)
+    if not isinstance(content, bytes):
+        return resp.json()
+    return loads(content)
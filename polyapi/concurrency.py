@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+from polyapi import http_client
+from polyapi.exceptions import PolyApiException
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_IN_FLIGHT = 10
+
+
+@dataclass
+class ItemResult(Generic[T, R]):
+    """Outcome of one item: either value or error is set."""
+
+    index: int
+    item: T
+    value: Optional[R] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _RateLimiter:
+    """Spaces out acquisitions so at most `rate` happen per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate
+        self.next_slot = 0.0
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def _run_bounded(
+    fn_async: Callable[[T], Awaitable[R]],
+    iterable: Iterable[T],
+    max_in_flight: int,
+    rate_limit: Optional[float],
+    on_result: Callable[[ItemResult], Awaitable[None]],
+) -> None:
+    # workers pull from one shared iterator, so huge generators are never materialized
+    iterator = enumerate(iterable)
+    limiter = _RateLimiter(rate_limit) if rate_limit else None
+
+    async def worker():
+        for index, item in iterator:
+            if limiter:
+                await limiter.acquire()
+            try:
+                result = ItemResult(index, item, value=await fn_async(item))
+            except (Exception, PolyApiException) as e:
+                result = ItemResult(index, item, error=e)
+            await on_result(result)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, max_in_flight))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+
+
+async def map_async(
+    fn_async: Callable[[T], Awaitable[R]],
+    iterable: Iterable[T],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    return_exceptions: bool = False,
+    rate_limit: Optional[float] = None,
+) -> List[Any]:
+    """ await fn_async(item) for every item, at most max_in_flight at a time
+
+    Results keep the order of iterable. rate_limit caps how many calls start per second.
+    Without return_exceptions the first failure cancels the rest and is raised,
+    with it failed items yield their exception in place.
+
+    e.g. await map_async(poly.ctx.fn_async, ids, max_in_flight=20)
+    """
+    results: List[Any] = []
+
+    async def on_result(result: ItemResult) -> None:
+        if result.error is not None and not return_exceptions:
+            raise result.error
+        if result.index >= len(results):
+            results.extend([None] * (result.index + 1 - len(results)))
+        results[result.index] = result.value if result.error is None else result.error
+
+    await _run_bounded(fn_async, iterable, max_in_flight, rate_limit, on_result)
+    return results
+
+
+async def imap_async(
+    fn_async: Callable[[T], Awaitable[R]],
+    iterable: Iterable[T],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    rate_limit: Optional[float] = None,
+) -> AsyncIterator[ItemResult[T, R]]:
+    """ like map_async, but yields an ItemResult per item as soon as it completes
+
+    Errors are captured per item on ItemResult.error instead of being raised.
+    Leaving the loop early cancels the calls still in flight.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_in_flight))
+    done = object()
+
+    async def produce():
+        try:
+            await _run_bounded(fn_async, iterable, max_in_flight, rate_limit, queue.put)
+        finally:
+            await queue.put(done)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            result = await queue.get()
+            if result is done:
+                break
+            yield result
+        await producer
+    finally:
+        producer.cancel()
+
+
+class SingleFlight:
+    """ threads calling do() with the same key while a call is in flight share its result
+
+    Only the first caller runs fn, the others block until it finishes and get the same
+    value or exception. Once it finishes, the next call with that key runs fn again.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], R]) -> R:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return future.result()
+
+
+class AsyncSingleFlight:
+    """ async twin of SingleFlight, coroutines awaiting do() with the same key share one call
+
+    fn runs in its own task, so a caller being cancelled doesn't cancel the call for the others.
+    Calls are tracked per event loop.
+    """
+
+    def __init__(self) -> None:
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[R]]) -> R:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = loop.create_task(fn())  # type: ignore[arg-type]
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+# a single background loop drives the sync helpers, so its async http client pool is reused between calls
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="polyapi-concurrency", daemon=True).start()
+        return _loop
+
+
+def map_sync(
+    fn_async: Callable[[T], Awaitable[R]],
+    iterable: Iterable[T],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    return_exceptions: bool = False,
+    rate_limit: Optional[float] = None,
+) -> List[Any]:
+    """ run map_async from sync code on a background event loop and wait for the results
+
+    Safe to call from threads or from inside a running event loop (which it blocks).
+    """
+    coro = map_async(fn_async, iterable, max_in_flight, return_exceptions, rate_limit)
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
+
+def shutdown() -> None:
+    """ close the background loop's async http clients and stop the loop
+
+    Clients used by other loops and threads are left open.
+    """
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None or loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(http_client.close_loop_async(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
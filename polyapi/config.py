@@ -1,7 +1,9 @@
 import sys
 import os
 import configparser
-from typing import Tuple
+import functools
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Tuple, TypeVar
 
 from polyapi.utils import is_valid_polyapi_url, print_green, print_yellow
 
@@ -16,6 +18,12 @@ LAST_GENERATE_CONTEXTS = None
 LAST_GENERATE_NAMES = None
 LAST_GENERATE_IDS = None
 LAST_GENERATE_NO_TYPES = None
+# raw [polyapi] section of .config.env, used for tuning options
+CONFIG_OPTIONS = None
+# precomputed urls and headers for generated function calls, see get_execution_context
+EXECUTION_CONTEXT = None
+# options read on every call, resolved once by the getters marked _resolved_once
+RESOLVED_OPTIONS: Dict[str, Any] = {}
 
 
 def get_config_file_path() -> str:
@@ -70,9 +78,66 @@ def get_api_key_and_url() -> Tuple[str | None, str | None]:
         LAST_GENERATE_IDS = ids_str.split(",") if ids_str else None
         LAST_GENERATE_NO_TYPES = config.get("polyapi", "last_generate_no_types_used", fallback="false").lower() == "true"
 
+        # Cache the whole section so tuning options don't need their own globals
+        global CONFIG_OPTIONS
+        CONFIG_OPTIONS = dict(config["polyapi"]) if config.has_section("polyapi") else {}
+
     return key, url
 
 
+class ExecutionContext:
+    """ base url and auth headers computed once instead of on every call
+
+    headers is read-only and shared between calls, copy it before adding to it.
+    """
+
+    __slots__ = ("api_key", "base_url", "headers", "_urls")
+
+    def __init__(self, api_key: str | None, base_url: str | None) -> None:
+        self.api_key = api_key
+        self.base_url = (base_url or "").rstrip("/")
+        self.headers: Mapping[str, str] = MappingProxyType({"Authorization": f"Bearer {api_key}"})
+        self._urls: Dict[Tuple[str, ...], str] = {}
+
+    def function_url(self, function_type: str, function_id: str, action: str = "execute") -> str:
+        key = (function_type, function_id, action)
+        url = self._urls.get(key)
+        if url is None:
+            url = self._urls[key] = f"{self.base_url}/functions/{function_type}/{function_id}/{action}"
+        return url
+
+    def variable_url(self, variable_id: str, suffix: str = "") -> str:
+        key = ("variables", variable_id, suffix)
+        url = self._urls.get(key)
+        if url is None:
+            url = self._urls[key] = f"{self.base_url}/variables/{variable_id}{suffix}"
+        return url
+
+
+def get_execution_context() -> ExecutionContext:
+    """ the cached ExecutionContext for the configured api key and url
+
+    Rebuilt after set_api_key_and_url() or clear_config(). The POLY_API_KEY and POLY_API_BASE_URL
+    environment variables are only read when it is built, call reset_execution_context() after changing them.
+    """
+    global EXECUTION_CONTEXT
+    context = EXECUTION_CONTEXT
+    if context is None:
+        key, url = get_api_key_and_url()
+        context = ExecutionContext(key, url)
+        # don't pin an incomplete config, it may be set up later
+        if key and url:
+            EXECUTION_CONTEXT = context
+    return context
+
+
+def reset_execution_context() -> None:
+    """ drop the cached ExecutionContext and the options resolved by the per-call getters """
+    global EXECUTION_CONTEXT
+    EXECUTION_CONTEXT = None
+    RESOLVED_OPTIONS.clear()
+
+
 def set_api_key_and_url(url: str, key: str):
     config = configparser.ConfigParser()
     config["polyapi"] = {}
@@ -84,6 +149,9 @@ def set_api_key_and_url(url: str, key: str):
     global API_URL
     API_KEY = key
     API_URL = url
+    global CONFIG_OPTIONS
+    CONFIG_OPTIONS = None
+    reset_execution_context()
 
 
 def initialize_config(force=False):
@@ -125,8 +193,11 @@ def clear_config():
 
     global API_KEY
     global API_URL
+    global CONFIG_OPTIONS
     API_KEY = None
     API_URL = None
+    CONFIG_OPTIONS = None
+    reset_execution_context()
 
     path = get_config_file_path()
     if os.path.exists(path):
@@ -142,6 +213,175 @@ def get_mtls_config() -> Tuple[bool, str | None, str | None, str | None]:
     return bool(MTLS_CERT_PATH and MTLS_KEY_PATH and MTLS_CA_PATH), MTLS_CERT_PATH, MTLS_KEY_PATH, MTLS_CA_PATH
 
 
+def _load_config_options() -> Dict[str, str]:
+    # read independently of get_api_key_and_url, which returns early when both credentials come from env vars
+    global CONFIG_OPTIONS
+    if CONFIG_OPTIONS is None:
+        options: Dict[str, str] = {}
+        path = get_config_file_path()
+        if os.path.exists(path):
+            config = configparser.ConfigParser()
+            with open(path, "r") as f:
+                config.read_file(f)
+            if config.has_section("polyapi"):
+                options = dict(config["polyapi"])
+        # cached even when there is no file, so hot paths don't check the disk on every call
+        CONFIG_OPTIONS = options
+    return CONFIG_OPTIONS
+
+
+def get_config_option(name: str, fallback: str | None = None) -> str | None:
+    """Return a tuning option, preferring the POLY_<NAME> env var over .config.env"""
+    value = os.environ.get(f"POLY_{name.upper()}")
+    if value is not None:
+        return value
+    return _load_config_options().get(name, fallback)
+
+
+_T = TypeVar("_T")
+
+
+def _resolved_once(getter: Callable[[], _T]) -> Callable[[], _T]:
+    # for options read on every request, reset_execution_context() makes the next call re-read them
+    name = getter.__name__
+
+    @functools.wraps(getter)
+    def wrapper() -> _T:
+        try:
+            return RESOLVED_OPTIONS[name]
+        except KeyError:
+            value = RESOLVED_OPTIONS[name] = getter()
+            return value
+
+    return wrapper
+
+
+def _parse_optional_number(value: str | None, cast):
+    if value is None or value.strip().lower() in ("", "none", "unlimited"):
+        return None
+    return cast(value.strip())
+
+
+def get_http_pool_config() -> Tuple[int | None, int | None, float | None]:
+    """Return HTTP connection pool settings (max connections, max keep-alive connections, keep-alive expiry)
+
+    Unset options fall back to the httpx defaults (100 connections, 20 keep-alive, 5 seconds).
+    """
+    max_connections = _parse_optional_number(get_config_option("http_max_connections", "100"), int)
+    max_keepalive = _parse_optional_number(get_config_option("http_max_keepalive_connections", "20"), int)
+    keepalive_expiry = _parse_optional_number(get_config_option("http_keepalive_expiry", "5"), float)
+    return max_connections, max_keepalive, keepalive_expiry
+
+
+def get_http2_config() -> bool:
+    """Return whether the shared clients should negotiate HTTP/2"""
+    return (get_config_option("http2", "false") or "").lower() == "true"
+
+
+HTTP_CLIENT_STRATEGIES = ("shared", "thread_local")
+
+
+def get_http_client_strategy() -> str:
+    """Return how sync requests are pooled across threads: one shared client ("shared") or one per thread ("thread_local")"""
+    strategy = (get_config_option("http_client_strategy", "shared") or "shared").strip().lower()
+    if strategy not in HTTP_CLIENT_STRATEGIES:
+        raise ValueError(f"http_client_strategy must be one of {', '.join(HTTP_CLIENT_STRATEGIES)}, got {strategy!r}")
+    return strategy
+
+
+def get_http_timeout_config() -> Tuple[float | None, float | None, float | None, float | None]:
+    """Return request timeouts in seconds (connect, read, write, pool), None meaning no limit
+
+    read bounds the wait for each chunk of a response, so it must exceed the longest running function.
+    """
+    connect = _parse_optional_number(get_config_option("http_connect_timeout", "10"), float)
+    read = _parse_optional_number(get_config_option("http_read_timeout", "300"), float)
+    write = _parse_optional_number(get_config_option("http_write_timeout", "60"), float)
+    pool = _parse_optional_number(get_config_option("http_pool_timeout", "60"), float)
+    return connect, read, write, pool
+
+
+def get_http_retry_config() -> Tuple[int, float, float, float, float | None]:
+    """Return retry settings (max attempts, backoff base, backoff max, retry budget ratio, hedge delay)
+
+    Attempts include the first try, so 1 disables retries. Hedging is off unless a delay is set.
+    """
+    max_attempts = int(get_config_option("http_retry_max_attempts", "3") or 1)
+    backoff_base = float(get_config_option("http_retry_backoff_base", "0.1") or 0)
+    backoff_max = float(get_config_option("http_retry_backoff_max", "2") or 0)
+    budget_ratio = float(get_config_option("http_retry_budget_ratio", "0.2") or 0)
+    hedge_after = _parse_optional_number(get_config_option("http_hedge_after", "none"), float)
+    return max_attempts, backoff_base, backoff_max, budget_ratio, hedge_after
+
+
+HTTP_REQUEST_COMPRESSIONS = ("none", "gzip", "zstd")
+
+
+@_resolved_once
+def get_http_compression_config() -> Tuple[str, int]:
+    """Return request body compression settings (algorithm, min body size in bytes to compress)"""
+    algorithm = (get_config_option("http_request_compression", "none") or "none").strip().lower()
+    if algorithm not in HTTP_REQUEST_COMPRESSIONS:
+        raise ValueError(f"http_request_compression must be one of {', '.join(HTTP_REQUEST_COMPRESSIONS)}, got {algorithm!r}")
+    min_bytes = int(get_config_option("http_request_compression_min_bytes", "1024") or 0)
+    return algorithm, min_bytes
+
+
+def _parse_result_cache_functions(value: str) -> Dict[str, float | None]:
+    functions: Dict[str, float | None] = {}
+    for entry in value.split(","):
+        function_id, _, ttl = entry.strip().partition(":")
+        if function_id:
+            functions[function_id] = float(ttl) if ttl.strip() else None
+    return functions
+
+
+@_resolved_once
+def get_result_cache_functions() -> Dict[str, float | None]:
+    """Return the function ids whose results are cached, mapped to their ttl (None for the default ttl)
+
+    Functions are listed as "id" or "id:ttl", comma separated, with "*" matching every function.
+    """
+    return _parse_result_cache_functions(get_config_option("result_cache_functions", "") or "")
+
+
+@_resolved_once
+def get_result_cache_config() -> Tuple[float, int | None, int | None]:
+    """Return result cache settings (default ttl, max bytes, max entries)"""
+    ttl = float(get_config_option("result_cache_ttl", "60") or 0)
+    max_bytes = _parse_optional_number(get_config_option("result_cache_max_bytes", "33554432"), int)
+    max_entries = _parse_optional_number(get_config_option("result_cache_max_entries", "1024"), int)
+    return ttl, max_bytes, max_entries
+
+
+@_resolved_once
+def get_single_flight_config() -> bool:
+    """Return whether concurrent identical cacheable calls and variable reads share one request"""
+    return (get_config_option("single_flight", "true") or "").lower() == "true"
+
+
+def get_warmup_config() -> int:
+    """Return how many connections to open in the background when polyapi is imported (0 disables)"""
+    value = (get_config_option("warmup_on_import", "false") or "").strip().lower()
+    if value in ("", "false", "0"):
+        return 0
+    return 1 if value == "true" else int(value)
+
+
+@_resolved_once
+def get_variable_cache_config() -> Tuple[float, bool]:
+    """Return variable cache settings (ttl in seconds, 0 disables, and whether to subscribe to change events)"""
+    ttl = _parse_optional_number(get_config_option("variable_cache_ttl", "0"), float) or 0.0
+    push = (get_config_option("variable_cache_push", "true") or "").lower() == "true"
+    return ttl, push
+
+
+@_resolved_once
+def get_direct_execute_cache_ttl() -> float:
+    """Return how many seconds resolved direct-execute endpoint info is cached for (0 disables the cache)"""
+    return _parse_optional_number(get_config_option("direct_execute_cache_ttl", "0"), float) or 0.0
+
+
 def get_direct_execute_config() -> bool:
     """Return whether direct execute is enabled"""
     global API_FUNCTION_DIRECT_EXECUTE
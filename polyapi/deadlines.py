@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from polyapi.exceptions import DeadlineExceeded
+
+# absolute time.monotonic() by which the current call tree must finish, None when unbounded
+_deadline: ContextVar[float | None] = ContextVar("_poly_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """ bound every Poly request made inside the block to a total time budget
+
+    Requests get at most the remaining budget as their timeout, retries stop once it is spent,
+    and DeadlineExceeded is raised when it runs out. Nested deadlines can only shorten the budget.
+    The budget follows contextvars, so it flows into asyncio tasks started inside the block.
+
+    e.g.
+        with polyapi.deadline(2.5):
+            poly.myContext.myFunction()
+    """
+    new = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        new = min(new, current)
+    token = _deadline.set(new)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """ seconds left in the current deadline, None without one
+    """
+    current = _deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def check_deadline() -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"deadline exceeded by {-left:.3f}s")
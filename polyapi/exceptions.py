@@ -1,3 +1,8 @@
 class PolyApiException(BaseException):
     """Generic error for the Poly API."""
-    pass
\ No newline at end of file
+    pass
+
+
+class DeadlineExceeded(PolyApiException):
+    """The time budget set with polyapi.deadline() ran out."""
+    pass
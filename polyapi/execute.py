@@ -1,12 +1,164 @@
+import contextvars
 import httpx
+import inspect
 import os
 import logging
-from polyapi.config import get_api_key_and_url, get_mtls_config
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from polyapi.cache import LRUCache, TTLCache, canonical_key
+from polyapi.codec import decode_response
+from polyapi.concurrency import DEFAULT_MAX_IN_FLIGHT, AsyncSingleFlight, SingleFlight, map_async
+from polyapi.config import (
+    get_direct_execute_cache_ttl,
+    get_execution_context,
+    get_mtls_config,
+    get_result_cache_config,
+    get_result_cache_functions,
+    get_single_flight_config,
+    get_variable_cache_config,
+)
 from polyapi.exceptions import PolyApiException
 from polyapi import http_client
+from polyapi.streaming import AsyncResponseStream, ResponseStream
+from polyapi.variable_events import VariableChangeSubscriber
 
 logger = logging.getLogger("poly")
 
+# resolved direct-execute endpoint info, only used when direct_execute_cache_ttl is set
+_endpoint_info_cache = TTLCache()
+
+# results of functions opted into caching with enable_result_cache() or result_cache_functions
+_result_cache: LRUCache | None = None
+_result_cache_lock = threading.Lock()
+_result_cache_overrides: Dict[str, float | None] = {}
+# concurrent identical cacheable calls and variable reads share one request, see single_flight
+_single_flight = SingleFlight()
+_async_single_flight = AsyncSingleFlight()
+
+
+def _get_result_cache() -> LRUCache:
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _, max_bytes, max_entries = get_result_cache_config()
+                _result_cache = LRUCache(max_entries, max_bytes)
+    return _result_cache
+
+
+def _function_id(function: Any) -> str:
+    # generated functions carry their id, anything else is taken to be the id itself
+    return getattr(function, "function_id", function)
+
+
+def enable_result_cache(function: Any, ttl: float | None = None) -> Any:
+    """ cache the results of a generated function (or function id) for ttl seconds
+
+    Only for functions whose result depends on nothing but their arguments. ttl defaults to
+    the result_cache_ttl option. Returns function, so it also works as a decorator.
+    """
+    _result_cache_overrides[_function_id(function)] = ttl
+    return function
+
+
+def disable_result_cache(function: Any) -> None:
+    """ stop caching a function, including one enabled through result_cache_functions """
+    _result_cache_overrides[_function_id(function)] = 0
+
+
+def clear_result_cache() -> None:
+    """ drop every cached result, size limits are re-read on next use """
+    global _result_cache
+    with _result_cache_lock:
+        _result_cache = None
+
+
+def get_result_cache_stats() -> Dict[str, int]:
+    """ hits, misses, sets, evictions, expirations and the current entries and bytes """
+    return _get_result_cache().stats()
+
+
+def _result_cache_ttl(function_id: str) -> float:
+    if function_id in _result_cache_overrides:
+        ttl = _result_cache_overrides[function_id]
+    else:
+        functions = get_result_cache_functions()
+        if not functions:
+            return 0.0
+        ttl = functions[function_id] if function_id in functions else functions.get("*", 0)
+    return get_result_cache_config()[0] if ttl is None else ttl
+
+
+def _cached_result(action, function_type, function_id, data) -> Tuple[str | None, float, httpx.Response | None]:
+    """ the cache key, ttl and cached response of a call, (None, 0, None) when it isn't cached """
+    ttl = _result_cache_ttl(function_id)
+    if ttl <= 0:
+        return None, 0.0, None
+    # direct and regular execute responses have different shapes
+    cache_key = canonical_key(action, function_type, function_id, data)
+    return cache_key, ttl, _get_result_cache().get(cache_key)
+
+
+def _cache_control_ttl(resp: httpx.Response, ttl: float) -> float:
+    # the client is a private cache, so max-age applies and s-maxage doesn't
+    directives = {}
+    for directive in resp.headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip().strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    try:
+        return float(directives["max-age"])
+    except (KeyError, ValueError):
+        return ttl
+
+
+def _store_result(cache_key, ttl, resp, honor_cache_control=False) -> None:
+    if cache_key is None or _is_error(resp):
+        return
+    if honor_cache_control:
+        ttl = _cache_control_ttl(resp, ttl)
+    if ttl > 0:
+        _get_result_cache().set(cache_key, resp, ttl, len(resp.content))
+
+
+def _sync_cached_call(action, call, function_type, function_id, data) -> httpx.Response:
+    """ call(function_type, function_id, data) through the result cache when the function has it enabled """
+    cache_key, ttl, cached = _cached_result(action, function_type, function_id, data)
+    if cached is not None:
+        return cached
+    if cache_key is None:
+        return call(function_type, function_id, data)
+
+    def fetch():
+        resp = call(function_type, function_id, data)
+        _store_result(cache_key, ttl, resp, honor_cache_control=action == "direct-execute")
+        return resp
+
+    if not get_single_flight_config():
+        return fetch()
+    # cacheable functions are pure, so concurrent identical calls can share one request
+    return _single_flight.do(cache_key, fetch)
+
+
+async def _async_cached_call(action, call, function_type, function_id, data) -> httpx.Response:
+    cache_key, ttl, cached = _cached_result(action, function_type, function_id, data)
+    if cached is not None:
+        return cached
+    if cache_key is None:
+        return await call(function_type, function_id, data)
+
+    async def fetch():
+        resp = await call(function_type, function_id, data)
+        _store_result(cache_key, ttl, resp, honor_cache_control=action == "direct-execute")
+        return resp
+
+    if not get_single_flight_config():
+        return await fetch()
+    return await _async_single_flight.do(cache_key, fetch)
+
+
 def _check_response_error(resp, function_type, function_id, data):
     if resp.status_code < 200 or resp.status_code >= 300:
         error_content = resp.content.decode("utf-8", errors="ignore")
@@ -30,76 +182,108 @@ def _build_direct_execute_params(endpoint_info_data):
     request_params.pop("url", None)
     if "maxRedirects" in request_params:
         request_params["follow_redirects"] = request_params.pop("maxRedirects") > 0
-    return request_params
+    return http_client.encode_json_kwargs(request_params)
 
 
-def _sync_direct_execute(function_type, function_id, data) -> httpx.Response:
-    api_key, api_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    url = f"{api_url}/functions/{function_type}/{function_id}/direct-execute"
+def _direct_execute_tls_settings() -> Tuple[Tuple[str, str] | None, str | bool]:
+    has_mtls, cert_path, key_path, ca_path = get_mtls_config()
+    if has_mtls:
+        return (cert_path, key_path), ca_path  # type: ignore
+    return None, False
 
-    endpoint_info = http_client.post(url, json=data, headers=headers)
-    _check_endpoint_error(endpoint_info, function_type, function_id, data)
 
-    endpoint_info_data = endpoint_info.json()
-    request_params = _build_direct_execute_params(endpoint_info_data)
+def _endpoint_info_cache_key(function_type, function_id, data) -> str | None:
+    # the resolved url/headers/body embed the arguments, so they are part of the key
+    if get_direct_execute_cache_ttl() <= 0:
+        return None
+    return canonical_key(function_type, function_id, data)
 
-    has_mtls, cert_path, key_path, ca_path = get_mtls_config()
 
-    # Direct-execute hits URL that may need custom TLS
-    # settings (mTLS certs or disabled verification). httpx Client.request()
-    # doesn't accept per-request transport kwargs, so use one-off calls.
-    if has_mtls:
-        resp = httpx.request(
-            url=endpoint_info_data["url"],
-            cert=(cert_path, key_path),
-            verify=ca_path,
-            timeout=None,
-            **request_params
-        )
-    else:
-        resp = httpx.request(
-            url=endpoint_info_data["url"],
-            verify=False,
-            timeout=None,
-            **request_params
-        )
+def _invalidate_endpoint_info(cache_key, resp) -> None:
+    # 4xx from the target usually means stale auth or a changed endpoint
+    if cache_key and 400 <= resp.status_code < 500:
+        _endpoint_info_cache.invalidate(cache_key)
 
-    _check_response_error(resp, function_type, function_id, data)
-    return resp
 
+def _sync_resolve_endpoint(function_type, function_id, data) -> Tuple[str | None, Dict[str, Any]]:
+    """ fetch (or reuse) the url/params a direct execute should call, with its cache key """
+    cache_key = _endpoint_info_cache_key(function_type, function_id, data)
+    endpoint_info_data = _endpoint_info_cache.get(cache_key) if cache_key else None
 
-async def _async_direct_execute(function_type, function_id, data) -> httpx.Response:
-    api_key, api_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    url = f"{api_url}/functions/{function_type}/{function_id}/direct-execute"
+    if endpoint_info_data is None:
+        context = get_execution_context()
+        headers = context.headers
+        url = context.function_url(function_type, function_id, "direct-execute")
+
+        endpoint_info = http_client.post(url, json=data, headers=headers)
+        _check_endpoint_error(endpoint_info, function_type, function_id, data)
+
+        endpoint_info_data = decode_response(endpoint_info)
+        if cache_key:
+            _endpoint_info_cache.set(cache_key, endpoint_info_data, get_direct_execute_cache_ttl())
+    return cache_key, endpoint_info_data
 
-    endpoint_info = await http_client.async_post(url, json=data, headers=headers)
-    _check_endpoint_error(endpoint_info, function_type, function_id, data)
 
-    endpoint_info_data = endpoint_info.json()
+async def _async_resolve_endpoint(function_type, function_id, data) -> Tuple[str | None, Dict[str, Any]]:
+    cache_key = _endpoint_info_cache_key(function_type, function_id, data)
+    endpoint_info_data = _endpoint_info_cache.get(cache_key) if cache_key else None
+
+    if endpoint_info_data is None:
+        context = get_execution_context()
+        headers = context.headers
+        url = context.function_url(function_type, function_id, "direct-execute")
+
+        endpoint_info = await http_client.async_post(url, json=data, headers=headers)
+        _check_endpoint_error(endpoint_info, function_type, function_id, data)
+
+        endpoint_info_data = decode_response(endpoint_info)
+        if cache_key:
+            _endpoint_info_cache.set(cache_key, endpoint_info_data, get_direct_execute_cache_ttl())
+    return cache_key, endpoint_info_data
+
+
+def _sync_direct_execute_request(function_type, function_id, data) -> httpx.Response:
+    cache_key, endpoint_info_data = _sync_resolve_endpoint(function_type, function_id, data)
     request_params = _build_direct_execute_params(endpoint_info_data)
 
-    has_mtls, cert_path, key_path, ca_path = get_mtls_config()
+    # Direct-execute hits URL that may need custom TLS
+    # settings (mTLS certs or disabled verification). httpx Client.request()
+    # doesn't accept per-request transport kwargs, so use a pooled client per TLS setting.
+    client = http_client.get_tls_client(*_direct_execute_tls_settings())
+    resp = http_client.send_with_retries(
+        request_params.get("method", "POST"),
+        lambda t: client.request(url=endpoint_info_data["url"], timeout=t, **request_params),
+    )
+
+    _invalidate_endpoint_info(cache_key, resp)
+    _check_response_error(resp, function_type, function_id, data)
+    return resp
 
-    # One-off async client for custom TLS settings on external URLs.
-    if has_mtls:
-        async with httpx.AsyncClient(
-            cert=(cert_path, key_path), verify=ca_path, timeout=None
-        ) as client:
-            resp = await client.request(
-                url=endpoint_info_data["url"], **request_params
-            )
-    else:
-        async with httpx.AsyncClient(verify=False, timeout=None) as client:
-            resp = await client.request(
-                url=endpoint_info_data["url"], **request_params
-            )
 
+async def _async_direct_execute_request(function_type, function_id, data) -> httpx.Response:
+    cache_key, endpoint_info_data = await _async_resolve_endpoint(function_type, function_id, data)
+    request_params = _build_direct_execute_params(endpoint_info_data)
+
+    # Pooled async client (per event loop) for custom TLS settings on external URLs.
+    client = http_client.get_async_tls_client(*_direct_execute_tls_settings())
+    resp = await http_client.send_with_retries_async(
+        request_params.get("method", "POST"),
+        lambda t: client.request(url=endpoint_info_data["url"], timeout=t, **request_params),
+    )
+
+    _invalidate_endpoint_info(cache_key, resp)
     _check_response_error(resp, function_type, function_id, data)
     return resp
 
 
+def _sync_direct_execute(function_type, function_id, data) -> httpx.Response:
+    return _sync_cached_call("direct-execute", _sync_direct_execute_request, function_type, function_id, data)
+
+
+async def _async_direct_execute(function_type, function_id, data) -> httpx.Response:
+    return await _async_cached_call("direct-execute", _async_direct_execute_request, function_type, function_id, data)
+
+
 def direct_execute(function_type, function_id, data) -> httpx.Response:
     """ execute a specific function id/type (sync)
     """
@@ -112,26 +296,34 @@ async def direct_execute_async(function_type, function_id, data) -> httpx.Respon
     return await _async_direct_execute(function_type, function_id, data)
 
 
-def _sync_execute(function_type, function_id, data) -> httpx.Response:
-    api_key, api_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    url = f"{api_url}/functions/{function_type}/{function_id}/execute"
+def _sync_execute_request(function_type, function_id, data) -> httpx.Response:
+    context = get_execution_context()
+    headers = context.headers
+    url = context.function_url(function_type, function_id)
 
     resp = http_client.post(url, json=data, headers=headers)
     _check_response_error(resp, function_type, function_id, data)
     return resp
 
 
-async def _async_execute(function_type, function_id, data) -> httpx.Response:
-    api_key, api_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    url = f"{api_url}/functions/{function_type}/{function_id}/execute"
+async def _async_execute_request(function_type, function_id, data) -> httpx.Response:
+    context = get_execution_context()
+    headers = context.headers
+    url = context.function_url(function_type, function_id)
 
     resp = await http_client.async_post(url, json=data, headers=headers)
     _check_response_error(resp, function_type, function_id, data)
     return resp
 
 
+def _sync_execute(function_type, function_id, data) -> httpx.Response:
+    return _sync_cached_call("execute", _sync_execute_request, function_type, function_id, data)
+
+
+async def _async_execute(function_type, function_id, data) -> httpx.Response:
+    return await _async_cached_call("execute", _async_execute_request, function_type, function_id, data)
+
+
 def execute(function_type, function_id, data) -> httpx.Response:
     """ execute a specific function id/type (sync)
     """
@@ -144,16 +336,175 @@ async def execute_async(function_type, function_id, data) -> httpx.Response:
     return await _async_execute(function_type, function_id, data)
 
 
+def _is_error(resp) -> bool:
+    return resp.status_code < 200 or resp.status_code >= 300
+
+
+def _sync_execute_stream(function_type, function_id, data) -> httpx.Response:
+    context = get_execution_context()
+    headers = context.headers
+    url = context.function_url(function_type, function_id)
+
+    resp = http_client.stream("POST", url, json=data, headers=headers)
+    if _is_error(resp):
+        # error bodies are small, read them for the message
+        resp.read()
+        _check_response_error(resp, function_type, function_id, data)
+    return resp
+
+
+async def _async_execute_stream(function_type, function_id, data) -> httpx.Response:
+    context = get_execution_context()
+    headers = context.headers
+    url = context.function_url(function_type, function_id)
+
+    resp = await http_client.async_stream("POST", url, json=data, headers=headers)
+    if _is_error(resp):
+        await resp.aread()
+        _check_response_error(resp, function_type, function_id, data)
+    return resp
+
+
+def _sync_direct_execute_stream(function_type, function_id, data) -> httpx.Response:
+    cache_key, endpoint_info_data = _sync_resolve_endpoint(function_type, function_id, data)
+    request_params = _build_direct_execute_params(endpoint_info_data)
+    client = http_client.get_tls_client(*_direct_execute_tls_settings())
+    resp = http_client.stream(
+        request_params.pop("method", "POST"), endpoint_info_data["url"], client=client, **request_params
+    )
+    if _is_error(resp):
+        resp.read()
+        _invalidate_endpoint_info(cache_key, resp)
+        _check_response_error(resp, function_type, function_id, data)
+    return resp
+
+
+async def _async_direct_execute_stream(function_type, function_id, data) -> httpx.Response:
+    cache_key, endpoint_info_data = await _async_resolve_endpoint(function_type, function_id, data)
+    request_params = _build_direct_execute_params(endpoint_info_data)
+    client = http_client.get_async_tls_client(*_direct_execute_tls_settings())
+    resp = await http_client.async_stream(
+        request_params.pop("method", "POST"), endpoint_info_data["url"], client=client, **request_params
+    )
+    if _is_error(resp):
+        await resp.aread()
+        _invalidate_endpoint_info(cache_key, resp)
+        _check_response_error(resp, function_type, function_id, data)
+    return resp
+
+
+def execute_stream(function_type, function_id, data) -> ResponseStream:
+    """ like execute, but the result is streamed instead of buffered (sync)
+
+    The request is sent when the stream is entered or first iterated, e.g.
+        with execute_stream("server", function_id, data) as stream:
+            for item in stream.iter_items():
+                ...
+    """
+    return ResponseStream(lambda: _sync_execute_stream(function_type, function_id, data))
+
+
+def execute_stream_async(function_type, function_id, data) -> AsyncResponseStream:
+    """ like execute_async, but the result is streamed, use with 'async with'
+    """
+    return AsyncResponseStream(lambda: _async_execute_stream(function_type, function_id, data))
+
+
+def direct_execute_stream(function_type, function_id, data) -> ResponseStream:
+    """ like direct_execute, but the result is streamed instead of buffered (sync)
+    """
+    return ResponseStream(lambda: _sync_direct_execute_stream(function_type, function_id, data))
+
+
+def direct_execute_stream_async(function_type, function_id, data) -> AsyncResponseStream:
+    """ like direct_execute_async, but the result is streamed, use with 'async with'
+    """
+    return AsyncResponseStream(lambda: _async_direct_execute_stream(function_type, function_id, data))
+
+
+def _sync_map(fn, items, max_in_flight, return_exceptions) -> List[Any]:
+    items = list(items)
+    if not items:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(items)))) as pool:
+        # copy the context so polyapi.deadline() and polyCustom carry over into the worker threads
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        results: List[Any] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except (Exception, PolyApiException) as e:
+                if not return_exceptions:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                results.append(e)
+    return results
+
+
+def _sync_execute_many(calls, max_in_flight, direct, return_exceptions) -> List[Any]:
+    execute_one = _sync_direct_execute if direct else _sync_execute
+    return _sync_map(lambda call: execute_one(*call), calls, max_in_flight, return_exceptions)
+
+
+async def _async_execute_many(calls, max_in_flight, direct, return_exceptions) -> List[Any]:
+    execute_one = _async_direct_execute if direct else _async_execute
+    return await map_async(lambda call: execute_one(*call), calls, max_in_flight, return_exceptions)
+
+
+def execute_many(
+    calls: Iterable[Tuple[str, str, Any]],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    direct: bool = False,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """ execute many (function_type, function_id, data) calls (sync)
+
+    Poly has no batch execute endpoint, so calls fan out over the shared client with
+    at most max_in_flight requests at a time. Responses keep the order of calls.
+    With return_exceptions, failed calls yield their exception instead of raising.
+    """
+    return _sync_execute_many(calls, max_in_flight, direct, return_exceptions)
+
+
+async def execute_many_async(
+    calls: Iterable[Tuple[str, str, Any]],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    direct: bool = False,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """ execute many (function_type, function_id, data) calls (async)
+    """
+    return await _async_execute_many(calls, max_in_flight, direct, return_exceptions)
+
+
+def bind_batch_calls(fn: Callable[..., Any], calls: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """ check each dict of keyword arguments against fn's signature, the way fn(**call) would
+
+    Raises TypeError on an unknown or missing required argument, before any call is sent.
+    Returns every argument of each call, with defaults filled in.
+    """
+    signature = inspect.signature(fn)
+    bound = []
+    for i, call in enumerate(calls):
+        try:
+            arguments = signature.bind(**call)
+        except TypeError as e:
+            raise TypeError(f"{fn.__name__}_batch call {i}: {e}") from None
+        arguments.apply_defaults()
+        bound.append(arguments.arguments)
+    return bound
+
+
 def _sync_execute_post(path, data):
-    api_key, api_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    return http_client.post(api_url + path, json=data, headers=headers)
+    context = get_execution_context()
+    return http_client.post(context.base_url + path, json=data, headers=context.headers)
 
 
 async def _async_execute_post(path, data):
-    api_key, api_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    return await http_client.async_post(api_url + path, json=data, headers=headers)
+    context = get_execution_context()
+    return await http_client.async_post(context.base_url + path, json=data, headers=context.headers)
 
 
 def execute_post(path, data):
@@ -164,10 +515,10 @@ async def execute_post_async(path, data):
     return await _async_execute_post(path, data)
 
 
-def _sync_variable_get(variable_id: str) -> httpx.Response:
-    api_key, base_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    url = f"{base_url}/variables/{variable_id}/value"
+def _sync_variable_get_request(variable_id: str) -> httpx.Response:
+    context = get_execution_context()
+    headers = context.headers
+    url = context.variable_url(variable_id, "/value")
     resp = http_client.get(url, headers=headers)
     if resp.status_code != 200 and resp.status_code != 201:
         error_content = resp.content.decode("utf-8", errors="ignore")
@@ -175,10 +526,10 @@ def _sync_variable_get(variable_id: str) -> httpx.Response:
     return resp
 
 
-async def _async_variable_get(variable_id: str) -> httpx.Response:
-    api_key, base_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    url = f"{base_url}/variables/{variable_id}/value"
+async def _async_variable_get_request(variable_id: str) -> httpx.Response:
+    context = get_execution_context()
+    headers = context.headers
+    url = context.variable_url(variable_id, "/value")
     resp = await http_client.async_get(url, headers=headers)
     if resp.status_code != 200 and resp.status_code != 201:
         error_content = resp.content.decode("utf-8", errors="ignore")
@@ -186,6 +537,76 @@ async def _async_variable_get(variable_id: str) -> httpx.Response:
     return resp
 
 
+# variable values, only used when variable_cache_ttl is set
+_variable_cache = TTLCache(max_entries=4096)
+# bumped by every invalidation, so a read that raced one doesn't cache what it fetched
+_variable_cache_epoch = 0
+_variable_subscriber: VariableChangeSubscriber | None = None
+_variable_subscriber_lock = threading.Lock()
+
+
+def invalidate_variable(variable_id: str) -> None:
+    """ drop a variable's cached value, the next read fetches it again """
+    global _variable_cache_epoch
+    _variable_cache_epoch += 1
+    _variable_cache.invalidate(variable_id)
+
+
+def clear_variable_cache() -> None:
+    global _variable_cache_epoch
+    _variable_cache_epoch += 1
+    _variable_cache.clear()
+
+
+def _get_variable_subscriber() -> VariableChangeSubscriber:
+    global _variable_subscriber
+    if _variable_subscriber is None:
+        with _variable_subscriber_lock:
+            if _variable_subscriber is None:
+                # a dropped connection may have missed events, so nothing cached can be trusted
+                _variable_subscriber = VariableChangeSubscriber(invalidate_variable, clear_variable_cache)
+    return _variable_subscriber
+
+
+def _cache_variable(variable_id: str, resp: httpx.Response, ttl: float, push: bool, epoch: int) -> None:
+    if push:
+        _get_variable_subscriber().subscribe(variable_id)
+    if epoch == _variable_cache_epoch:
+        _variable_cache.set(variable_id, resp, ttl)
+
+
+def _sync_variable_get(variable_id: str) -> httpx.Response:
+    ttl, push = get_variable_cache_config()
+    if ttl > 0:
+        cached = _variable_cache.get(variable_id)
+        if cached is not None:
+            return cached
+    epoch = _variable_cache_epoch
+    if get_single_flight_config():
+        resp = _single_flight.do(("variable", variable_id), lambda: _sync_variable_get_request(variable_id))
+    else:
+        resp = _sync_variable_get_request(variable_id)
+    if ttl > 0:
+        _cache_variable(variable_id, resp, ttl, push, epoch)
+    return resp
+
+
+async def _async_variable_get(variable_id: str) -> httpx.Response:
+    ttl, push = get_variable_cache_config()
+    if ttl > 0:
+        cached = _variable_cache.get(variable_id)
+        if cached is not None:
+            return cached
+    epoch = _variable_cache_epoch
+    if get_single_flight_config():
+        resp = await _async_single_flight.do(("variable", variable_id), lambda: _async_variable_get_request(variable_id))
+    else:
+        resp = await _async_variable_get_request(variable_id)
+    if ttl > 0:
+        _cache_variable(variable_id, resp, ttl, push, epoch)
+    return resp
+
+
 def variable_get(variable_id: str) -> httpx.Response:
     return _sync_variable_get(variable_id)
 
@@ -194,25 +615,61 @@ async def variable_get_async(variable_id: str) -> httpx.Response:
     return await _async_variable_get(variable_id)
 
 
+def _sync_variable_get_many(variable_ids, max_in_flight, return_exceptions) -> Dict[str, Any]:
+    variable_ids = list(dict.fromkeys(variable_ids))
+    return dict(zip(variable_ids, _sync_map(_sync_variable_get, variable_ids, max_in_flight, return_exceptions)))
+
+
+async def _async_variable_get_many(variable_ids, max_in_flight, return_exceptions) -> Dict[str, Any]:
+    variable_ids = list(dict.fromkeys(variable_ids))
+    return dict(zip(variable_ids, await map_async(_async_variable_get, variable_ids, max_in_flight, return_exceptions)))
+
+
+def variable_get_many(
+    variable_ids: Iterable[str],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    return_exceptions: bool = False,
+) -> Dict[str, Any]:
+    """ read many variables at once (sync), returns {variable_id: response}
+
+    Poly has no endpoint returning several variable values, so reads fan out over the
+    shared client, at most max_in_flight at a time. Duplicate ids are read once and
+    cached variables are served from the variable cache.
+    """
+    return _sync_variable_get_many(variable_ids, max_in_flight, return_exceptions)
+
+
+async def variable_get_many_async(
+    variable_ids: Iterable[str],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    return_exceptions: bool = False,
+) -> Dict[str, Any]:
+    """ read many variables at once (async), returns {variable_id: response}
+    """
+    return await _async_variable_get_many(variable_ids, max_in_flight, return_exceptions)
+
+
 def _sync_variable_update(variable_id: str, value) -> httpx.Response:
-    api_key, base_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    url = f"{base_url}/variables/{variable_id}"
+    context = get_execution_context()
+    headers = context.headers
+    url = context.variable_url(variable_id)
     resp = http_client.patch(url, data={"value": value}, headers=headers)
     if resp.status_code != 200 and resp.status_code != 201:
         error_content = resp.content.decode("utf-8", errors="ignore")
         raise PolyApiException(f"{resp.status_code}: {error_content}")
+    invalidate_variable(variable_id)
     return resp
 
 
 async def _async_variable_update(variable_id: str, value) -> httpx.Response:
-    api_key, base_url = get_api_key_and_url()
-    headers = {"Authorization": f"Bearer {api_key}"}
-    url = f"{base_url}/variables/{variable_id}"
+    context = get_execution_context()
+    headers = context.headers
+    url = context.variable_url(variable_id)
     resp = await http_client.async_patch(url, data={"value": value}, headers=headers)
     if resp.status_code != 200 and resp.status_code != 201:
         error_content = resp.content.decode("utf-8", errors="ignore")
         raise PolyApiException(f"{resp.status_code}: {error_content}")
+    invalidate_variable(variable_id)
     return resp
 
 
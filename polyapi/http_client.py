@@ -1,83 +1,691 @@
 import asyncio
+import gzip
+import logging
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Tuple
+
 import httpx
 
+from polyapi import codec, deadlines
+from polyapi.config import (
+    get_execution_context,
+    get_http2_config,
+    get_http_compression_config,
+    get_http_client_strategy,
+    get_http_pool_config,
+    get_http_retry_config,
+    get_http_timeout_config,
+)
+from polyapi.exceptions import DeadlineExceeded
+
+logger = logging.getLogger("poly")
+
+# Sync clients are safe to share between threads (httpx pools are thread-safe); creation is locked
+# so concurrent first requests build exactly one client. With http_client_strategy=thread_local
+# every thread gets its own client and pool instead, so threads never contend for connections.
 _sync_client: httpx.Client | None = None
-_async_client: httpx.AsyncClient | None = None
-_async_client_loop: asyncio.AbstractEventLoop | None = None
+_sync_client_lock = threading.Lock()
+_thread_local = threading.local()
+# bumped by close() so thread-local clients built before it are replaced on next use
+_thread_local_generation = 0
+_thread_local_clients: "weakref.WeakSet[httpx.Client]" = weakref.WeakSet()
+# async clients only work on the loop that created them, so every running loop gets its own.
+# Keyed weakly, a loop that is gone drops its clients instead of pinning them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+# long-lived clients for direct-execute targets, keyed by their TLS settings
+TlsKey = Tuple[Tuple[str, str] | None, str | bool]
+_tls_clients: Dict[TlsKey, httpx.Client] = {}
+_tls_clients_lock = threading.Lock()
+_async_tls_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[TlsKey, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+# overrides set through configure(), mostly useful for tests
+_limits: httpx.Limits | None = None
+_transport: httpx.BaseTransport | None = None
+_async_transport: httpx.AsyncBaseTransport | None = None
+
+
+def _get_limits() -> httpx.Limits:
+    if _limits is not None:
+        return _limits
+    max_connections, max_keepalive, keepalive_expiry = get_http_pool_config()
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def _get_timeout() -> httpx.Timeout:
+    connect, read, write, pool = get_http_timeout_config()
+    return httpx.Timeout(connect=connect, read=read, write=write, pool=pool)
+
+
+def _use_http2() -> bool:
+    if not get_http2_config():
+        return False
+    try:
+        import h2  # type: ignore # noqa: F401
+    except ImportError:
+        logger.warning("http2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1. "
+                       "Install it with: pip install 'polyapi-python[http2]'")
+        return False
+    return True
+
+
+def _new_sync_client() -> httpx.Client:
+    return httpx.Client(timeout=_get_timeout(), limits=_get_limits(), transport=_transport, http2=_use_http2())
+
+
+def _get_thread_local_client() -> httpx.Client:
+    client = getattr(_thread_local, "client", None)
+    if client is None or _thread_local.generation != _thread_local_generation:
+        with _sync_client_lock:
+            client = _new_sync_client()
+            _thread_local.client = client
+            _thread_local.generation = _thread_local_generation
+            _thread_local_clients.add(client)
+    return client
 
 
 def _get_sync_client() -> httpx.Client:
     global _sync_client
-    if _sync_client is None:
-        _sync_client = httpx.Client(timeout=None)
-    return _sync_client
+    client = _sync_client
+    if client is not None:
+        return client
+    if get_http_client_strategy() == "thread_local":
+        return _get_thread_local_client()
+    with _sync_client_lock:
+        if _sync_client is None:
+            _sync_client = _new_sync_client()
+        return _sync_client
 
 
 def _get_async_client() -> httpx.AsyncClient:
-    global _async_client, _async_client_loop
     current_loop = asyncio.get_running_loop()
-    if _async_client is None or _async_client_loop is not current_loop:
-        _async_client = httpx.AsyncClient(timeout=None)
-        _async_client_loop = current_loop
-    return _async_client
+    client = _async_clients.get(current_loop)
+    if client is None:
+        client = httpx.AsyncClient(timeout=_get_timeout(), limits=_get_limits(), transport=_async_transport, http2=_use_http2())
+        with _async_clients_lock:
+            _async_clients[current_loop] = client
+    return client
+
+
+def get_tls_client(cert: Tuple[str, str] | None = None, verify: str | bool = True) -> httpx.Client:
+    """ return a pooled sync client for external urls with the given TLS settings
+
+    cert is a (cert_path, key_path) pair for mTLS and verify a CA bundle path or bool.
+    Certificates are loaded once per distinct setting instead of once per request.
+    """
+    key = (cert, verify)
+    client = _tls_clients.get(key)
+    if client is None:
+        with _tls_clients_lock:
+            client = _tls_clients.get(key)
+            if client is None:
+                client = httpx.Client(cert=cert, verify=verify, timeout=_get_timeout(), limits=_get_limits(), transport=_transport)
+                _tls_clients[key] = client
+    return client
+
+
+def get_async_tls_client(cert: Tuple[str, str] | None = None, verify: str | bool = True) -> httpx.AsyncClient:
+    """ async twin of get_tls_client, clients are cached per running event loop
+    """
+    current_loop = asyncio.get_running_loop()
+    clients = _async_tls_clients.get(current_loop)
+    if clients is None:
+        with _async_clients_lock:
+            clients = _async_tls_clients.setdefault(current_loop, {})
+    key = (cert, verify)
+    client = clients.get(key)
+    if client is None:
+        client = httpx.AsyncClient(cert=cert, verify=verify, timeout=_get_timeout(), limits=_get_limits(), transport=_async_transport)
+        clients[key] = client
+    return client
+
+
+def configure(
+    limits: httpx.Limits | None = None,
+    transport: httpx.BaseTransport | None = None,
+    async_transport: httpx.AsyncBaseTransport | None = None,
+    retry_policy: "RetryPolicy | None" = None,
+    retry_budget: "RetryBudget | None" = None,
+) -> None:
+    """ override the pool limits, transports and/or retry policy used by the shared clients
+
+    Limits default to the http_max_connections, http_max_keepalive_connections and
+    http_keepalive_expiry options, the retry policy and budget to the http_retry_* options.
+    Passing a transport (e.g. httpx.MockTransport) lets tests run the full client stack
+    without a network. Existing clients are dropped so the next request picks up the new settings.
+    """
+    global _limits, _transport, _async_transport, _async_clients, _async_tls_clients
+    global _retry_policy, _retry_budget
+    _limits = limits
+    _transport = transport
+    _async_transport = async_transport
+    _retry_policy = retry_policy
+    _retry_budget = retry_budget
+    close()
+    # can't await aclose() here, the old async clients are left for the gc like a stale loop's clients
+    with _async_clients_lock:
+        _async_clients = weakref.WeakKeyDictionary()
+        _async_tls_clients = weakref.WeakKeyDictionary()
+
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# the request never reached the server, so these are safe to retry for any method
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+# the server may have acted on the request, so these are only retried when it's idempotent
+_TRANSIENT_ERRORS = (httpx.ReadError, httpx.WriteError, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """ how failed requests are retried
+
+    Connection failures are retried for any request. Responses with a status in
+    retry_statuses and read errors (e.g. connection resets) are only retried for
+    idempotent requests. Delays grow exponentially from backoff_base up to
+    backoff_max with full jitter, and honor Retry-After up to backoff_max.
+    With hedge_after set, idempotent async requests still pending after that many
+    seconds are raced against a second copy.
+    """
+
+    max_attempts: int = 3
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    retry_statuses: FrozenSet[int] = frozenset({502, 503, 504})
+    hedge_after: float | None = None
+
+    def delay(self, attempt: int, resp: httpx.Response | None = None) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class RetryBudget:
+    """ caps retries to a fraction of traffic so an outage isn't amplified by retry storms
+
+    Every request deposits ratio tokens (up to burst) and every retry or hedge spends one.
+    """
+
+    def __init__(self, ratio: float = 0.2, burst: float = 10.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+_STAT_NAMES = ("requests", "retries", "retries_exhausted", "budget_exhausted", "hedges", "hedge_wins")
+_stats: Dict[str, int] = dict.fromkeys(_STAT_NAMES, 0)
+_stats_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_retry_stats() -> Dict[str, int]:
+    """ snapshot of the retry counters, for monitoring
+
+    requests: logical requests sent, retries: extra attempts made,
+    retries_exhausted: requests that failed after their last attempt,
+    budget_exhausted: retries skipped because the budget ran out,
+    hedges: hedged copies sent, hedge_wins: hedged copies that finished first.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_retry_stats() -> None:
+    with _stats_lock:
+        for name in _STAT_NAMES:
+            _stats[name] = 0
+
+
+_retry_policy: RetryPolicy | None = None
+_retry_budget: RetryBudget | None = None
+
+
+def _get_retry_policy() -> RetryPolicy:
+    global _retry_policy
+    if _retry_policy is None:
+        max_attempts, backoff_base, backoff_max, _, hedge_after = get_http_retry_config()
+        _retry_policy = RetryPolicy(max_attempts, backoff_base, backoff_max, hedge_after=hedge_after)
+    return _retry_policy
+
+
+def _get_retry_budget() -> RetryBudget:
+    global _retry_budget
+    if _retry_budget is None:
+        _retry_budget = RetryBudget(get_http_retry_config()[3])
+    return _retry_budget
+
+
+def _should_retry(policy: RetryPolicy, idempotent: bool, resp: httpx.Response | None, exc: BaseException | None) -> bool:
+    if exc is not None:
+        return isinstance(exc, _CONNECT_ERRORS) or (idempotent and isinstance(exc, _TRANSIENT_ERRORS))
+    return idempotent and resp is not None and resp.status_code in policy.retry_statuses
+
+
+def _resolve(method: str, retry: RetryPolicy | None, idempotent: bool | None) -> Tuple[RetryPolicy, bool]:
+    policy = retry if retry is not None else _get_retry_policy()
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    return policy, idempotent
 
 
-def post(url, **kwargs) -> httpx.Response:
-    return _get_sync_client().post(url, **kwargs)
+# per-request timeout as accepted by httpx (float, httpx.Timeout, None or USE_CLIENT_DEFAULT)
+Timeout = Any
 
 
-async def async_post(url, **kwargs) -> httpx.Response:
-    return await _get_async_client().post(url, **kwargs)
+def _attempt_timeout(timeout: Timeout) -> Timeout:
+    """ the timeout for the next attempt, capped by what's left of the current deadline """
+    left = deadlines.remaining()
+    if left is None:
+        return timeout
+    deadlines.check_deadline()
+    base = _get_timeout() if timeout is httpx.USE_CLIENT_DEFAULT else httpx.Timeout(timeout)
 
+    def cap(value: float | None) -> float:
+        return left if value is None else min(value, left)
 
-def get(url, **kwargs) -> httpx.Response:
-    return _get_sync_client().get(url, **kwargs)
+    return httpx.Timeout(connect=cap(base.connect), read=cap(base.read), write=cap(base.write), pool=cap(base.pool))
 
 
-async def async_get(url, **kwargs) -> httpx.Response:
-    return await _get_async_client().get(url, **kwargs)
+def _raise_for_deadline(exc: BaseException) -> None:
+    # a timeout that the deadline shortened is reported as the deadline running out
+    left = deadlines.remaining()
+    if isinstance(exc, httpx.TimeoutException) and left is not None and left <= 0:
+        raise DeadlineExceeded(f"deadline exceeded: {exc}") from exc
 
 
-def patch(url, **kwargs) -> httpx.Response:
-    return _get_sync_client().patch(url, **kwargs)
+def _retry_delay(policy: RetryPolicy, attempt: int, resp: httpx.Response | None) -> float | None:
+    """ how long to wait before the next attempt, None when no attempt fits in the deadline """
+    delay = policy.delay(attempt, resp)
+    left = deadlines.remaining()
+    if left is not None and delay >= left:
+        return None
+    return delay
 
 
-async def async_patch(url, **kwargs) -> httpx.Response:
-    return await _get_async_client().patch(url, **kwargs)
+def send_with_retries(
+    method: str,
+    send: Callable[[Timeout], httpx.Response],
+    retry: RetryPolicy | None = None,
+    idempotent: bool | None = None,
+    timeout: Timeout = httpx.USE_CLIENT_DEFAULT,
+) -> httpx.Response:
+    """ call send(timeout) under the retry policy (the default one unless retry is given)
 
+    idempotent defaults to whether method is idempotent per HTTP semantics. Each attempt
+    gets timeout, capped by the remaining polyapi.deadline() budget if one is active.
+    """
+    policy, idempotent = _resolve(method, retry, idempotent)
+    budget = _get_retry_budget()
+    budget.deposit()
+    _count("requests")
+    attempt = 1
+    while True:
+        resp, exc = None, None
+        try:
+            resp = send(_attempt_timeout(timeout))
+        except httpx.TransportError as e:
+            _raise_for_deadline(e)
+            exc = e
+        if not _should_retry(policy, idempotent, resp, exc):
+            break
+        if attempt >= policy.max_attempts:
+            _count("retries_exhausted")
+            break
+        delay = _retry_delay(policy, attempt, resp)
+        if delay is None:
+            _count("retries_exhausted")
+            break
+        if not budget.withdraw():
+            _count("budget_exhausted")
+            break
+        _count("retries")
+        logger.debug(f"retrying {method} after {exc or resp.status_code} (attempt {attempt + 1}/{policy.max_attempts})")
+        if resp is not None:
+            resp.close()
+        time.sleep(delay)
+        attempt += 1
+    if exc is not None:
+        raise exc
+    return resp
 
-def delete(url, **kwargs) -> httpx.Response:
-    return _get_sync_client().delete(url, **kwargs)
 
+async def _hedged(policy: RetryPolicy, send: Callable[[Timeout], Awaitable[httpx.Response]], timeout: Timeout) -> httpx.Response:
+    first = asyncio.ensure_future(send(_attempt_timeout(timeout)))
+    done, _ = await asyncio.wait({first}, timeout=policy.hedge_after)
+    if done or not _get_retry_budget().withdraw():
+        return await first
+    _count("hedges")
+    second = asyncio.ensure_future(send(_attempt_timeout(timeout)))
+    pending = {first, second}
+    try:
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None or not pending:
+                    if task is second:
+                        _count("hedge_wins")
+                    return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
 
-async def async_delete(url, **kwargs) -> httpx.Response:
-    return await _get_async_client().delete(url, **kwargs)
 
+async def send_with_retries_async(
+    method: str,
+    send: Callable[[Timeout], Awaitable[httpx.Response]],
+    retry: RetryPolicy | None = None,
+    idempotent: bool | None = None,
+    timeout: Timeout = httpx.USE_CLIENT_DEFAULT,
+) -> httpx.Response:
+    """ async twin of send_with_retries, which also hedges idempotent requests when the policy asks for it
+    """
+    policy, idempotent = _resolve(method, retry, idempotent)
+    budget = _get_retry_budget()
+    budget.deposit()
+    _count("requests")
+    hedge = idempotent and policy.hedge_after is not None
+    attempt = 1
+    while True:
+        resp, exc = None, None
+        try:
+            if hedge:
+                resp = await _hedged(policy, send, timeout)
+            else:
+                resp = await send(_attempt_timeout(timeout))
+        except httpx.TransportError as e:
+            _raise_for_deadline(e)
+            exc = e
+        if not _should_retry(policy, idempotent, resp, exc):
+            break
+        if attempt >= policy.max_attempts:
+            _count("retries_exhausted")
+            break
+        delay = _retry_delay(policy, attempt, resp)
+        if delay is None:
+            _count("retries_exhausted")
+            break
+        if not budget.withdraw():
+            _count("budget_exhausted")
+            break
+        _count("retries")
+        logger.debug(f"retrying {method} after {exc or resp.status_code} (attempt {attempt + 1}/{policy.max_attempts})")
+        if resp is not None:
+            await resp.aclose()
+        await asyncio.sleep(delay)
+        attempt += 1
+    if exc is not None:
+        raise exc
+    return resp
 
-def request(method, url, **kwargs) -> httpx.Response:
-    return _get_sync_client().request(method, url, **kwargs)
 
+def encode_json_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """ swap an httpx json= argument for content= encoded with polyapi.codec
+    """
+    if "json" not in kwargs:
+        return kwargs
+    kwargs = dict(kwargs)
+    body = kwargs.pop("json")
+    if body is None:
+        return kwargs
+    headers = httpx.Headers(kwargs.get("headers"))
+    headers.setdefault("Content-Type", codec.JSON_CONTENT_TYPE)
+    kwargs["headers"] = headers
+    kwargs["content"] = codec.dumps(body)
+    return kwargs
 
-async def async_request(method, url, **kwargs) -> httpx.Response:
-    return await _get_async_client().request(method, url, **kwargs)
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output deterministic, so retried and hedged copies are byte-identical
+    return gzip.compress(data, mtime=0)
+
+
+def _zstd(data: bytes) -> bytes:
+    import zstandard  # type: ignore
+
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip, "zstd": _zstd}
+
+
+def compress_body_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """ compress a content= body with the http_request_compression algorithm
+
+    Bodies under http_request_compression_min_bytes, streamed bodies and bodies that
+    already have a Content-Encoding are sent as they are.
+    """
+    algorithm, min_bytes = get_http_compression_config()
+    content = kwargs.get("content")
+    if algorithm == "none" or not isinstance(content, (bytes, str)) or len(content) < min_bytes:
+        return kwargs
+    headers = httpx.Headers(kwargs.get("headers"))
+    if "Content-Encoding" in headers:
+        return kwargs
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    headers["Content-Encoding"] = algorithm
+    return {**kwargs, "headers": headers, "content": _COMPRESSORS[algorithm](content)}
+
+
+def _prepare_body(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    # only for the shared clients: Poly accepts compressed bodies, arbitrary direct-execute targets may not
+    return compress_body_kwargs(encode_json_kwargs(kwargs))
+
+
+def post(url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    kwargs = _prepare_body(kwargs)
+    return send_with_retries("POST", lambda t: _get_sync_client().post(url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+async def async_post(url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    kwargs = _prepare_body(kwargs)
+    return await send_with_retries_async("POST", lambda t: _get_async_client().post(url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+def get(url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    return send_with_retries("GET", lambda t: _get_sync_client().get(url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+async def async_get(url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    return await send_with_retries_async("GET", lambda t: _get_async_client().get(url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+def patch(url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    kwargs = _prepare_body(kwargs)
+    return send_with_retries("PATCH", lambda t: _get_sync_client().patch(url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+async def async_patch(url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    kwargs = _prepare_body(kwargs)
+    return await send_with_retries_async("PATCH", lambda t: _get_async_client().patch(url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+def delete(url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    return send_with_retries("DELETE", lambda t: _get_sync_client().delete(url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+async def async_delete(url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    return await send_with_retries_async("DELETE", lambda t: _get_async_client().delete(url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+def request(method, url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    kwargs = _prepare_body(kwargs)
+    return send_with_retries(method, lambda t: _get_sync_client().request(method, url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+async def async_request(method, url, retry: RetryPolicy | None = None, idempotent: bool | None = None, timeout: Timeout = httpx.USE_CLIENT_DEFAULT, **kwargs) -> httpx.Response:
+    kwargs = _prepare_body(kwargs)
+    return await send_with_retries_async(method, lambda t: _get_async_client().request(method, url, timeout=t, **kwargs), retry, idempotent, timeout)
+
+
+def stream(
+    method,
+    url,
+    retry: RetryPolicy | None = None,
+    idempotent: bool | None = None,
+    timeout: Timeout = httpx.USE_CLIENT_DEFAULT,
+    client: httpx.Client | None = None,
+    **kwargs,
+) -> httpx.Response:
+    """ like request, but the body is left unread for resp.iter_bytes() and friends
+
+    The caller must close() the response. client defaults to the shared one.
+    """
+    kwargs = _prepare_body(kwargs) if client is None else encode_json_kwargs(kwargs)
+    follow_redirects = kwargs.pop("follow_redirects", httpx.USE_CLIENT_DEFAULT)
+
+    def send(t):
+        c = client or _get_sync_client()
+        return c.send(c.build_request(method, url, timeout=t, **kwargs), stream=True, follow_redirects=follow_redirects)
+
+    return send_with_retries(method, send, retry, idempotent, timeout)
+
+
+async def async_stream(
+    method,
+    url,
+    retry: RetryPolicy | None = None,
+    idempotent: bool | None = None,
+    timeout: Timeout = httpx.USE_CLIENT_DEFAULT,
+    client: httpx.AsyncClient | None = None,
+    **kwargs,
+) -> httpx.Response:
+    """ async twin of stream, the caller must aclose() the response
+    """
+    kwargs = _prepare_body(kwargs) if client is None else encode_json_kwargs(kwargs)
+    follow_redirects = kwargs.pop("follow_redirects", httpx.USE_CLIENT_DEFAULT)
+
+    async def send(t):
+        c = client or _get_async_client()
+        return await c.send(c.build_request(method, url, timeout=t, **kwargs), stream=True, follow_redirects=follow_redirects)
+
+    return await send_with_retries_async(method, send, retry, idempotent, timeout)
+
+def _warmup_url() -> str:
+    base_url = get_execution_context().base_url
+    if not base_url:
+        raise ValueError("PolyAPI Instance URL is not configured, run `python -m polyapi setup`.")
+    return base_url + "/"
+
+
+def warmup(connections: int = 1, timeout: float = 10.0) -> int:
+    """ open pooled connections to the Poly base url ahead of the first call, returns how many succeeded
+
+    Pays DNS, TCP, TLS and trust store loading up front with concurrent HEAD requests. Their status
+    doesn't matter, only that the connection is left in the pool. At most http_max_keepalive_connections
+    stay open. With http_client_strategy=thread_local only the calling thread's client is warmed.
+    """
+    url = _warmup_url()
+    client = _get_sync_client()
+
+    def touch(_) -> bool:
+        try:
+            client.head(url, timeout=timeout)
+            return True
+        except httpx.HTTPError as e:
+            logger.debug(f"warmup request failed: {e}")
+            return False
+
+    if connections <= 1:
+        return int(touch(None))
+    with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="polyapi-warmup") as pool:
+        return sum(pool.map(touch, range(connections)))
+
+
+async def warmup_async(connections: int = 1, timeout: float = 10.0) -> int:
+    """ like warmup, for the async client of the running event loop """
+    url = _warmup_url()
+    client = _get_async_client()
+
+    async def touch() -> bool:
+        try:
+            await client.head(url, timeout=timeout)
+            return True
+        except httpx.HTTPError as e:
+            logger.debug(f"warmup request failed: {e}")
+            return False
+
+    return sum(await asyncio.gather(*(touch() for _ in range(max(1, connections)))))
+
+
+def warmup_in_background(connections: int = 1) -> threading.Thread:
+    """ run warmup on a daemon thread so startup isn't held up by it """
+    thread = threading.Thread(target=_warmup_quietly, args=(connections,), name="polyapi-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _warmup_quietly(connections: int) -> None:
+    try:
+        warmup(connections)
+    except Exception as e:
+        logger.debug(f"background warmup failed: {e}")
 
 
 def close():
-    global _sync_client
-    if _sync_client is not None:
-        _sync_client.close()
-        _sync_client = None
+    global _sync_client, _thread_local_generation
+    with _sync_client_lock:
+        client, _sync_client = _sync_client, None
+        local_clients = list(_thread_local_clients)
+        _thread_local_clients.clear()
+        _thread_local_generation += 1
+    if client is not None:
+        client.close()
+    for local_client in local_clients:
+        local_client.close()
+    with _tls_clients_lock:
+        for client in _tls_clients.values():
+            client.close()
+        _tls_clients.clear()
 
-async def close_async():
-    global _sync_client, _async_client, _async_client_loop
-    close()
-    client = _async_client
-    client_loop = _async_client_loop
-    _async_client = None
-    _async_client_loop = None
-    if client is None:
-        return
 
+async def close_loop_async():
+    """ close the running loop's async clients, the sync clients and other loops' clients stay open """
     current_loop = asyncio.get_running_loop()
-    if client_loop is current_loop:
+    with _async_clients_lock:
+        client = _async_clients.pop(current_loop, None)
+        tls_clients = _async_tls_clients.pop(current_loop, {})
+    for tls_client in tls_clients.values():
+        await tls_client.aclose()
+    if client is not None:
         await client.aclose()
+
+
+async def close_async():
+    """ close the sync clients and the running loop's async clients """
+    close()
+    await close_loop_async()
@@ -1,7 +1,17 @@
+import asyncio
+import contextvars
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
 from polyapi import http_client
+from polyapi.codec import decode_response
+from polyapi.concurrency import _get_background_loop, imap_async
 from typing_extensions import NotRequired, TypedDict
 from typing import (
+    AsyncIterator,
+    Iterable,
+    Iterator,
     List,
     Union,
     Type,
@@ -16,14 +26,15 @@ from typing import (
 from polyapi.utils import add_import_to_init, init_the_init
 from polyapi.typedefs import TableSpecDto
 from polyapi.constants import JSONSCHEMA_TO_PYTHON_TYPE_MAP
-from polyapi.config import get_api_key_and_url
+from polyapi.config import get_execution_context
+from polyapi.exceptions import PolyApiException
 
 TABI_MODULE_IMPORTS = "\n".join(
     [
         "from typing_extensions import NotRequired, TypedDict",
-        "from typing import Union, List, Dict, Any, Literal, Optional, Required, overload",
-        "from polyapi.poly_tables import execute_query, first_result, transform_query, delete_one_response",
-        "from polyapi.typedefs import Table, PolyCountResult, PolyDeleteResult, PolyDeleteResults, SortOrder, StringFilter, NullableStringFilter, NumberFilter, NullableNumberFilter, BooleanFilter, NullableBooleanFilter, NullableObjectFilter",
+        "from typing import Union, List, Dict, Any, Literal, Optional, Required, Iterable, Iterator, AsyncIterator, overload",
+        "from polyapi.poly_tables import execute_query, execute_query_async, first_result, transform_query, delete_one_response, columnar_results, iter_table_rows, iter_table_rows_async, iter_table_batches, iter_table_batches_async, bulk_write, bulk_write_async, BulkWriteResult",
+        "from polyapi.typedefs import Table, PolyCountResult, PolyDeleteResult, PolyDeleteResults, SortOrder, ColumnarFormat, TableFormat, StringFilter, NullableStringFilter, NumberFilter, NullableNumberFilter, BooleanFilter, NullableBooleanFilter, NullableObjectFilter",
     ]
 )
 
@@ -72,25 +83,48 @@ def scrub_keys(e: Exception) -> Dict[str, Any]:
     }
 
 
-def execute_query(table_id, method, query):
+def _query_request(table_id, method):
     from polyapi import polyCustom
     from polyapi.poly.client_id import client_id
 
+    context = get_execution_context()
+    if not context.base_url:
+        raise ValueError(
+            "PolyAPI Instance URL is not configured, run `python -m polyapi setup`."
+        )
+
+    url = f"{context.base_url}/tables/{table_id}/{method}?clientId={client_id}"
+    execution_api_key = polyCustom.get("executionApiKey")
+    if execution_api_key:
+        headers = {"Authorization": f"Bearer {execution_api_key}"}
+    elif context.api_key:
+        headers = dict(context.headers)
+    else:
+        headers = {}
+    execution_id = polyCustom.get("executionId")
+    if execution_id:
+        # outside of a Poly execution there is none, and httpx rejects None header values
+        headers["x-poly-execution-id"] = execution_id
+    return url, headers
+
+
+def execute_query(table_id, method, query):
     try:
-        api_key, base_url = get_api_key_and_url()
-        if not base_url:
-            raise ValueError(
-                "PolyAPI Instance URL is not configured, run `python -m polyapi setup`."
-            )
-
-        auth_key = polyCustom.get("executionApiKey") or api_key
-        url = f"{base_url.rstrip('/')}/tables/{table_id}/{method}?clientId={client_id}"
-        headers = {"x-poly-execution-id": polyCustom.get("executionId")}
-        if auth_key:
-            headers["Authorization"] = f"Bearer {auth_key}"
-        response = http_client.post(url, json=query, headers=headers)
+        url, headers = _query_request(table_id, method)
+        # reads are safe to retry on transient errors, writes only when the request never got out
+        response = http_client.post(url, json=query, headers=headers, idempotent=method in ("select", "count"))
         response.raise_for_status()
-        return response.json()
+        return decode_response(response)
+    except Exception as e:
+        return scrub_keys(e)
+
+
+async def execute_query_async(table_id, method, query):
+    try:
+        url, headers = _query_request(table_id, method)
+        response = await http_client.async_post(url, json=query, headers=headers, idempotent=method in ("select", "count"))
+        response.raise_for_status()
+        return decode_response(response)
     except Exception as e:
         return scrub_keys(e)
 
@@ -130,16 +164,347 @@ def _transform_keys(obj: Any) -> Any:
 
 
 def transform_query(query: dict) -> dict:
-    if query["where"] or query["order_by"]:
+    # update and delete queries have no order_by, and where is optional everywhere
+    if query.get("where") or query.get("order_by"):
         return {
             **query,
-            "where": _transform_keys(query["where"]) if query["where"] else None,
-            "orderBy": query["order_by"] if query["order_by"] else None,
+            "where": _transform_keys(query["where"]) if query.get("where") else None,
+            "orderBy": query["order_by"] if query.get("order_by") else None,
         }
 
     return query
 
 
+def _results(rsp) -> List[Dict[str, Any]]:
+    # execute_query reports failures as a scrubbed error dict, iterators raise instead
+    if isinstance(rsp, dict) and isinstance(rsp.get("results"), list):
+        return rsp["results"]
+    message = rsp.get("message") if isinstance(rsp, dict) else None
+    raise PolyApiException(message or f"unexpected table response: {rsp!r}")
+
+
+def _rows_after(order: List[Tuple[str, str]], row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # where clause matching the rows that sort after row, None when a sort value is missing
+    values = [row.get(column) for column, _ in order]
+    if any(value is None for value in values):
+        return None
+    clauses = []
+    for i, (column, direction) in enumerate(order):
+        clause: Dict[str, Any] = {c: {"equals": v} for (c, _), v in zip(order[:i], values[:i])}
+        clause[column] = {"lt" if direction == "desc" else "gt": values[i]}
+        clauses.append(clause)
+    return {"OR": clauses}
+
+
+class _PageCursor:
+    """ builds the select query of each page, seeking past the last row seen (keyset pagination)
+
+    Rows are always ordered by order_by plus id, so the order is total and seeking is exact.
+    Seeking needs non-null sort values, so ordering by a column outside keyset_columns
+    (the required scalar columns) pages with OFFSET instead.
+    """
+
+    def __init__(
+        self,
+        where: Optional[Dict[str, Any]],
+        order_by: Optional[Dict[str, str]],
+        page_size: int,
+        keyset_columns: Tuple[str, ...] = ("id",),
+        select: Optional[List[str]] = None,
+    ) -> None:
+        if not 0 < page_size <= 1000:
+            raise ValueError("page_size must be between 1 and 1000.")
+        self.where = where
+        self.order = list((order_by or {}).items())
+        if "id" not in (order_by or {}):
+            self.order.append(("id", "asc"))
+        self.page_size = page_size
+        self.offset = 0
+        self.keyset = all(column in keyset_columns or column == "id" for column, _ in self.order)
+        # seeking needs the sort values of the last row, so they are fetched even when not selected
+        self.select = list(dict.fromkeys([*select, *(column for column, _ in self.order)])) if select else None
+
+    def _query(self, where: Optional[Dict[str, Any]], offset: Optional[int] = None) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"where": where, "order_by": dict(self.order), "limit": self.page_size}
+        if self.select:
+            query["select"] = self.select
+        if offset:
+            query["offset"] = offset
+        return transform_query(query)
+
+    def first(self) -> Dict[str, Any]:
+        return self._query(self.where)
+
+    def next(self, rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        self.offset += len(rows)
+        if len(rows) < self.page_size:
+            return None
+        after = _rows_after(self.order, rows[-1]) if self.keyset else None
+        if after is None:
+            self.keyset = False
+            return self._query(self.where, self.offset)
+        return self._query({"AND": [self.where, after]} if self.where else after)
+
+
+def iter_table_pages(
+    table_id: str,
+    where: Optional[Dict[str, Any]] = None,
+    order_by: Optional[Dict[str, str]] = None,
+    page_size: int = 1000,
+    keyset_columns: Tuple[str, ...] = ("id",),
+    select: Optional[List[str]] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """ yield the rows matching where page by page, while the next page is fetched in the background """
+    cursor = _PageCursor(where, order_by, page_size, keyset_columns, select)
+    pool = ThreadPoolExecutor(max_workers=1)
+
+    def fetch(query):
+        # copy the context so polyapi.deadline() and polyCustom carry over into the worker thread
+        return pool.submit(contextvars.copy_context().run, lambda: _results(execute_query(table_id, "select", query)))
+
+    try:
+        page: Optional[Future] = fetch(cursor.first())
+        while page is not None:
+            rows = page.result()
+            query = cursor.next(rows)
+            page = fetch(query) if query else None
+            yield rows
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def iter_table_pages_async(
+    table_id: str,
+    where: Optional[Dict[str, Any]] = None,
+    order_by: Optional[Dict[str, str]] = None,
+    page_size: int = 1000,
+    keyset_columns: Tuple[str, ...] = ("id",),
+    select: Optional[List[str]] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """ async version of iter_table_pages, the next page is fetched while the current one is consumed """
+    cursor = _PageCursor(where, order_by, page_size, keyset_columns, select)
+
+    async def fetch(query):
+        return _results(await execute_query_async(table_id, "select", query))
+
+    page: "Optional[asyncio.Future[List[Dict[str, Any]]]]" = asyncio.ensure_future(fetch(cursor.first()))
+    try:
+        while page is not None:
+            rows = await page
+            query = cursor.next(rows)
+            page = asyncio.ensure_future(fetch(query)) if query else None
+            yield rows
+    finally:
+        if page is not None:
+            page.cancel()
+
+
+def iter_table_rows(
+    table_id: str,
+    where: Optional[Dict[str, Any]] = None,
+    order_by: Optional[Dict[str, str]] = None,
+    page_size: int = 1000,
+    keyset_columns: Tuple[str, ...] = ("id",),
+    select: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """ yield every row matching where, see iter_table_pages """
+    for rows in iter_table_pages(table_id, where, order_by, page_size, keyset_columns, select):
+        yield from rows
+
+
+async def iter_table_rows_async(
+    table_id: str,
+    where: Optional[Dict[str, Any]] = None,
+    order_by: Optional[Dict[str, str]] = None,
+    page_size: int = 1000,
+    keyset_columns: Tuple[str, ...] = ("id",),
+    select: Optional[List[str]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    pages = iter_table_pages_async(table_id, where, order_by, page_size, keyset_columns, select)
+    try:
+        async for rows in pages:
+            for row in rows:
+                yield row
+    finally:
+        # stops the prefetch right away when the caller breaks out early
+        await pages.aclose()
+
+
+def _column_kind(schema: Dict[str, Any]) -> str:
+    # "string", "integer", "number", "boolean" or "object" for anything compound or untyped
+    types = schema.get("type", "object")
+    if isinstance(types, list):
+        types = [t for t in types if t != "null"]
+        types = types[0] if len(types) == 1 else "object"
+    return types if types in ("string", "integer", "number", "boolean") else "object"
+
+
+def to_columns(rows: List[Dict[str, Any]], column_types: Dict[str, str]) -> Dict[str, List[Any]]:
+    """ {column: [values]} for the columns of column_types, missing values are None """
+    return {name: [row.get(name) for row in rows] for name in column_types}
+
+
+def _numpy_column(np: Any, values: List[Any], kind: str) -> Any:
+    has_nulls = None in values
+    if kind == "number" or (kind == "integer" and has_nulls):
+        # nulls become nan
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    if kind == "integer":
+        return np.array(values, dtype=np.int64)
+    if kind == "boolean" and not has_nulls:
+        return np.array(values, dtype=np.bool_)
+    # filled in place so list values stay objects instead of becoming another dimension
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def to_numpy(rows: List[Dict[str, Any]], column_types: Dict[str, str]) -> Dict[str, Any]:
+    """ {column: numpy array}, typed by column_types (requires numpy) """
+    import numpy as np  # type: ignore
+
+    return {name: _numpy_column(np, values, column_types[name]) for name, values in to_columns(rows, column_types).items()}
+
+
+_ARROW_TYPES = {"string": "string", "integer": "int64", "number": "float64", "boolean": "bool_"}
+
+
+def to_arrow(rows: List[Dict[str, Any]], column_types: Dict[str, str]) -> Any:
+    """ a pyarrow.Table typed by column_types (requires pyarrow), object columns are inferred """
+    import pyarrow as pa  # type: ignore
+
+    arrays = {}
+    for name, values in to_columns(rows, column_types).items():
+        kind = column_types[name]
+        arrays[name] = pa.array(values, type=getattr(pa, _ARROW_TYPES[kind])()) if kind in _ARROW_TYPES else pa.array(values)
+    return pa.table(arrays)
+
+
+_CONVERTERS = {"columns": to_columns, "numpy": to_numpy, "arrow": to_arrow}
+
+
+def columnar_results(rsp: Any, format: str, column_types: Dict[str, str], select: Optional[List[str]] = None) -> Any:
+    """ the rows of a select response as columns, numpy arrays or an arrow table, raises on errors
+
+    With select, only the selected columns are returned.
+    """
+    if format not in _CONVERTERS:
+        raise ValueError(f"format must be one of rows, {', '.join(_CONVERTERS)}, got {format!r}.")
+    if select:
+        column_types = {name: column_types[name] for name in select if name in column_types}
+    return _CONVERTERS[format](_results(rsp), column_types)
+
+
+def iter_table_batches(
+    table_id: str,
+    column_types: Dict[str, str],
+    where: Optional[Dict[str, Any]] = None,
+    order_by: Optional[Dict[str, str]] = None,
+    batch_size: int = 1000,
+    format: str = "columns",
+    keyset_columns: Tuple[str, ...] = ("id",),
+    select: Optional[List[str]] = None,
+) -> Iterator[Any]:
+    """ yield every matching row in batches converted to format, see columnar_results """
+    for rows in iter_table_pages(table_id, where, order_by, batch_size, keyset_columns, select):
+        yield columnar_results({"results": rows}, format, column_types, select)
+
+
+async def iter_table_batches_async(
+    table_id: str,
+    column_types: Dict[str, str],
+    where: Optional[Dict[str, Any]] = None,
+    order_by: Optional[Dict[str, str]] = None,
+    batch_size: int = 1000,
+    format: str = "columns",
+    keyset_columns: Tuple[str, ...] = ("id",),
+    select: Optional[List[str]] = None,
+) -> AsyncIterator[Any]:
+    pages = iter_table_pages_async(table_id, where, order_by, batch_size, keyset_columns, select)
+    try:
+        async for rows in pages:
+            yield columnar_results({"results": rows}, format, column_types, select)
+    finally:
+        await pages.aclose()
+
+
+@dataclass
+class BulkChunkError:
+    """A chunk the server rejected, with its rows so they can be retried."""
+
+    index: int
+    offset: int
+    rows: List[Dict[str, Any]]
+    error: BaseException
+
+
+@dataclass
+class BulkWriteResult:
+    """Totals of a bulk_insert/bulk_upsert: rows written, chunks sent and the chunks that failed."""
+
+    rows: int = 0
+    chunks: int = 0
+    failed: List[BulkChunkError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    @property
+    def failed_rows(self) -> int:
+        return sum(len(chunk.rows) for chunk in self.failed)
+
+
+def _chunked(rows: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def bulk_write_async(
+    table_id: str,
+    method: Literal["insert", "upsert"],
+    rows: Iterable[Dict[str, Any]],
+    chunk_size: int = 1000,
+    max_in_flight: int = 4,
+) -> BulkWriteResult:
+    """ insert or upsert any number of rows, chunk_size rows per request and max_in_flight requests at a time
+
+    rows is consumed lazily, so only the chunks in flight are held in memory. A failed chunk
+    doesn't stop the others, it is reported on BulkWriteResult.failed.
+    """
+    if not 0 < chunk_size <= 1000:
+        raise ValueError("chunk_size must be between 1 and 1000.")
+
+    async def write(chunk: List[Dict[str, Any]]) -> int:
+        return len(_results(await execute_query_async(table_id, method, {"data": chunk})))
+
+    result = BulkWriteResult()
+    async for chunk in imap_async(write, _chunked(rows, chunk_size), max_in_flight):
+        result.chunks += 1
+        if chunk.ok:
+            result.rows += chunk.value or 0
+        else:
+            result.failed.append(BulkChunkError(chunk.index, chunk.index * chunk_size, chunk.item, chunk.error))
+    result.failed.sort(key=lambda chunk: chunk.index)
+    return result
+
+
+def bulk_write(
+    table_id: str,
+    method: Literal["insert", "upsert"],
+    rows: Iterable[Dict[str, Any]],
+    chunk_size: int = 1000,
+    max_in_flight: int = 4,
+) -> BulkWriteResult:
+    """ sync version of bulk_write_async, runs on polyapi.concurrency's background loop """
+    coro = bulk_write_async(table_id, method, rows, chunk_size, max_in_flight)
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
+
 TABI_TABLE_TEMPLATE = """
 {table_name}Columns = Literal[{table_columns}]
 
@@ -162,12 +527,30 @@ class {table_name}SelectManyQuery(TypedDict):
     order_by: NotRequired[Dict[{table_name}Columns, SortOrder]]
     limit: NotRequired[int]
     offset: NotRequired[int]
+    select: NotRequired[List[{table_name}Columns]]
+
+
+
+class {table_name}SelectManyProjectedQuery(TypedDict):
+    select: List[{table_name}Columns]
+    where: NotRequired[{table_name}WhereFilter]
+    order_by: NotRequired[Dict[{table_name}Columns, SortOrder]]
+    limit: NotRequired[int]
+    offset: NotRequired[int]
 
 
 
 class {table_name}SelectOneQuery(TypedDict):
     where: NotRequired[{table_name}WhereFilter]
     order_by: NotRequired[Dict[{table_name}Columns, SortOrder]]
+    select: NotRequired[List[{table_name}Columns]]
+
+
+
+class {table_name}SelectOneProjectedQuery(TypedDict):
+    select: List[{table_name}Columns]
+    where: NotRequired[{table_name}WhereFilter]
+    order_by: NotRequired[Dict[{table_name}Columns, SortOrder]]
 
 
 
@@ -198,6 +581,13 @@ class {table_name}QueryResults(TypedDict):
 
 
 
+class {table_name}PartialQueryResults(TypedDict):
+    # rows of a query with select, only the selected columns are present
+    results: List[{table_name}Subset]
+    pagination: None
+
+
+
 class {table_name}CountQuery(TypedDict):
     where: NotRequired[{table_name}WhereFilter]
 
@@ -205,6 +595,7 @@ class {table_name}CountQuery(TypedDict):
 
 class {table_name}:{table_description}
     table_id = "{table_id}"
+    column_types = {column_types}
 
     @overload
     @staticmethod
@@ -223,15 +614,79 @@ class {table_name}:{table_description}
             query = kwargs
         return execute_query({table_name}.table_id, "count", transform_query(query))
 
+    @overload
+    @staticmethod
+    async def count_async(query: {table_name}CountQuery) -> PolyCountResult: ...
+    @overload
+    @staticmethod
+    async def count_async(*, where: Optional[{table_name}WhereFilter]) -> PolyCountResult: ...
+
+    @staticmethod
+    async def count_async(*args, **kwargs) -> PolyCountResult:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return await execute_query_async({table_name}.table_id, "count", transform_query(query))
+
+
+    @overload
+    @staticmethod
+    def select_many(query: {table_name}SelectManyProjectedQuery) -> {table_name}PartialQueryResults: ...
     @overload
     @staticmethod
     def select_many(query: {table_name}SelectManyQuery) -> {table_name}QueryResults: ...
     @overload
     @staticmethod
+    def select_many(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]], limit: Optional[int], offset: Optional[int], select: List[{table_name}Columns]) -> {table_name}PartialQueryResults: ...
+    @overload
+    @staticmethod
     def select_many(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]], limit: Optional[int], offset: Optional[int]) -> {table_name}QueryResults: ...
+    @overload
+    @staticmethod
+    def select_many(query: {table_name}SelectManyQuery, *, format: ColumnarFormat) -> Any: ...
+    @overload
+    @staticmethod
+    def select_many(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]], limit: Optional[int], offset: Optional[int], select: Optional[List[{table_name}Columns]] = None, format: ColumnarFormat) -> Any: ...
+
+    @staticmethod
+    def select_many(*args, format: TableFormat = "rows", **kwargs) -> Any:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        if query.get('limit') is None:
+            query['limit'] = 1000
+        if query['limit'] > 1000:
+            raise ValueError("Cannot select more than 1000 rows at a time.")
+        results = execute_query({table_name}.table_id, "select", transform_query(query))
+        return results if format == "rows" else columnar_results(results, format, {table_name}.column_types, query.get("select"))
 
+    @overload
+    @staticmethod
+    async def select_many_async(query: {table_name}SelectManyProjectedQuery) -> {table_name}PartialQueryResults: ...
+    @overload
+    @staticmethod
+    async def select_many_async(query: {table_name}SelectManyQuery) -> {table_name}QueryResults: ...
+    @overload
     @staticmethod
-    def select_many(*args, **kwargs) -> {table_name}QueryResults:
+    async def select_many_async(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]], limit: Optional[int], offset: Optional[int], select: List[{table_name}Columns]) -> {table_name}PartialQueryResults: ...
+    @overload
+    @staticmethod
+    async def select_many_async(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]], limit: Optional[int], offset: Optional[int]) -> {table_name}QueryResults: ...
+    @overload
+    @staticmethod
+    async def select_many_async(query: {table_name}SelectManyQuery, *, format: ColumnarFormat) -> Any: ...
+    @overload
+    @staticmethod
+    async def select_many_async(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]], limit: Optional[int], offset: Optional[int], select: Optional[List[{table_name}Columns]] = None, format: ColumnarFormat) -> Any: ...
+
+    @staticmethod
+    async def select_many_async(*args, format: TableFormat = "rows", **kwargs) -> Any:
         if args:
             if len(args) != 1 or not isinstance(args[0], dict):
                 raise TypeError("Expected query as a single argument or as kwargs")
@@ -242,13 +697,52 @@ class {table_name}:{table_description}
             query['limit'] = 1000
         if query['limit'] > 1000:
             raise ValueError("Cannot select more than 1000 rows at a time.")
-        return execute_query({table_name}.table_id, "select", transform_query(query))
+        results = await execute_query_async({table_name}.table_id, "select", transform_query(query))
+        return results if format == "rows" else columnar_results(results, format, {table_name}.column_types, query.get("select"))
 
+    @overload
+    @staticmethod
+    def iter_rows(*, where: Optional[{table_name}WhereFilter] = None, order_by: Optional[Dict[{table_name}Columns, SortOrder]] = None, page_size: int = 1000, select: None = None) -> Iterator[{table_name}Row]: ...
+    @overload
+    @staticmethod
+    def iter_rows(*, where: Optional[{table_name}WhereFilter] = None, order_by: Optional[Dict[{table_name}Columns, SortOrder]] = None, page_size: int = 1000, select: List[{table_name}Columns]) -> Iterator[{table_name}Subset]: ...
+
+    @staticmethod
+    def iter_rows(*, where: Optional[{table_name}WhereFilter] = None, order_by: Optional[Dict[{table_name}Columns, SortOrder]] = None, page_size: int = 1000, select: Optional[List[{table_name}Columns]] = None) -> Iterator[Any]:
+        \"""Yield every matching row, fetching page_size rows at a time (keyset paginated, next page prefetched).\"""
+        return iter_table_rows({table_name}.table_id, where, order_by, page_size, {keyset_columns}, select)  # type: ignore
+
+    @overload
+    @staticmethod
+    def iter_rows_async(*, where: Optional[{table_name}WhereFilter] = None, order_by: Optional[Dict[{table_name}Columns, SortOrder]] = None, page_size: int = 1000, select: None = None) -> AsyncIterator[{table_name}Row]: ...
+    @overload
+    @staticmethod
+    def iter_rows_async(*, where: Optional[{table_name}WhereFilter] = None, order_by: Optional[Dict[{table_name}Columns, SortOrder]] = None, page_size: int = 1000, select: List[{table_name}Columns]) -> AsyncIterator[{table_name}Subset]: ...
+
+    @staticmethod
+    def iter_rows_async(*, where: Optional[{table_name}WhereFilter] = None, order_by: Optional[Dict[{table_name}Columns, SortOrder]] = None, page_size: int = 1000, select: Optional[List[{table_name}Columns]] = None) -> AsyncIterator[Any]:
+        return iter_table_rows_async({table_name}.table_id, where, order_by, page_size, {keyset_columns}, select)  # type: ignore
+
+    @staticmethod
+    def iter_batches(*, where: Optional[{table_name}WhereFilter] = None, order_by: Optional[Dict[{table_name}Columns, SortOrder]] = None, batch_size: int = 1000, format: ColumnarFormat = "columns", select: Optional[List[{table_name}Columns]] = None) -> Iterator[Any]:
+        \"""Like iter_rows, but yields each page as columns, numpy arrays or a pyarrow Table.\"""
+        return iter_table_batches({table_name}.table_id, {table_name}.column_types, where, order_by, batch_size, format, {keyset_columns}, select)  # type: ignore
+
+    @staticmethod
+    def iter_batches_async(*, where: Optional[{table_name}WhereFilter] = None, order_by: Optional[Dict[{table_name}Columns, SortOrder]] = None, batch_size: int = 1000, format: ColumnarFormat = "columns", select: Optional[List[{table_name}Columns]] = None) -> AsyncIterator[Any]:
+        return iter_table_batches_async({table_name}.table_id, {table_name}.column_types, where, order_by, batch_size, format, {keyset_columns}, select)  # type: ignore
+
+    @overload
+    @staticmethod
+    def select_one(query: {table_name}SelectOneProjectedQuery) -> {table_name}Subset: ...
     @overload
     @staticmethod
     def select_one(query: {table_name}SelectOneQuery) -> {table_name}Row: ...
     @overload
     @staticmethod
+    def select_one(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]], select: List[{table_name}Columns]) -> {table_name}Subset: ...
+    @overload
+    @staticmethod
     def select_one(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]]) -> {table_name}Row: ...
 
     @staticmethod
@@ -262,6 +756,30 @@ class {table_name}:{table_description}
         query['limit'] = 1
         return first_result(execute_query({table_name}.table_id, "select", transform_query(query)))
 
+    @overload
+    @staticmethod
+    async def select_one_async(query: {table_name}SelectOneProjectedQuery) -> {table_name}Subset: ...
+    @overload
+    @staticmethod
+    async def select_one_async(query: {table_name}SelectOneQuery) -> {table_name}Row: ...
+    @overload
+    @staticmethod
+    async def select_one_async(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]], select: List[{table_name}Columns]) -> {table_name}Subset: ...
+    @overload
+    @staticmethod
+    async def select_one_async(*, where: Optional[{table_name}WhereFilter], order_by: Optional[Dict[{table_name}Columns, SortOrder]]) -> {table_name}Row: ...
+
+    @staticmethod
+    async def select_one_async(*args, **kwargs) -> {table_name}Row:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        query['limit'] = 1
+        return first_result(await execute_query_async({table_name}.table_id, "select", transform_query(query)))
+
     @overload
     @staticmethod
     def insert_many(query: {table_name}InsertManyQuery) -> {table_name}QueryResults: ...
@@ -281,6 +799,25 @@ class {table_name}:{table_description}
             raise ValueError("Cannot insert more than 1000 rows at a time.")
         return execute_query({table_name}.table_id, "insert", query)
 
+    @overload
+    @staticmethod
+    async def insert_many_async(query: {table_name}InsertManyQuery) -> {table_name}QueryResults: ...
+    @overload
+    @staticmethod
+    async def insert_many_async(*, data: List[{table_name}Subset]) -> {table_name}QueryResults: ...
+
+    @staticmethod
+    async def insert_many_async(*args, **kwargs) -> {table_name}QueryResults:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        if len(query['data']) > 1000:
+            raise ValueError("Cannot insert more than 1000 rows at a time.")
+        return await execute_query_async({table_name}.table_id, "insert", query)
+
     @overload
     @staticmethod
     def insert_one(query: {table_name}InsertOneQuery) -> {table_name}Row: ...
@@ -298,6 +835,23 @@ class {table_name}:{table_description}
             query = kwargs
         return first_result(execute_query({table_name}.table_id, "insert", {{ 'data': [query['data']] }}))
 
+    @overload
+    @staticmethod
+    async def insert_one_async(query: {table_name}InsertOneQuery) -> {table_name}Row: ...
+    @overload
+    @staticmethod
+    async def insert_one_async(*, data: {table_name}Subset) -> {table_name}Row: ...
+
+    @staticmethod
+    async def insert_one_async(*args, **kwargs) -> {table_name}Row:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return first_result(await execute_query_async({table_name}.table_id, "insert", {{ 'data': [query['data']] }}))
+
     @overload
     @staticmethod
     def upsert_many(query: {table_name}InsertManyQuery) -> {table_name}QueryResults: ...
@@ -313,10 +867,47 @@ class {table_name}:{table_description}
             query = args[0]
         else:
             query = kwargs
-        if len(data) > 1000:
+        if len(query['data']) > 1000:
             raise ValueError("Cannot upsert more than 1000 rows at a time.")
         return execute_query({table_name}.table_id, "upsert", query)
 
+    @overload
+    @staticmethod
+    async def upsert_many_async(query: {table_name}InsertManyQuery) -> {table_name}QueryResults: ...
+    @overload
+    @staticmethod
+    async def upsert_many_async(*, data: List[{table_name}Subset]) -> {table_name}QueryResults: ...
+
+    @staticmethod
+    async def upsert_many_async(*args, **kwargs) -> {table_name}QueryResults:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        if len(query['data']) > 1000:
+            raise ValueError("Cannot upsert more than 1000 rows at a time.")
+        return await execute_query_async({table_name}.table_id, "upsert", query)
+
+    @staticmethod
+    def bulk_insert(rows: Iterable[{table_name}Subset], chunk_size: int = 1000, max_in_flight: int = 4) -> BulkWriteResult:
+        \"""Insert any number of rows, chunk_size per request and max_in_flight requests at a time. Failed chunks are reported, not raised.\"""
+        return bulk_write({table_name}.table_id, "insert", rows, chunk_size, max_in_flight)  # type: ignore
+
+    @staticmethod
+    async def bulk_insert_async(rows: Iterable[{table_name}Subset], chunk_size: int = 1000, max_in_flight: int = 4) -> BulkWriteResult:
+        return await bulk_write_async({table_name}.table_id, "insert", rows, chunk_size, max_in_flight)  # type: ignore
+
+    @staticmethod
+    def bulk_upsert(rows: Iterable[{table_name}Subset], chunk_size: int = 1000, max_in_flight: int = 4) -> BulkWriteResult:
+        \"""Upsert any number of rows, chunk_size per request and max_in_flight requests at a time. Failed chunks are reported, not raised.\"""
+        return bulk_write({table_name}.table_id, "upsert", rows, chunk_size, max_in_flight)  # type: ignore
+
+    @staticmethod
+    async def bulk_upsert_async(rows: Iterable[{table_name}Subset], chunk_size: int = 1000, max_in_flight: int = 4) -> BulkWriteResult:
+        return await bulk_write_async({table_name}.table_id, "upsert", rows, chunk_size, max_in_flight)  # type: ignore
+
     @overload
     @staticmethod
     def upsert_one(query: {table_name}InsertOneQuery) -> {table_name}Row: ...
@@ -334,6 +925,23 @@ class {table_name}:{table_description}
             query = kwargs
         return first_result(execute_query({table_name}.table_id, "upsert", {{ 'data': [query['data']] }}))
 
+    @overload
+    @staticmethod
+    async def upsert_one_async(query: {table_name}InsertOneQuery) -> {table_name}Row: ...
+    @overload
+    @staticmethod
+    async def upsert_one_async(*, data: {table_name}Subset) -> {table_name}Row: ...
+
+    @staticmethod
+    async def upsert_one_async(*args, **kwargs) -> {table_name}Row:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return first_result(await execute_query_async({table_name}.table_id, "upsert", {{ 'data': [query['data']] }}))
+
     @overload
     @staticmethod
     def update_many(query: {table_name}UpdateManyQuery) -> {table_name}QueryResults: ...
@@ -351,6 +959,23 @@ class {table_name}:{table_description}
             query = kwargs
         return execute_query({table_name}.table_id, "update", transform_query(query))
 
+    @overload
+    @staticmethod
+    async def update_many_async(query: {table_name}UpdateManyQuery) -> {table_name}QueryResults: ...
+    @overload
+    @staticmethod
+    async def update_many_async(*, where: Optional[{table_name}WhereFilter], data: {table_name}Subset) -> {table_name}QueryResults: ...
+
+    @staticmethod
+    async def update_many_async(*args, **kwargs) -> {table_name}QueryResults:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return await execute_query_async({table_name}.table_id, "update", transform_query(query))
+
     @overload
     @staticmethod
     def update_one(id: str, query: {table_name}UpdateManyQuery) -> {table_name}Row: ...
@@ -375,6 +1000,30 @@ class {table_name}:{table_description}
             query.pop("id", None)
         return first_result(execute_query({table_name}.table_id, "update", transform_query(query)))
 
+    @overload
+    @staticmethod
+    async def update_one_async(id: str, query: {table_name}UpdateManyQuery) -> {table_name}Row: ...
+    @overload
+    @staticmethod
+    async def update_one_async(*, id: str, where: Optional[{table_name}WhereFilter], data: {table_name}Subset) -> {table_name}Row: ...
+
+    @staticmethod
+    async def update_one_async(*args, **kwargs) -> {table_name}Row:
+        if args:
+            if len(args) != 2 or not isinstance(args[0], str) or not isinstance(args[1], dict):
+                raise TypeError("Expected id and query as arguments or as kwargs")
+            query = args[1]
+            if not isinstance(query["where"], dict):
+                query["where"] = {{}}
+            query["where"]["id"] = args[0]
+        else:
+            query = kwargs
+            if not isinstance(query["where"], dict):
+                query["where"] = {{}}
+            query["where"]["id"] = kwargs["id"]
+            query.pop("id", None)
+        return first_result(await execute_query_async({table_name}.table_id, "update", transform_query(query)))
+
     @overload
     @staticmethod
     def delete_many(query: {table_name}DeleteQuery) -> PolyDeleteResults: ...
@@ -392,6 +1041,23 @@ class {table_name}:{table_description}
             query = kwargs
         return execute_query({table_name}.table_id, "delete", transform_query(query))
 
+    @overload
+    @staticmethod
+    async def delete_many_async(query: {table_name}DeleteQuery) -> PolyDeleteResults: ...
+    @overload
+    @staticmethod
+    async def delete_many_async(*, where: Optional[{table_name}WhereFilter]) -> PolyDeleteResults: ...
+
+    @staticmethod
+    async def delete_many_async(*args, **kwargs) -> PolyDeleteResults:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return await execute_query_async({table_name}.table_id, "delete", transform_query(query))
+
     @overload
     @staticmethod
     def delete_one(query: {table_name}DeleteQuery) -> PolyDeleteResult: ...
@@ -415,6 +1081,30 @@ class {table_name}:{table_description}
             query["where"]["id"] = kwargs["id"]
             query.pop("id", None)
         return delete_one_response(execute_query({table_name}.table_id, "delete", transform_query(query)))
+
+    @overload
+    @staticmethod
+    async def delete_one_async(query: {table_name}DeleteQuery) -> PolyDeleteResult: ...
+    @overload
+    @staticmethod
+    async def delete_one_async(*, where: Optional[{table_name}WhereFilter]) -> PolyDeleteResult: ...
+
+    @staticmethod
+    async def delete_one_async(*args, **kwargs) -> PolyDeleteResult:
+        if args:
+            if len(args) != 2 or not isinstance(args[0], str) or not isinstance(args[1], dict):
+                raise TypeError("Expected id and query as arguments or as kwargs")
+            query = args[1]
+            if not isinstance(query["where"], dict):
+                query["where"] = {{}}
+            query["where"]["id"] = args[0]
+        else:
+            query = kwargs
+            if not isinstance(query["where"], dict):
+                query["where"] = {{}}
+            query["where"]["id"] = kwargs["id"]
+            query.pop("id", None)
+        return delete_one_response(await execute_query_async({table_name}.table_id, "delete", transform_query(query)))
 """
 
 
@@ -531,6 +1221,14 @@ def _render_table(table: TableSpecDto) -> str:
     table_where_class = _render_table_where_class(
         table["name"], columns, required_columns
     )
+    # columns that can't be null or compound, so rows can be paged by seeking past their values.
+    # Booleans are left out, their filters only support equals/not, so there is no gt to seek with
+    keyset_columns = tuple(
+        name
+        for name, schema in columns
+        if name in required_columns and schema.get("type") in ("string", "integer", "number")
+    )
+    column_types = {name: _column_kind(schema) for name, schema in columns}
     raw_description = table.get("description", "")
 
     def _flatten_description(value: Any) -> List[str]:
@@ -565,6 +1263,8 @@ def _render_table(table: TableSpecDto) -> str:
         table_row_classes=table_row_classes,
         table_row_subset_class=table_row_subset_class,
         table_where_class=table_where_class,
+        keyset_columns=keyset_columns,
+        column_types=column_types,
     )
 
 
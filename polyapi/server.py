@@ -38,6 +38,73 @@ async def {function_name}_async(
         return resp.text  # type: ignore # fallback for debugging
 
 
+def {function_name}_batch(
+    calls: List[Dict[str, Any]],
+    max_in_flight: int = 10,
+) -> List[{return_type_name}]:
+    \"""Call {function_name} once per dict of keyword arguments in calls,
+    running at most max_in_flight at a time. Results keep the order of calls.
+    Unknown or missing required arguments raise TypeError before anything is sent.
+
+    Function ID: {function_id}
+    \"""
+    resps = execute_many([("{function_type}", "{function_id}", {batch_data}) for call in bind_batch_calls({function_name}, calls)], max_in_flight)
+    results = []
+    for resp in resps:
+        try:
+            results.append({return_action})
+        except:
+            results.append(resp.text)  # type: ignore # fallback for debugging
+    return results
+
+
+async def {function_name}_batch_async(
+    calls: List[Dict[str, Any]],
+    max_in_flight: int = 10,
+) -> List[{return_type_name}]:
+    \"""Call {function_name} once per dict of keyword arguments in calls,
+    running at most max_in_flight at a time. Results keep the order of calls.
+    Unknown or missing required arguments raise TypeError before anything is sent.
+
+    Function ID: {function_id}
+    \"""
+    resps = await execute_many_async([("{function_type}", "{function_id}", {batch_data}) for call in bind_batch_calls({function_name}, calls)], max_in_flight)
+    results = []
+    for resp in resps:
+        try:
+            results.append({return_action})
+        except:
+            results.append(resp.text)  # type: ignore # fallback for debugging
+    return results
+
+
+def {function_name}_stream(
+{args}
+) -> ResponseStream:
+    \"""Like {function_name}, but streams the result instead of buffering it,
+    e.g. `with {function_name}_stream(...) as stream: for item in stream.iter_items(): ...`
+
+    Function ID: {function_id}
+    \"""
+    return execute_stream("{function_type}", "{function_id}", {data})
+
+
+def {function_name}_stream_async(
+{args}
+) -> AsyncResponseStream:
+    \"""Like {function_name}_async, but streams the result instead of buffering it,
+    e.g. `async with {function_name}_stream_async(...) as stream: async for item in stream.iter_items(): ...`
+
+    Function ID: {function_id}
+    \"""
+    return execute_stream_async("{function_type}", "{function_id}", {data})
+
+
+# lets polyapi.execute.enable_result_cache({function_name}) find the function
+{function_name}.function_id = "{function_id}"  # type: ignore[attr-defined]
+{function_name}_async.function_id = "{function_id}"  # type: ignore[attr-defined]
+
+
 """
 
 
@@ -57,6 +124,7 @@ def render_server_function(
         return_type_def = ""
 
     data = "{" + ", ".join([f"'{arg}': {rewrite_arg_name(arg)}" for arg in arg_names]) + "}"
+    batch_data = "{" + ", ".join([f"'{arg}': call['{rewrite_arg_name(arg)}']" for arg in arg_names]) + "}"
     func_type_defs = SERVER_DEFS_TEMPLATE.format(
         args_def=args_def,
         return_type_def=return_type_def,
@@ -70,6 +138,7 @@ def render_server_function(
         args=args,
         return_action=_get_server_return_action(return_type_name),
         data=data,
+        batch_data=batch_data,
     )
     return func_str, func_type_defs
 
@@ -90,7 +159,7 @@ def _get_server_return_action(return_type_name: str) -> str:
         if union_parts == {"str", "None"}:
             return_action = "resp.text"
         else:
-            return_action = "resp.json()"
+            return_action = "decode_response(resp)"
     else:
-        return_action = "resp.json()"
+        return_action = "decode_response(resp)"
     return return_action
@@ -0,0 +1,411 @@
+import codecs
+import json
+import os
+import re
+from typing import IO, Any, AsyncIterator, Awaitable, Callable, Iterator, List, Tuple, Union
+
+import httpx
+
+from polyapi import codec
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# what may follow a number that is still being received, e.g. "2" then ".5" or "3" then "e2"
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+
+# a file path, or a binary file object opened for writing
+DownloadTarget = Union[str, "os.PathLike[str]", IO[bytes]]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class JsonArrayParser:
+    """ push parser that yields the items of a JSON array as its text arrives
+
+    Parses a top-level array, or with key the array under that key of a top-level object.
+    Only one item is buffered at a time, so memory stays flat however long the array is.
+    Anything after the array is ignored.
+    """
+
+    def __init__(self, key: str | None = None) -> None:
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._current_key: str | None = None
+        # unconsumed length needed before a failed decode is retried, keeps big items linear
+        self._retry_at = 0
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, text: str, final: bool = False) -> List[Any]:
+        if self.done:
+            return []
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        items: List[Any] = []
+        while self._step(items, final):
+            pass
+        if final and not self.done:
+            raise ValueError("JSON ended before the array was complete")
+        return items
+
+    def _peek(self) -> str | None:
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()  # type: ignore
+        return self._buf[self._pos] if self._pos < len(self._buf) else None
+
+    def _expect(self, char: str, allowed: str, consume: bool = True) -> None:
+        if char not in allowed:
+            raise ValueError(f"unexpected {char!r} while looking for {' or '.join(allowed)}")
+        if consume:
+            self._pos += 1
+
+    def _decode(self, final: bool) -> Tuple[Any] | None:
+        # raw_decode doesn't skip leading whitespace
+        self._peek()
+        pending = len(self._buf) - self._pos
+        if not final and pending < self._retry_at:
+            return None
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            self._retry_at = 2 * pending
+            return None
+        if not final and _is_number(value) and _NUMBER_TAIL.match(self._buf, end):
+            # a number running up to the end of the buffer may still be missing digits
+            self._retry_at = pending + 1
+            return None
+        self._retry_at = 0
+        self._pos = end
+        return (value,)
+
+    def _step(self, items: List[Any], final: bool) -> bool:
+        state = self._state
+        if state == "done":
+            return False
+
+        if state == "item":
+            decoded = self._decode(final)
+            if decoded is None:
+                return False
+            items.append(decoded[0])
+            self._state = "item_sep"
+            return True
+
+        if state == "value" and self._current_key != self.key:
+            decoded = self._decode(final)
+            if decoded is None:
+                return False
+            self._state = "member_sep"
+            return True
+
+        char = self._peek()
+        if char is None:
+            return False
+
+        if state == "start":
+            self._expect(char, "[" if self.key is None else "{")
+            self._state = "first_item" if self.key is None else "first_key"
+        elif state in ("first_key", "key"):
+            if state == "first_key" and char == "}":
+                raise ValueError(f"no {self.key!r} key in the JSON object")
+            self._expect(char, '"', consume=False)
+            decoded = self._decode(final)
+            if decoded is None:
+                return False
+            self._current_key = decoded[0]
+            self._state = "colon"
+        elif state == "colon":
+            self._expect(char, ":")
+            self._state = "value"
+        elif state == "value":
+            self._expect(char, "[")
+            self._state = "first_item"
+        elif state == "member_sep":
+            self._expect(char, ",}")
+            if char == "}":
+                raise ValueError(f"no {self.key!r} key in the JSON object")
+            self._state = "key"
+        elif state == "first_item":
+            if char == "]":
+                self._pos += 1
+                self._state = "done"
+            else:
+                self._state = "item"
+        elif state == "item_sep":
+            self._expect(char, ",]")
+            self._state = "item" if char == "," else "done"
+        return True
+
+
+class _BufferWriter:
+    """ copies chunks into a caller-provided buffer, each byte is written exactly once """
+
+    def __init__(self, buffer: Any, headers: httpx.Headers) -> None:
+        self.view = memoryview(buffer).cast("B")
+        self.offset = 0
+        # with a Content-Encoding, Content-Length is the compressed size, not what gets written
+        content_length = headers.get("Content-Length")
+        if content_length is not None and "Content-Encoding" not in headers and int(content_length) > len(self.view):
+            raise ValueError(f"response body is {content_length} bytes, the buffer only holds {len(self.view)}")
+
+    def write(self, chunk: bytes) -> None:
+        end = self.offset + len(chunk)
+        if end > len(self.view):
+            raise ValueError(f"response body is larger than the buffer ({len(self.view)} bytes)")
+        self.view[self.offset:end] = chunk
+        self.offset = end
+
+
+def _part_path(destination: Any) -> str:
+    # written next to the destination and renamed when complete, so a failed download never looks finished
+    return os.fspath(destination) + ".part"
+
+
+def _records(lines: Iterator[str]) -> Iterator[Any]:
+    for line in lines:
+        if line.strip():
+            yield codec.loads(line)
+
+
+class ResponseStream:
+    """ a function result read incrementally instead of buffered in memory
+
+    Use it as a context manager, or just iterate it once, which closes it at the end.
+
+        with poly.myContext.myFunction_stream(...) as stream:
+            for row in stream.iter_items():
+                ...
+    """
+
+    def __init__(self, open_response: Callable[[], httpx.Response]) -> None:
+        self._open_response = open_response
+        self._response: httpx.Response | None = None
+
+    def open(self) -> httpx.Response:
+        """ send the request if it wasn't yet and return the underlying httpx response """
+        if self._response is None:
+            self._response = self._open_response()
+        return self._response
+
+    @property
+    def response(self) -> httpx.Response:
+        return self.open()
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self.response.headers
+
+    def __enter__(self) -> "ResponseStream":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._response is not None:
+            self._response.close()
+
+    def _closing(self, iterator: Iterator[Any]) -> Iterator[Any]:
+        try:
+            yield from iterator
+        finally:
+            self.close()
+
+    def iter_bytes(self, chunk_size: int | None = None) -> Iterator[bytes]:
+        """ raw body chunks, decompressed """
+        return self._closing(self.response.iter_bytes(chunk_size))
+
+    def iter_lines(self) -> Iterator[str]:
+        return self._closing(self.response.iter_lines())
+
+    def iter_records(self) -> Iterator[Any]:
+        """ one decoded value per line of a newline-delimited JSON (NDJSON) body """
+        return self._closing(_records(self.response.iter_lines()))
+
+    def iter_items(self, key: str | None = None, chunk_size: int | None = None) -> Iterator[Any]:
+        """ items of a JSON array body (or of the array under key), decoded one at a time """
+        return self._closing(self._iter_items(key, chunk_size))
+
+    def _iter_items(self, key: str | None, chunk_size: int | None) -> Iterator[Any]:
+        parser = JsonArrayParser(key)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        for chunk in self.response.iter_bytes(chunk_size):
+            yield from parser.feed(decoder.decode(chunk))
+            if parser.done:
+                return
+        yield from parser.feed(decoder.decode(b"", final=True), final=True)
+
+    def download(self, destination: DownloadTarget) -> int:
+        """ write the body to a file path or binary file object as it arrives, returns the bytes written
+
+        Chunks go straight from the connection to the file, the body is never held in memory.
+        A path is written as path + ".part" and only renamed to path once the body is complete.
+        """
+        if not isinstance(destination, (str, os.PathLike)):
+            return self._write_body(destination.write)
+        part = _part_path(destination)
+        try:
+            with open(part, "wb") as f:
+                written = self._write_body(f.write)
+            os.replace(part, destination)
+        except BaseException:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+        return written
+
+    def readinto(self, buffer: Any) -> int:
+        """ copy the body into a preallocated bytearray, memoryview or other writable buffer
+
+        Returns the number of bytes read. Raises ValueError if the body doesn't fit.
+        """
+        try:
+            writer = _BufferWriter(buffer, self.headers)
+        except ValueError:
+            self.close()
+            raise
+        return self._write_body(writer.write)
+
+    def _write_body(self, write: Callable[[bytes], Any]) -> int:
+        written = 0
+        try:
+            # chunk_size=None hands over chunks as received, without re-chunking copies
+            for chunk in self.response.iter_bytes():
+                write(chunk)
+                written += len(chunk)
+        finally:
+            self.close()
+        return written
+
+    def read(self) -> bytes:
+        """ the whole body, for when it turns out to be small after all """
+        try:
+            return self.response.read()
+        finally:
+            self.close()
+
+
+class AsyncResponseStream:
+    """ async twin of ResponseStream
+
+        async with poly.myContext.myFunction_stream_async(...) as stream:
+            async for row in stream.iter_items():
+                ...
+    """
+
+    def __init__(self, open_response: Callable[[], Awaitable[httpx.Response]]) -> None:
+        self._open_response = open_response
+        self._response: httpx.Response | None = None
+
+    async def open(self) -> httpx.Response:
+        """ send the request if it wasn't yet and return the underlying httpx response """
+        if self._response is None:
+            self._response = await self._open_response()
+        return self._response
+
+    @property
+    def response(self) -> httpx.Response:
+        if self._response is None:
+            raise RuntimeError("stream is not open yet, use 'async with' or await open()")
+        return self._response
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self.response.headers
+
+    async def __aenter__(self) -> "AsyncResponseStream":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._response is not None:
+            await self._response.aclose()
+
+    async def iter_bytes(self, chunk_size: int | None = None) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in (await self.open()).aiter_bytes(chunk_size):
+                yield chunk
+        finally:
+            await self.aclose()
+
+    async def iter_lines(self) -> AsyncIterator[str]:
+        try:
+            async for line in (await self.open()).aiter_lines():
+                yield line
+        finally:
+            await self.aclose()
+
+    async def iter_records(self) -> AsyncIterator[Any]:
+        async for line in self.iter_lines():
+            if line.strip():
+                yield codec.loads(line)
+
+    async def iter_items(self, key: str | None = None, chunk_size: int | None = None) -> AsyncIterator[Any]:
+        parser = JsonArrayParser(key)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        async for chunk in self.iter_bytes(chunk_size):
+            for item in parser.feed(decoder.decode(chunk)):
+                yield item
+            if parser.done:
+                await self.aclose()
+                return
+        for item in parser.feed(decoder.decode(b"", final=True), final=True):
+            yield item
+
+    async def download(self, destination: DownloadTarget) -> int:
+        """ like ResponseStream.download, file writes are plain blocking writes of each chunk """
+        if not isinstance(destination, (str, os.PathLike)):
+            return await self._write_body(destination.write)
+        part = _part_path(destination)
+        try:
+            with open(part, "wb") as f:
+                written = await self._write_body(f.write)
+            os.replace(part, destination)
+        except BaseException:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+        return written
+
+    async def readinto(self, buffer: Any) -> int:
+        try:
+            writer = _BufferWriter(buffer, (await self.open()).headers)
+        except ValueError:
+            await self.aclose()
+            raise
+        return await self._write_body(writer.write)
+
+    async def _write_body(self, write: Callable[[bytes], Any]) -> int:
+        written = 0
+        try:
+            async for chunk in (await self.open()).aiter_bytes():
+                write(chunk)
+                written += len(chunk)
+        finally:
+            await self.aclose()
+        return written
+
+    async def read(self) -> bytes:
+        try:
+            return await (await self.open()).aread()
+        finally:
+            await self.aclose()
@@ -128,6 +128,10 @@ QueryMode = Literal["default", "insensitive"]
 
 SortOrder = Literal["asc", "desc"]
 
+# rows: the usual list of row dicts, the others are columnar, see poly_tables.columnar_results
+ColumnarFormat = Literal["columns", "numpy", "arrow"]
+TableFormat = Literal["rows", "columns", "numpy", "arrow"]
+
 # Using functional form because of use of reserved keywords
 StringFilter = TypedDict("StringFilter", {
     "equals": NotRequired[str],
@@ -16,7 +16,7 @@ from polyapi.schema import (
 
 # this string should be in every __init__ file.
 # it contains all the imports needed for the function or variable code to run
-CODE_IMPORTS = "from typing import List, Dict, Any, Optional, Callable\nfrom typing_extensions import TypedDict, NotRequired\nimport logging\nimport requests\nimport socketio  # type: ignore\nfrom polyapi.config import get_api_key_and_url, get_direct_execute_config\nfrom polyapi.execute import execute, execute_async, execute_post, execute_post_async, variable_get, variable_get_async, variable_update, variable_update_async, direct_execute, direct_execute_async\n\n"
+CODE_IMPORTS = "from typing import List, Dict, Any, Optional, Callable\nfrom typing_extensions import TypedDict, NotRequired\nimport logging\nimport requests\nimport socketio  # type: ignore\nfrom polyapi.config import get_api_key_and_url, get_direct_execute_config\nfrom polyapi.codec import decode_response\nfrom polyapi.execute import execute, execute_async, execute_many, execute_many_async, bind_batch_calls, execute_post, execute_post_async, execute_stream, execute_stream_async, variable_get, variable_get_async, variable_update, variable_update_async, direct_execute, direct_execute_async, direct_execute_stream, direct_execute_stream_async\nfrom polyapi.streaming import ResponseStream, AsyncResponseStream, DownloadTarget\n\n"
 
 
 def init_the_init(full_path: str, code_imports: Optional[str] = None) -> None:
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Set
+
+from polyapi.config import get_execution_context
+
+logger = logging.getLogger("poly")
+
+NAMESPACE = "/events"
+
+
+def _client_id() -> str:
+    try:
+        from polyapi.poly.client_id import client_id  # type: ignore
+
+        return client_id
+    except ImportError:
+        # not generated yet, any id unique to this process will do
+        return uuid.uuid4().hex
+
+
+def _new_socket() -> Any:
+    import socketio  # type: ignore
+
+    return socketio.AsyncClient()
+
+
+class VariableChangeSubscriber:
+    """ one shared socket.io connection relaying change events for any number of variables
+
+    subscribe() is thread-safe and returns right away. Connecting and registering happen on
+    polyapi.concurrency's background loop. on_change(variable_id) runs for every change event,
+    on_disconnect() whenever the connection drops and events may have been missed.
+    Registrations are renewed after the client reconnects.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[str], None],
+        on_disconnect: Callable[[], None],
+        socket_factory: Callable[[], Any] = _new_socket,
+    ) -> None:
+        self.on_change = on_change
+        self.on_disconnect = on_disconnect
+        self._socket_factory = socket_factory
+        self._socket: Any = None
+        self._connecting: "asyncio.Future[Any] | None" = None
+        self._variables: Set[str] = set()
+        self._lock = threading.Lock()
+        self._client_id = _client_id()
+
+    def subscribe(self, variable_id: str) -> None:
+        with self._lock:
+            if variable_id in self._variables:
+                return
+            self._variables.add(variable_id)
+        # imported here, concurrency imports http_client which imports config
+        from polyapi.concurrency import _get_background_loop
+
+        asyncio.run_coroutine_threadsafe(self._subscribe(variable_id), _get_background_loop())
+
+    @property
+    def variables(self) -> Set[str]:
+        with self._lock:
+            return set(self._variables)
+
+    async def _subscribe(self, variable_id: str) -> None:
+        try:
+            socket = await self._connect()
+            await self._register(socket, variable_id)
+        except Exception as e:
+            logger.debug(f"could not subscribe to changes of variable {variable_id}: {e}")
+            # the next cached read tries again, until then the cache ttl bounds staleness
+            with self._lock:
+                self._variables.discard(variable_id)
+
+    async def _connect(self) -> Any:
+        if self._socket is not None:
+            return self._socket
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._open())
+        try:
+            return await asyncio.shield(self._connecting)
+        except Exception:
+            self._connecting = None
+            raise
+
+    async def _open(self) -> Any:
+        socket = self._socket_factory()
+        connected_once = False
+
+        async def on_connect():
+            nonlocal connected_once
+            if connected_once:
+                for variable_id in self.variables:
+                    await self._register(socket, variable_id)
+            connected_once = True
+
+        def on_disconnect(*args):
+            self.on_disconnect()
+
+        socket.on("connect", on_connect, namespace=NAMESPACE)
+        socket.on("disconnect", on_disconnect, namespace=NAMESPACE)
+        await socket.connect(get_execution_context().base_url, transports=["websocket"], namespaces=[NAMESPACE])
+        self._socket = socket
+        return socket
+
+    async def _register(self, socket: Any, variable_id: str) -> None:
+        # handler first, so an event racing the registration isn't lost
+        socket.on(f"handleVariableChangeEvent:{variable_id}", lambda *args: self.on_change(variable_id), namespace=NAMESPACE)
+        await socket.emit("registerVariableChangeEventHandler", {
+            "clientID": self._client_id,
+            "variableId": variable_id,
+            "apiKey": get_execution_context().api_key,
+        }, namespace=NAMESPACE)
+
+    async def aclose(self) -> None:
+        socket, self._socket, self._connecting = self._socket, None, None
+        with self._lock:
+            self._variables.clear()
+        if socket is not None:
+            await socket.disconnect()
@@ -1,12 +1,16 @@
 import os
+import sys
 import logging
 import tempfile
 import shutil
-from typing import List
+from types import ModuleType
+from typing import Any, Dict, Iterable, List
 
+from polyapi.concurrency import DEFAULT_MAX_IN_FLIGHT
+from polyapi.execute import variable_get_many, variable_get_many_async
 from polyapi.schema import map_primitive_types
 from polyapi.typedefs import PropertyType, VariableSpecDto, Secrecy
-from polyapi.utils import add_import_to_init, init_the_init
+from polyapi.utils import CODE_IMPORTS, add_import_to_init, init_the_init
 
 
 # GET is only included if the variable is not SECRET
@@ -33,12 +37,12 @@ class {variable_name}:{get_method}
     @staticmethod
     def update(value: {variable_type}):
         resp = variable_update("{variable_id}", value)
-        return resp.json()
+        return decode_response(resp)
 
     @staticmethod
     async def update_async(value: {variable_type}):
         resp = await variable_update_async("{variable_id}", value)
-        return resp.json()
+        return decode_response(resp)
 
     @classmethod
     async def onUpdate(cls, callback):
@@ -79,6 +83,67 @@ class {variable_name}:{get_method}
 """
 
 
+# every generated vari package can warm all its variables at once
+VARI_CODE_IMPORTS = CODE_IMPORTS + """from polyapi.variables import prefetch_context, prefetch_context_async
+
+
+def prefetch(recursive: bool = True) -> Dict[str, Any]:
+    \"""read every variable of this context (and its subcontexts) in one go, returns {variable_id: value}\"""
+    return prefetch_context(__name__, recursive)
+
+
+async def prefetch_async(recursive: bool = True) -> Dict[str, Any]:
+    return await prefetch_context_async(__name__, recursive)
+
+
+"""
+
+
+def _values(responses: Dict[str, Any]) -> Dict[str, Any]:
+    # same value as the generated get(), exceptions (with return_exceptions) pass through
+    return {variable_id: getattr(resp, "text", resp) for variable_id, resp in responses.items()}
+
+
+def get_many(
+    variable_ids: Iterable[str],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    return_exceptions: bool = False,
+) -> Dict[str, Any]:
+    """ read many variables concurrently, returns {variable_id: value}
+
+    e.g. get_many([vari.ctx.host.variable_id, vari.ctx.port.variable_id])
+    """
+    return _values(variable_get_many(variable_ids, max_in_flight, return_exceptions))
+
+
+async def get_many_async(
+    variable_ids: Iterable[str],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    return_exceptions: bool = False,
+) -> Dict[str, Any]:
+    return _values(await variable_get_many_async(variable_ids, max_in_flight, return_exceptions))
+
+
+def _context_variable_ids(module: ModuleType, recursive: bool) -> List[str]:
+    variable_ids = []
+    for value in list(vars(module).values()):
+        # secret variables have no get()
+        if isinstance(value, type) and hasattr(value, "variable_id") and hasattr(value, "get"):
+            variable_ids.append(value.variable_id)
+        elif recursive and isinstance(value, ModuleType) and value.__name__.startswith(module.__name__ + "."):
+            variable_ids.extend(_context_variable_ids(value, recursive))
+    return variable_ids
+
+
+def prefetch_context(module_name: str, recursive: bool = True) -> Dict[str, Any]:
+    """ read all variables of a generated vari context, see get_many """
+    return get_many(_context_variable_ids(sys.modules[module_name], recursive))
+
+
+async def prefetch_context_async(module_name: str, recursive: bool = True) -> Dict[str, Any]:
+    return await get_many_async(_context_variable_ids(sys.modules[module_name], recursive))
+
+
 def generate_variables(variables: List[VariableSpecDto]):
     failed_variables = []
     for variable in variables:
@@ -160,7 +225,7 @@ def create_variable(variable: VariableSpecDto) -> None:
                 created_dirs.append(full_path)  # Track for cleanup
             next = folders[idx + 1] if idx + 1 < len(folders) else None
             if next:
-                add_import_to_init(full_path, next)
+                add_import_to_init(full_path, next, code_imports=VARI_CODE_IMPORTS)
 
         add_variable_to_init(full_path, variable)
         
@@ -185,7 +250,7 @@ def add_variable_to_init(full_path: str, variable: VariableSpecDto):
     to ensure that either the entire operation succeeds or no changes are made to the filesystem.
     """
     try:
-        init_the_init(full_path)
+        init_the_init(full_path, code_imports=VARI_CODE_IMPORTS)
         init_path = os.path.join(full_path, "__init__.py")
         
         # Generate variable content first
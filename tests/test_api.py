@@ -266,6 +266,9 @@ class T(unittest.TestCase):
         self.assertIn("conversationSID: str", func_str)
         self.assertIn("authToken: str", func_str)
         self.assertIn(f"-> {to_type_module_alias(name)}.{name}Response", func_str)
+        self.assertIn(f"def {name}_download(\n    destination: DownloadTarget,", func_str)
+        self.assertIn(f"return {name}_stream(conversationSID, authToken).download(destination)", func_str)
+        self.assertIn(f"return await {name}_stream_async(conversationSID, authToken).download(destination)", func_str)
 
     def test_render_function_twilio_get_details(self):
         # same test but try it as a serverFunction rather than an apiFunction
@@ -10,6 +10,7 @@ These tests mock HTTP calls so no live server is needed. They verify that:
 
 import asyncio
 import inspect
+import json
 from unittest.mock import patch, MagicMock, AsyncMock
 
 import httpx
@@ -19,6 +20,8 @@ from polyapi import http_client
 from polyapi.execute import (
     execute,
     execute_async,
+    execute_many,
+    execute_many_async,
     direct_execute,
     direct_execute_async,
     execute_post,
@@ -28,9 +31,11 @@ from polyapi.execute import (
     variable_update,
     variable_update_async,
     _build_direct_execute_params,
+    _endpoint_info_cache,
     _check_endpoint_error,
     _check_response_error
 )
+from polyapi.config import ExecutionContext
 from polyapi.exceptions import PolyApiException
 
 
@@ -41,7 +46,7 @@ def _fake_response(status_code=200, json_data=None, text="ok"):
     resp = MagicMock(spec=httpx.Response)
     resp.status_code = status_code
     resp.text = text
-    resp.content = text.encode()
+    resp.content = text.encode() if json_data is None else json.dumps(json_data).encode()
     resp.json.return_value = {} if json_data is None else json_data
     return resp
 
@@ -55,13 +60,11 @@ class TestHttpClientPairing:
     def setup_method(self):
         # Reset singletons so each test starts fresh
         http_client._sync_client = None
-        http_client._async_client = None
-        http_client._async_client_loop = None
+        http_client._async_clients.clear()
 
     def teardown_method(self):
         http_client._sync_client = None
-        http_client._async_client = None
-        http_client._async_client_loop = None
+        http_client._async_clients.clear()
 
     @patch.object(httpx.Client, "post", return_value=_fake_response())
     def test_sync_post_uses_sync_client(self, mock_post):
@@ -70,18 +73,18 @@ class TestHttpClientPairing:
         assert resp.status_code == 200
         # The sync client should have been created
         assert http_client._sync_client is not None
-        assert http_client._async_client is None
+        assert len(http_client._async_clients) == 0
 
     @patch.object(httpx.AsyncClient, "post", new_callable=AsyncMock, return_value=_fake_response())
     def test_async_post_uses_async_client(self, mock_post):
         async def _run():
-            return await http_client.async_post("https://example.com", json={})
+            resp = await http_client.async_post("https://example.com", json={})
+            return resp, http_client._async_clients.get(asyncio.get_running_loop())
 
-        resp = asyncio.run(_run())
+        resp, client = asyncio.run(_run())
         mock_post.assert_called_once()
         assert resp.status_code == 200
-        assert http_client._async_client is not None
-        assert http_client._async_client_loop is not None
+        assert isinstance(client, httpx.AsyncClient)
 
     def test_async_post_reuses_client_within_same_loop(self):
         first_client = MagicMock()
@@ -91,16 +94,15 @@ class TestHttpClientPairing:
             async def _run():
                 first_response = await http_client.async_post("https://example.com/first", json={})
                 second_response = await http_client.async_post("https://example.com/second", json={})
-                return first_response, second_response, asyncio.get_running_loop()
+                return first_response, second_response, http_client._async_clients.get(asyncio.get_running_loop())
 
-            first_response, second_response, current_loop = asyncio.run(_run())
+            first_response, second_response, cached_client = asyncio.run(_run())
 
         assert first_response.status_code == 200
         assert second_response.status_code == 200
         assert mock_async_client.call_count == 1
         assert first_client.post.await_count == 2
-        assert http_client._async_client is first_client
-        assert http_client._async_client_loop is current_loop
+        assert cached_client is first_client
 
     def test_async_post_recreates_client_after_loop_change(self):
         first_client = MagicMock()
@@ -114,7 +116,8 @@ class TestHttpClientPairing:
         ) as mock_async_client:
             async def _run_once(url: str):
                 response = await http_client.async_post(url, json={})
-                return response, http_client._async_client, asyncio.get_running_loop()
+                loop = asyncio.get_running_loop()
+                return response, http_client._async_clients.get(loop), loop
 
             first_response, first_cached_client, first_loop = asyncio.run(_run_once("https://example.com/first"))
             second_response, second_cached_client, second_loop = asyncio.run(_run_once("https://example.com/second"))
@@ -127,44 +130,55 @@ class TestHttpClientPairing:
         assert first_cached_client is first_client
         assert second_cached_client is second_client
         assert first_loop is not second_loop
-        assert http_client._async_client is second_client
-        assert http_client._async_client_loop is second_loop
 
     def test_close_async_clears_cached_client_for_current_loop(self):
         async def _run():
             cached_client = MagicMock()
             cached_client.aclose = AsyncMock()
-            http_client._async_client = cached_client
-            http_client._async_client_loop = asyncio.get_running_loop()
+            http_client._async_clients[asyncio.get_running_loop()] = cached_client
 
             await http_client.close_async()
 
-            return cached_client
+            return cached_client, http_client._async_clients.get(asyncio.get_running_loop())
 
-        cached_client = asyncio.run(_run())
+        cached_client, remaining = asyncio.run(_run())
 
         cached_client.aclose.assert_awaited_once()
-        assert http_client._async_client is None
-        assert http_client._async_client_loop is None
-
-    def test_close_async_drops_stale_client_without_cross_loop_close(self):
-        stale_client = MagicMock()
-        stale_client.aclose = AsyncMock()
-
-        async def _seed_stale_client():
-            http_client._async_client = stale_client
-            http_client._async_client_loop = asyncio.get_running_loop()
+        assert remaining is None
 
-        asyncio.run(_seed_stale_client())
+    def test_close_async_leaves_other_loops_clients_open(self):
+        other_loop = asyncio.new_event_loop()
+        other_client = MagicMock()
+        other_client.aclose = AsyncMock()
+        http_client._async_clients[other_loop] = other_client
 
         async def _close_on_new_loop():
             await http_client.close_async()
 
-        asyncio.run(_close_on_new_loop())
-
-        stale_client.aclose.assert_not_awaited()
-        assert http_client._async_client is None
-        assert http_client._async_client_loop is None
+        try:
+            asyncio.run(_close_on_new_loop())
+            other_client.aclose.assert_not_awaited()
+            assert http_client._async_clients.get(other_loop) is other_client
+        finally:
+            other_loop.close()
+
+    def test_loops_keep_their_own_clients(self):
+        clients = {}
+
+        async def _client(name):
+            clients[name] = http_client._get_async_client()
+            await asyncio.sleep(0)
+            return http_client._get_async_client()
+
+        other_loop = asyncio.new_event_loop()
+        try:
+            first = other_loop.run_until_complete(_client("first"))
+            second = asyncio.run(_client("second"))
+            assert other_loop.run_until_complete(_client("again")) is first
+        finally:
+            other_loop.close()
+        assert first is clients["first"] and second is clients["second"]
+        assert first is not second
 
     @patch.object(httpx.Client, "get", return_value=_fake_response())
     def test_sync_get(self, mock_get):
@@ -224,10 +238,7 @@ class TestHttpClientPairing:
 
 # 3. execute() / execute_async()
 
-_CONFIG_PATCH = patch(
-    "polyapi.execute.get_api_key_and_url",
-    return_value=("fake-key", "https://api.example.com"),
-)
+_CONFIG_PATCH = patch("polyapi.execute.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com"))
 _MTLS_PATCH = patch(
     "polyapi.execute.get_mtls_config",
     return_value=(False, None, None, None),
@@ -285,9 +296,15 @@ class TestExecute:
 
 class TestDirectExecute:
 
+    def setup_method(self):
+        http_client.close()
+
+    def teardown_method(self):
+        http_client.close()
+
     @_CONFIG_PATCH
     @_MTLS_PATCH
-    @patch("polyapi.execute.httpx.request", return_value=_fake_response(200, text='{"result": 1}'))
+    @patch.object(httpx.Client, "request", return_value=_fake_response(200, text='{"result": 1}'))
     @patch("polyapi.http_client.post", return_value=_fake_response(
         200, json_data={"url": "https://target.example.com", "method": "GET"},
     ))
@@ -299,23 +316,164 @@ class TestDirectExecute:
 
     @_CONFIG_PATCH
     @_MTLS_PATCH
-    @patch("polyapi.http_client.async_post", new_callable=AsyncMock, return_value=_fake_response(
+    @patch.object(httpx.Client, "request", return_value=_fake_response(200))
+    @patch("polyapi.http_client.post", return_value=_fake_response(
         200, json_data={"url": "https://target.example.com", "method": "GET"},
     ))
-    def test_async_returns_coroutine(self, mock_post, _mtls, _config):
-        mock_client = AsyncMock()
-        mock_client.request = AsyncMock(return_value=_fake_response(200))
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
+    def test_sync_reuses_pooled_client(self, mock_post, mock_request, _mtls, _config):
+        with patch("polyapi.http_client.httpx.Client", wraps=httpx.Client) as client_cls:
+            direct_execute("server", "fn-id", {})
+            direct_execute("server", "fn-id", {})
+        assert client_cls.call_count == 1
+        assert client_cls.call_args.kwargs["verify"] is False
+        assert mock_request.call_count == 2
 
+    @_CONFIG_PATCH
+    @patch("polyapi.execute.get_mtls_config", return_value=(True, "/certs/client.pem", "/certs/client.key", "/certs/ca.pem"))
+    @patch("polyapi.http_client.get_tls_client")
+    @patch("polyapi.http_client.post", return_value=_fake_response(
+        200, json_data={"url": "https://target.example.com", "method": "GET"},
+    ))
+    def test_sync_keys_client_by_mtls_settings(self, mock_post, mock_get_tls_client, _mtls, _config):
+        mock_get_tls_client.return_value.request.return_value = _fake_response(200)
+        direct_execute("server", "fn-id", {})
+        mock_get_tls_client.assert_called_once_with(("/certs/client.pem", "/certs/client.key"), "/certs/ca.pem")
+
+    @_CONFIG_PATCH
+    @_MTLS_PATCH
+    @patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, return_value=_fake_response(200))
+    @patch("polyapi.http_client.async_post", new_callable=AsyncMock, return_value=_fake_response(
+        200, json_data={"url": "https://target.example.com", "method": "GET"},
+    ))
+    def test_async_returns_coroutine(self, mock_post, mock_request, _mtls, _config):
         async def _run():
-            with patch("polyapi.execute.httpx.AsyncClient", return_value=mock_client):
-                coro = direct_execute_async("server", "fn-id", {})
-                assert inspect.isawaitable(coro)
-                return await coro
+            coro = direct_execute_async("server", "fn-id", {})
+            assert inspect.isawaitable(coro)
+            return await coro
 
         result = asyncio.run(_run())
         assert result.status_code == 200
+        mock_request.assert_awaited_once()
+
+    @_CONFIG_PATCH
+    @_MTLS_PATCH
+    @patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, return_value=_fake_response(200))
+    @patch("polyapi.http_client.async_post", new_callable=AsyncMock, return_value=_fake_response(
+        200, json_data={"url": "https://target.example.com", "method": "GET"},
+    ))
+    def test_async_reuses_pooled_client_per_loop(self, mock_post, mock_request, _mtls, _config):
+        async def _run():
+            await direct_execute_async("server", "fn-id", {})
+            await direct_execute_async("server", "fn-id", {})
+            return http_client.get_async_tls_client(None, False)
+
+        first_client = asyncio.run(_run())
+        second_client = asyncio.run(_run())
+        assert mock_request.await_count == 4
+        assert first_client is not second_client
+
+
+class TestDirectExecuteEndpointCache:
+
+    def setup_method(self):
+        http_client.close()
+        _endpoint_info_cache.clear()
+
+    def teardown_method(self):
+        http_client.close()
+        _endpoint_info_cache.clear()
+
+    @_CONFIG_PATCH
+    @_MTLS_PATCH
+    @patch("polyapi.execute.get_direct_execute_cache_ttl", return_value=0)
+    @patch.object(httpx.Client, "request", return_value=_fake_response(200))
+    @patch("polyapi.http_client.post", return_value=_fake_response(
+        200, json_data={"url": "https://target.example.com", "method": "GET"},
+    ))
+    def test_disabled_by_default(self, mock_post, mock_request, _ttl, _mtls, _config):
+        direct_execute("api", "fn-id", {"a": 1})
+        direct_execute("api", "fn-id", {"a": 1})
+        assert mock_post.call_count == 2
+
+    @_CONFIG_PATCH
+    @_MTLS_PATCH
+    @patch("polyapi.execute.get_direct_execute_cache_ttl", return_value=60)
+    @patch.object(httpx.Client, "request", return_value=_fake_response(200))
+    @patch("polyapi.http_client.post", return_value=_fake_response(
+        200, json_data={"url": "https://target.example.com", "method": "GET"},
+    ))
+    def test_steady_state_is_single_round_trip(self, mock_post, mock_request, _ttl, _mtls, _config):
+        direct_execute("api", "fn-id", {"a": 1})
+        direct_execute("api", "fn-id", {"a": 1})
+        direct_execute("api", "fn-id", {"a": 2})
+        assert mock_post.call_count == 2
+        assert mock_request.call_count == 3
+
+    @_CONFIG_PATCH
+    @_MTLS_PATCH
+    @patch("polyapi.execute.get_direct_execute_cache_ttl", return_value=60)
+    @patch.object(httpx.Client, "request", return_value=_fake_response(401, text="expired"))
+    @patch("polyapi.http_client.post", return_value=_fake_response(
+        200, json_data={"url": "https://target.example.com", "method": "GET"},
+    ))
+    def test_client_error_invalidates_entry(self, mock_post, mock_request, _ttl, _mtls, _config):
+        direct_execute("api", "fn-id", {"a": 1})
+        direct_execute("api", "fn-id", {"a": 1})
+        assert mock_post.call_count == 2
+
+    @_CONFIG_PATCH
+    @_MTLS_PATCH
+    @patch("polyapi.execute.get_direct_execute_cache_ttl", return_value=60)
+    @patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, return_value=_fake_response(200))
+    @patch("polyapi.http_client.async_post", new_callable=AsyncMock, return_value=_fake_response(
+        200, json_data={"url": "https://target.example.com", "method": "GET"},
+    ))
+    def test_async_uses_cache(self, mock_post, mock_request, _ttl, _mtls, _config):
+        async def _run():
+            await direct_execute_async("api", "fn-id", {"a": 1})
+            await direct_execute_async("api", "fn-id", {"a": 1})
+
+        asyncio.run(_run())
+        assert mock_post.await_count == 1
+        assert mock_request.await_count == 2
+
+
+class TestExecuteMany:
+
+    @_CONFIG_PATCH
+    @patch("polyapi.http_client.post")
+    def test_sync_keeps_order(self, mock_post, _config):
+        mock_post.side_effect = lambda url, **kwargs: _fake_response(200, text=url.split("/")[-2])
+        results = execute_many([("server", f"fn-{i}", {"i": i}) for i in range(20)], max_in_flight=4)
+        assert [r.text for r in results] == [f"fn-{i}" for i in range(20)]
+
+    @_CONFIG_PATCH
+    @patch("polyapi.http_client.post", return_value=_fake_response(500, text="boom"))
+    def test_sync_return_exceptions(self, mock_post, _config):
+        with pytest.raises(PolyApiException):
+            execute_many([("server", "fn", {})] * 3)
+        results = execute_many([("server", "fn", {})] * 3, return_exceptions=True)
+        assert all(isinstance(r, PolyApiException) for r in results)
+
+    @_CONFIG_PATCH
+    @patch("polyapi.http_client.async_post", new_callable=AsyncMock)
+    def test_async_bounds_concurrency(self, mock_post, _config):
+        in_flight = 0
+        peak = 0
+
+        async def _slow_post(url, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _fake_response(200, text=url.split("/")[-2])
+
+        mock_post.side_effect = _slow_post
+
+        results = asyncio.run(execute_many_async([("server", f"fn-{i}", {}) for i in range(30)], max_in_flight=5))
+        assert [r.text for r in results] == [f"fn-{i}" for i in range(30)]
+        assert peak == 5
 
 
 # 5. execute_post() / execute_post_async()
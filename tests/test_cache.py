@@ -0,0 +1,246 @@
+import asyncio
+import contextlib
+from unittest.mock import patch
+
+import httpx
+
+from polyapi import execute as poly_execute
+from polyapi import http_client
+from polyapi.cache import LRUCache, TTLCache, canonical_key
+from polyapi.config import ExecutionContext, reset_execution_context
+from polyapi.variable_events import VariableChangeSubscriber
+
+
+class TestCanonicalKey:
+
+    def test_ignores_dict_order(self):
+        assert canonical_key("api", "fn", {"a": 1, "b": [1, 2]}) == canonical_key("api", "fn", {"b": [1, 2], "a": 1})
+
+    def test_distinguishes_values(self):
+        assert canonical_key("api", "fn", {"a": 1}) != canonical_key("api", "fn", {"a": 2})
+
+
+class TestTTLCache:
+
+    def test_get_returns_value_until_expired(self):
+        cache = TTLCache()
+        with patch("polyapi.cache.time.monotonic", return_value=100.0):
+            cache.set("k", "v", ttl=10)
+        with patch("polyapi.cache.time.monotonic", return_value=109.0):
+            assert cache.get("k") == "v"
+        with patch("polyapi.cache.time.monotonic", return_value=110.0):
+            assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_evicts_oldest_when_full(self):
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.set("c", 3, ttl=60)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+    def test_invalidate(self):
+        cache = TTLCache()
+        cache.set("k", "v", ttl=60)
+        cache.invalidate("k")
+        cache.invalidate("missing")
+        assert cache.get("k", "default") == "default"
+
+
+class TestLRUCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_bytes_cap(self):
+        cache = LRUCache(max_entries=None, max_bytes=100)
+        cache.set("a", "x", ttl=60, size=60)
+        cache.set("b", "y", ttl=60, size=60)
+        cache.set("huge", "z", ttl=60, size=101)
+        assert cache.get("a") is None
+        assert cache.get("huge") is None
+        assert cache.get("b") == "y"
+        assert cache.stats()["bytes"] == 60
+
+    def test_ttl_and_stats(self):
+        cache = LRUCache()
+        with patch("polyapi.cache.time.monotonic", return_value=100.0):
+            cache.set("k", "v", ttl=10, size=5)
+            assert cache.get("k") == "v"
+        with patch("polyapi.cache.time.monotonic", return_value=110.0):
+            assert cache.get("k") is None
+        assert cache.stats() == {"hits": 1, "misses": 1, "sets": 1, "evictions": 0, "expirations": 1, "entries": 0, "bytes": 0}
+
+
+@contextlib.contextmanager
+def _options(**env):
+    # the cache options are resolved once, so drop them on the way in and out
+    with patch.dict("os.environ", env):
+        reset_execution_context()
+        try:
+            yield
+        finally:
+            reset_execution_context()
+
+
+_CONTEXT_PATCH = patch("polyapi.execute.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com"))
+
+
+class TestResultCache:
+
+    def setup_method(self):
+        self.requests = []
+        self.headers = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            if request.url.path.endswith("/direct-execute"):
+                return httpx.Response(200, json={"url": "https://target.example.com/rates", "method": "GET"})
+            return httpx.Response(200, json={"n": len(self.requests)}, headers=self.headers)
+
+        http_client.configure(transport=httpx.MockTransport(handler), async_transport=httpx.MockTransport(handler))
+        poly_execute.clear_result_cache()
+
+    def teardown_method(self):
+        http_client.configure()
+        poly_execute.clear_result_cache()
+        poly_execute._result_cache_overrides.clear()
+
+    @_CONTEXT_PATCH
+    def test_off_unless_enabled(self, _):
+        poly_execute.execute("api", "fn-1", {"a": 1})
+        poly_execute.execute("api", "fn-1", {"a": 1})
+        assert len(self.requests) == 2
+
+    @_CONTEXT_PATCH
+    def test_enabled_function_is_cached_per_arguments(self, _):
+        def fn():
+            pass
+        fn.function_id = "fn-1"
+        poly_execute.enable_result_cache(fn, ttl=60)
+
+        first = poly_execute.execute("api", "fn-1", {"a": 1, "b": 2})
+        assert poly_execute.execute("api", "fn-1", {"b": 2, "a": 1}) is first
+        poly_execute.execute("api", "fn-1", {"a": 2})
+        asyncio.run(poly_execute.execute_async("api", "fn-1", {"a": 2}))
+        poly_execute.execute("api", "fn-2", {"a": 1})
+        assert len(self.requests) == 3
+        stats = poly_execute.get_result_cache_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+
+    @_CONTEXT_PATCH
+    def test_enabled_through_config(self, _):
+        with _options(POLY_RESULT_CACHE_FUNCTIONS="fn-0, fn-1:30"):
+            poly_execute.execute("server", "fn-1", {})
+            poly_execute.execute("server", "fn-1", {})
+            poly_execute.disable_result_cache("fn-1")
+            poly_execute.execute("server", "fn-1", {})
+        assert len(self.requests) == 2
+
+    @_CONTEXT_PATCH
+    def test_direct_execute_honors_cache_control(self, _):
+        poly_execute.enable_result_cache("fn-1")
+        self.headers = {"Cache-Control": "no-store"}
+        with patch("polyapi.execute.get_mtls_config", return_value=(False, None, None, None)):
+            poly_execute.direct_execute("api", "fn-1", {})
+            self.headers = {"Cache-Control": "public, max-age=300"}
+            poly_execute.direct_execute("api", "fn-1", {})
+            poly_execute.direct_execute("api", "fn-1", {})
+        # resolve + call twice, the max-age response is then reused
+        assert len(self.requests) == 4
+
+    @_CONTEXT_PATCH
+    def test_concurrent_identical_calls_share_one_request(self, _):
+        poly_execute.enable_result_cache("fn-1")
+
+        async def run():
+            return await asyncio.gather(*[poly_execute.execute_async("api", "fn-1", {"a": 1}) for _ in range(50)])
+
+        resps = asyncio.run(run())
+        assert len(self.requests) == 1
+        assert all(resp is resps[0] for resp in resps)
+
+    @_CONTEXT_PATCH
+    def test_concurrent_variable_reads_share_one_request(self, _):
+        async def run():
+            return await asyncio.gather(*[poly_execute.variable_get_async("var-1") for _ in range(20)], poly_execute.variable_get_async("var-2"))
+
+        asyncio.run(run())
+        assert sorted(r.url.path for r in self.requests) == ["/variables/var-1/value", "/variables/var-2/value"]
+        with _options(POLY_SINGLE_FLIGHT="false"):
+            asyncio.run(run())
+        assert len(self.requests) == 23
+
+
+class TestVariableCache:
+
+    def setup_method(self):
+        self.requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return httpx.Response(200, text=f"value-{len(self.requests)}")
+
+        http_client.configure(transport=httpx.MockTransport(handler), async_transport=httpx.MockTransport(handler))
+        poly_execute.clear_variable_cache()
+        self.subscribed = []
+        subscriber = VariableChangeSubscriber(poly_execute.invalidate_variable, poly_execute.clear_variable_cache)
+        subscriber.subscribe = self.subscribed.append
+        poly_execute._variable_subscriber = subscriber
+
+    def teardown_method(self):
+        http_client.configure()
+        poly_execute.clear_variable_cache()
+        poly_execute._variable_subscriber = None
+
+    @_CONTEXT_PATCH
+    def test_off_by_default(self, _):
+        poly_execute.variable_get("var-1")
+        poly_execute.variable_get("var-1")
+        assert len(self.requests) == 2
+        assert self.subscribed == []
+
+    @_CONTEXT_PATCH
+    def test_cached_until_changed(self, _):
+        with _options(POLY_VARIABLE_CACHE_TTL="60"):
+            assert poly_execute.variable_get("var-1").text == "value-1"
+            assert asyncio.run(poly_execute.variable_get_async("var-1")).text == "value-1"
+            assert self.subscribed == ["var-1"]
+            # what the subscriber calls for a handleVariableChangeEvent
+            poly_execute._variable_subscriber.on_change("var-1")
+            assert poly_execute.variable_get("var-1").text == "value-2"
+            poly_execute.variable_update("var-1", "new")
+            assert poly_execute.variable_get("var-1").text == "value-4"
+            poly_execute._variable_subscriber.on_disconnect()
+            assert poly_execute.variable_get("var-1").text == "value-5"
+        assert len(self.requests) == 5
+
+    @_CONTEXT_PATCH
+    def test_without_push_only_ttl_applies(self, _):
+        with _options(POLY_VARIABLE_CACHE_TTL="60", POLY_VARIABLE_CACHE_PUSH="false"):
+            poly_execute.variable_get("var-1")
+            poly_execute.variable_get("var-1")
+        assert len(self.requests) == 1
+        assert self.subscribed == []
+
+    @_CONTEXT_PATCH
+    def test_read_racing_an_invalidation_is_not_cached(self, _):
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            poly_execute.invalidate_variable("var-1")  # the change event arrives mid-flight
+            return httpx.Response(200, text="stale")
+
+        http_client.configure(transport=httpx.MockTransport(handler))
+        with _options(POLY_VARIABLE_CACHE_TTL="60"):
+            poly_execute.variable_get("var-1")
+            poly_execute.variable_get("var-1")
+        assert len(self.requests) == 2
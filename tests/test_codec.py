@@ -0,0 +1,112 @@
+import json
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from polyapi import codec, http_client
+
+
+class TestCodec:
+
+    def teardown_method(self):
+        codec.set_codec(None)
+
+    def test_auto_prefers_orjson(self):
+        pytest.importorskip("orjson")
+        with patch.dict("os.environ", {"POLY_JSON_CODEC": "auto"}):
+            codec.set_codec(None)
+            assert codec.get_codec().name == "orjson"
+
+    def test_auto_falls_back_to_stdlib(self):
+        with patch.dict("sys.modules", {"orjson": None, "msgspec": None}), \
+                patch.dict("os.environ", {"POLY_JSON_CODEC": "auto"}):
+            assert codec.get_codec().name == "stdlib"
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError, match="json_codec"):
+            codec.set_codec("simdjson")
+
+    @pytest.mark.parametrize("name", ["stdlib", "orjson", "msgspec"])
+    def test_round_trip(self, name):
+        if name != "stdlib":
+            pytest.importorskip(name)
+        codec.set_codec(name)
+        payload = {"rows": [{"id": i, "name": f"ü{i}", "score": i / 3, "ok": i % 2 == 0, "tags": None} for i in range(5)]}
+        encoded = codec.dumps(payload)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == payload
+        assert codec.loads(encoded) == payload
+
+    def test_falls_back_for_values_fast_codecs_reject(self):
+        codec.set_codec("auto")
+        assert json.loads(codec.dumps({1: 2**70})) == {"1": 2**70}
+
+    @pytest.mark.parametrize("name", ["auto", "orjson"])
+    def test_integers_over_64_bits_stay_exact(self, name):
+        if name == "orjson":
+            pytest.importorskip("orjson")
+        codec.set_codec(name)
+        assert codec.loads(b"123456789012345678901234567890") == 123456789012345678901234567890
+        assert codec.loads('{"id": 18446744073709551616, "x": 1.5}') == {"id": 2**64, "x": 1.5}
+        assert codec.loads(b'{"id": 9007199254740993}') == {"id": 9007199254740993}
+        assert codec.loads(b'[-9223372036854775809, [{"n": 1e30}]]') == [-9223372036854775809, [{"n": 1e30}]]
+
+    def test_64_bit_integers_stay_on_the_fast_path(self):
+        pytest.importorskip("orjson")
+        codec.set_codec("orjson")
+        body = b'{"ts": 1700000000123456789, "max": 18446744073709551615, "min": -9223372036854775808, "s": "12345678901234567890123"}'
+        with patch("polyapi.codec.json.loads") as stdlib_loads:
+            value = codec.loads(body)
+        stdlib_loads.assert_not_called()
+        assert value == {"ts": 1700000000123456789, "max": 2**64 - 1, "min": -2**63, "s": "12345678901234567890123"}
+
+    def test_invalid_json_raises_value_error(self):
+        codec.set_codec("auto")
+        with pytest.raises(ValueError):
+            codec.loads(b"{nope")
+
+
+class TestDecodeResponse:
+
+    def test_httpx_response(self):
+        resp = httpx.Response(200, content=b'{"a": [1, 2]}', headers={"Content-Type": "application/json"})
+        assert codec.decode_response(resp) == {"a": [1, 2]}
+
+    def test_non_httpx_objects_use_their_json(self):
+        resp = Mock()
+        resp.json.return_value = {"ok": True}
+        assert codec.decode_response(resp) == {"ok": True}
+
+
+class TestRequestEncoding:
+
+    def setup_method(self):
+        self.requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return httpx.Response(200)
+
+        http_client.configure(transport=httpx.MockTransport(handler))
+
+    def teardown_method(self):
+        http_client.configure()
+
+    def test_json_kwarg_encoded_with_codec(self):
+        with patch("polyapi.codec.dumps", return_value=b'{"x":1}') as mock_dumps:
+            http_client.post("https://example.com/", json={"x": 1}, headers={"Authorization": "Bearer k"})
+        mock_dumps.assert_called_once_with({"x": 1})
+        request = self.requests[0]
+        assert request.content == b'{"x":1}'
+        assert request.headers["Content-Type"] == "application/json"
+        assert request.headers["Authorization"] == "Bearer k"
+
+    def test_explicit_content_type_kept(self):
+        http_client.post("https://example.com/", json={"x": 1}, headers={"Content-Type": "application/vnd.poly+json"})
+        assert self.requests[0].headers["Content-Type"] == "application/vnd.poly+json"
+
+    def test_non_json_bodies_untouched(self):
+        http_client.patch("https://example.com/", data={"value": "1"})
+        assert self.requests[0].content == b"value=1"
+        assert http_client.encode_json_kwargs({"json": None}) == {}
@@ -0,0 +1,224 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from polyapi import concurrency, http_client
+from polyapi.concurrency import AsyncSingleFlight, SingleFlight, imap_async, map_async, map_sync
+from polyapi.exceptions import PolyApiException
+
+
+def _tracking(delay=0.01, fail_on=()):
+    state = {"in_flight": 0, "peak": 0}
+
+    async def fn(item):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            # later items finish first so ordering is actually exercised
+            await asyncio.sleep(delay / (item + 1))
+            if item in fail_on:
+                raise PolyApiException(f"boom {item}")
+            return item * 2
+        finally:
+            state["in_flight"] -= 1
+
+    return fn, state
+
+
+class TestMapAsync:
+
+    def test_keeps_order_and_bounds_in_flight(self):
+        fn, state = _tracking()
+        results = asyncio.run(map_async(fn, range(20), max_in_flight=3))
+        assert results == [i * 2 for i in range(20)]
+        assert state["peak"] == 3
+
+    def test_consumes_generators_lazily(self):
+        pulled = []
+
+        def items():
+            for i in range(10):
+                pulled.append(i)
+                yield i
+
+        async def fn(item):
+            # never more than max_in_flight items pulled ahead of completion
+            assert len(pulled) - item <= 2
+            await asyncio.sleep(0)
+            return item
+
+        assert asyncio.run(map_async(fn, items(), max_in_flight=2)) == list(range(10))
+
+    def test_raises_first_error(self):
+        fn, _ = _tracking(fail_on={4})
+        with pytest.raises(PolyApiException, match="boom 4"):
+            asyncio.run(map_async(fn, range(10), max_in_flight=2))
+
+    def test_return_exceptions(self):
+        fn, _ = _tracking(fail_on={1, 3})
+        results = asyncio.run(map_async(fn, range(5), return_exceptions=True))
+        assert [r if not isinstance(r, PolyApiException) else "err" for r in results] == [0, "err", 4, "err", 8]
+
+    def test_empty(self):
+        fn, _ = _tracking()
+        assert asyncio.run(map_async(fn, [])) == []
+
+    def test_rate_limit(self):
+        fn, _ = _tracking(delay=0)
+        start = time.monotonic()
+        asyncio.run(map_async(fn, range(6), max_in_flight=6, rate_limit=50))
+        # six starts at 50/s take at least five intervals of 20ms
+        assert time.monotonic() - start >= 0.09
+
+
+class TestImapAsync:
+
+    def test_yields_as_completed_with_errors_captured(self):
+        fn, _ = _tracking(delay=0.02, fail_on={0})
+
+        async def _run():
+            return [r async for r in imap_async(fn, range(4), max_in_flight=4)]
+
+        results = asyncio.run(_run())
+        # item 0 sleeps the longest, so it comes last
+        assert [r.index for r in results] == [3, 2, 1, 0]
+        assert [r.ok for r in results] == [True, True, True, False]
+        assert results[0].value == 6
+        assert isinstance(results[-1].error, PolyApiException)
+
+    def test_breaking_out_cancels_in_flight(self):
+        fn, state = _tracking(delay=0.05)
+
+        async def _run():
+            async for r in imap_async(fn, range(100), max_in_flight=5):
+                break
+            await asyncio.sleep(0.01)
+            return state["in_flight"]
+
+        assert asyncio.run(_run()) == 0
+
+
+class TestMapSync:
+
+    def setup_method(self):
+        http_client.configure(async_transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"path": request.url.path})
+        ))
+
+    def teardown_method(self):
+        concurrency.shutdown()
+        http_client.configure()
+
+    def test_runs_on_background_loop(self):
+        fn, state = _tracking()
+        assert map_sync(fn, range(8), max_in_flight=4) == [i * 2 for i in range(8)]
+        assert state["peak"] == 4
+
+    def test_reuses_async_client_across_calls(self):
+        async def fetch(i):
+            resp = await http_client.async_get(f"https://example.com/{i}")
+            return resp.json()["path"], id(http_client._get_async_client())
+
+        first = map_sync(fetch, range(3))
+        second = map_sync(fetch, range(3))
+        assert [path for path, _ in first] == ["/0", "/1", "/2"]
+        assert len({client for _, client in first + second}) == 1
+
+    def test_callable_from_threads(self):
+        fn, _ = _tracking(delay=0)
+        results = {}
+
+        def run(n):
+            results[n] = map_sync(fn, range(n))
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(1, 6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == {n: [i * 2 for i in range(n)] for n in range(1, 6)}
+
+    def test_shutdown_closes_loop_clients(self):
+        async def fetch(i):
+            return (await http_client.async_get("https://example.com/")).status_code
+
+        map_sync(fetch, range(2))
+        loop = concurrency._get_background_loop()
+        sync_client = http_client._get_sync_client()
+        concurrency.shutdown()
+        assert http_client._async_clients.get(loop) is None
+        # the sync clients belong to the caller, not to the background loop
+        assert http_client._get_sync_client() is sync_client and not sync_client.is_closed
+
+
+class TestSingleFlight:
+
+    def test_concurrent_threads_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def fn():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            leader = pool.submit(flight.do, "k", fn)
+            started.wait()
+            followers = [pool.submit(flight.do, "k", fn) for _ in range(7)]
+            results = [leader.result()] + [f.result() for f in followers]
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flight.coalesced == 7
+        # once done, the next call runs again
+        flight.do("k", fn)
+        assert len(calls) == 2
+
+    def test_errors_are_shared(self):
+        flight = SingleFlight()
+        with pytest.raises(PolyApiException):
+            flight.do("k", lambda: (_ for _ in ()).throw(PolyApiException("boom")))
+        assert flight.do("k", lambda: 1) == 1
+
+
+class TestAsyncSingleFlight:
+
+    def test_concurrent_coroutines_share_one_call(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def run():
+            results = await asyncio.gather(*[flight.do("k", fn) for _ in range(100)], flight.do("other", fn))
+            return results + [await flight.do("k", fn)]
+
+        results = asyncio.run(run())
+        assert results == ["value"] * 102
+        assert len(calls) == 3
+        assert flight.coalesced == 99
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def run():
+            first = asyncio.ensure_future(flight.do("k", fn))
+            second = asyncio.ensure_future(flight.do("k", fn))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(run()) == "done"
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import httpx
+
+from polyapi import config
+from polyapi import execute as poly_execute
+from polyapi import http_client
+from polyapi.config import ExecutionContext, get_execution_context
+
+
+class TestExecutionContext:
+
+    def setup_method(self):
+        config.reset_execution_context()
+
+    def teardown_method(self):
+        config.reset_execution_context()
+
+    def test_urls_and_headers(self):
+        context = ExecutionContext("key", "https://na1.polyapi.io/")
+        assert context.function_url("server", "fn-1") == "https://na1.polyapi.io/functions/server/fn-1/execute"
+        assert context.function_url("api", "fn-1", "direct-execute") == "https://na1.polyapi.io/functions/api/fn-1/direct-execute"
+        assert context.variable_url("v-1", "/value") == "https://na1.polyapi.io/variables/v-1/value"
+        assert context.function_url("server", "fn-1") is context.function_url("server", "fn-1")
+        assert dict(context.headers) == {"Authorization": "Bearer key"}
+
+    def test_built_once(self):
+        with patch("polyapi.config.get_api_key_and_url", return_value=("key", "https://na1.polyapi.io")) as mock_get:
+            first = get_execution_context()
+            assert get_execution_context() is first
+        mock_get.assert_called_once()
+
+    def test_incomplete_config_not_cached(self):
+        with patch("polyapi.config.get_api_key_and_url", return_value=(None, None)) as mock_get:
+            get_execution_context()
+            get_execution_context()
+        assert mock_get.call_count == 2
+
+    def test_set_api_key_and_url_invalidates(self, tmp_path):
+        with patch("polyapi.config.get_api_key_and_url", return_value=("old", "https://old.polyapi.io")):
+            assert get_execution_context().api_key == "old"
+        with patch("polyapi.config.get_config_file_path", return_value=str(tmp_path / ".config.env")), \
+                patch.dict("os.environ", {"POLY_API_KEY": "", "POLY_API_BASE_URL": ""}), \
+                patch.multiple("polyapi.config", API_KEY=None, API_URL=None):
+            config.set_api_key_and_url("https://new.polyapi.io", "new")
+            context = get_execution_context()
+        assert (context.api_key, context.base_url) == ("new", "https://new.polyapi.io")
+
+
+class TestConfigOptions:
+
+    def test_file_options_apply_with_env_credentials(self, tmp_path):
+        path = tmp_path / ".config.env"
+        path.write_text("[polyapi]\npoly_api_key = file-key\nhttp_max_connections = 42\n")
+        env = {"POLY_API_KEY": "env-key", "POLY_API_BASE_URL": "https://na1.polyapi.io"}
+        with patch("polyapi.config.get_config_file_path", return_value=str(path)), \
+                patch.dict("os.environ", env), \
+                patch("polyapi.config.CONFIG_OPTIONS", None):
+            assert config.get_api_key_and_url() == ("env-key", "https://na1.polyapi.io")
+            assert config.get_config_option("http_max_connections") == "42"
+            with patch.dict("os.environ", {"POLY_HTTP_MAX_CONNECTIONS": "7"}):
+                assert config.get_config_option("http_max_connections") == "7"
+
+    def test_missing_file_is_checked_once(self, tmp_path):
+        with patch("polyapi.config.get_config_file_path", return_value=str(tmp_path / ".config.env")) as mock_path, \
+                patch("polyapi.config.CONFIG_OPTIONS", None):
+            assert config.get_config_option("http2", "false") == "false"
+            assert config.get_config_option("http2", "false") == "false"
+        mock_path.assert_called_once()
+
+    def test_per_call_options_resolved_once(self):
+        http_client.configure(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+        config.reset_execution_context()
+        try:
+            with patch("polyapi.config.CONFIG_OPTIONS", {}), \
+                    patch("polyapi.config.get_config_option", wraps=config.get_config_option) as mock_option, \
+                    patch("polyapi.execute.get_execution_context", return_value=ExecutionContext("key", "https://na1.polyapi.io")):
+                poly_execute.execute("server", "fn-1", {"a": 1})
+                poly_execute.variable_get("var-1")
+                mock_option.reset_mock()
+                poly_execute.execute("server", "fn-1", {"a": 1})
+                poly_execute.variable_get("var-1")
+                assert mock_option.call_count == 0
+
+                with patch.dict("os.environ", {"POLY_SINGLE_FLIGHT": "false"}):
+                    assert config.get_single_flight_config() is True
+                    config.reset_execution_context()
+                    assert config.get_single_flight_config() is False
+        finally:
+            http_client.configure()
+            config.reset_execution_context()
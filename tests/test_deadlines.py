@@ -0,0 +1,151 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+import polyapi
+from polyapi import deadlines, http_client
+from polyapi.config import ExecutionContext, get_http_timeout_config
+from polyapi.exceptions import DeadlineExceeded
+from polyapi.execute import execute_async, execute_many, variable_get
+
+_CONFIG_PATCH = patch("polyapi.execute.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com"))
+
+
+def _recording_handler(status=200, delay=0.0):
+    timeouts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"])
+        time.sleep(delay)
+        return httpx.Response(status, json={"ok": True})
+
+    return handler, timeouts
+
+
+class TestDeadlineContext:
+
+    def test_no_deadline_by_default(self):
+        assert deadlines.remaining() is None
+        deadlines.check_deadline()
+
+    def test_nested_deadlines_only_shorten(self):
+        with polyapi.deadline(10):
+            with polyapi.deadline(60):
+                assert deadlines.remaining() <= 10
+            with polyapi.deadline(1):
+                assert deadlines.remaining() <= 1
+            assert 1 < deadlines.remaining() <= 10
+        assert deadlines.remaining() is None
+
+    def test_flows_into_tasks(self):
+        async def _child():
+            return deadlines.remaining()
+
+        async def _run():
+            with polyapi.deadline(5):
+                return await asyncio.gather(_child(), _child())
+
+        assert all(0 < left <= 5 for left in asyncio.run(_run()))
+
+    def test_expired(self):
+        with polyapi.deadline(0):
+            with pytest.raises(DeadlineExceeded):
+                deadlines.check_deadline()
+
+
+class TestTimeouts:
+
+    def teardown_method(self):
+        http_client.configure()
+
+    def test_default_timeouts(self):
+        with patch("polyapi.config.CONFIG_OPTIONS", {}):
+            assert get_http_timeout_config() == (10.0, 300.0, 60.0, 60.0)
+
+    def test_clients_use_configured_timeouts(self):
+        env = {"POLY_HTTP_CONNECT_TIMEOUT": "2", "POLY_HTTP_READ_TIMEOUT": "none"}
+        with patch.dict("os.environ", env), patch("polyapi.http_client.httpx.Client") as mock_client:
+            http_client.configure()
+            http_client._get_sync_client()
+            http_client.get_tls_client()
+        for call in mock_client.call_args_list:
+            timeout = call.kwargs["timeout"]
+            assert timeout.connect == 2 and timeout.read is None
+
+    def test_request_timeout_capped_by_deadline(self):
+        handler, timeouts = _recording_handler()
+        http_client.configure(transport=httpx.MockTransport(handler))
+        http_client.get("https://example.com/")
+        with polyapi.deadline(1.5):
+            http_client.get("https://example.com/")
+            http_client.get("https://example.com/", timeout=0.5)
+        assert timeouts[0]["read"] == 300
+        assert all(0 < value <= 1.5 for value in timeouts[1].values())
+        assert timeouts[2]["read"] == 0.5
+
+    def test_spent_deadline_raises_before_sending(self):
+        handler, timeouts = _recording_handler()
+        http_client.configure(transport=httpx.MockTransport(handler))
+        with polyapi.deadline(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceeded):
+                http_client.get("https://example.com/")
+        assert timeouts == []
+
+    def test_timeout_past_deadline_becomes_deadline_exceeded(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            time.sleep(0.05)
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        http_client.configure(transport=httpx.MockTransport(handler))
+        with polyapi.deadline(0.03), pytest.raises(DeadlineExceeded):
+            http_client.get("https://example.com/")
+
+    def test_retries_stop_at_deadline(self):
+        handler, timeouts = _recording_handler(status=503)
+        http_client.configure(
+            transport=httpx.MockTransport(handler),
+            retry_policy=http_client.RetryPolicy(max_attempts=5, backoff_base=1, backoff_max=1),
+        )
+        with patch("polyapi.http_client.random.uniform", return_value=1):
+            with polyapi.deadline(0.5):
+                assert http_client.get("https://example.com/").status_code == 503
+        assert len(timeouts) == 1
+
+
+class TestDeadlinePropagation:
+
+    def teardown_method(self):
+        http_client.configure()
+
+    @_CONFIG_PATCH
+    def test_execute_async(self, _):
+        handler, timeouts = _recording_handler()
+        http_client.configure(async_transport=httpx.MockTransport(handler))
+
+        async def _run():
+            with polyapi.deadline(2):
+                return await execute_async("server", "abc-123", {})
+
+        assert asyncio.run(_run()).status_code == 200
+        assert timeouts[0]["read"] <= 2
+
+    @_CONFIG_PATCH
+    def test_variable_get(self, _):
+        handler, timeouts = _recording_handler()
+        http_client.configure(transport=httpx.MockTransport(handler))
+        with polyapi.deadline(2):
+            variable_get("var-123")
+        assert timeouts[0]["read"] <= 2
+
+    @_CONFIG_PATCH
+    def test_execute_many_worker_threads(self, _):
+        handler, timeouts = _recording_handler()
+        http_client.configure(transport=httpx.MockTransport(handler))
+        with polyapi.deadline(2):
+            execute_many([("server", f"fn-{i}", {}) for i in range(4)], max_in_flight=4)
+        assert len(timeouts) == 4
+        assert all(t["read"] <= 2 for t in timeouts)
@@ -0,0 +1,442 @@
+"""Tests for the tuning surface of polyapi.http_client.
+
+Requests are served by httpx.MockTransport so the full client stack runs
+without a network.
+"""
+
+import asyncio
+import contextlib
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+import polyapi
+from polyapi import http_client
+from polyapi.config import ExecutionContext, get_http_pool_config, get_warmup_config, reset_execution_context
+
+
+def _ok_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"path": request.url.path})
+
+
+class TestPoolConfig:
+
+    def setup_method(self):
+        http_client.configure()
+
+    def teardown_method(self):
+        http_client.configure()
+
+    def test_defaults_match_httpx(self):
+        with patch("polyapi.config.CONFIG_OPTIONS", {}):
+            assert get_http_pool_config() == (100, 20, 5.0)
+
+    def test_env_vars_override_config_file(self):
+        env = {
+            "POLY_HTTP_MAX_CONNECTIONS": "500",
+            "POLY_HTTP_MAX_KEEPALIVE_CONNECTIONS": "none",
+        }
+        with patch("polyapi.config.CONFIG_OPTIONS", {"http_max_connections": "50", "http_keepalive_expiry": "30"}), \
+                patch.dict("os.environ", env):
+            assert get_http_pool_config() == (500, None, 30.0)
+
+    def test_limits_applied_to_both_clients(self):
+        with patch("polyapi.http_client.get_http_pool_config", return_value=(300, 150, 60.0)), \
+                patch("polyapi.http_client.httpx.Client") as mock_client, \
+                patch("polyapi.http_client.httpx.AsyncClient") as mock_async_client:
+            http_client._get_sync_client()
+
+            async def _run():
+                http_client._get_async_client()
+
+            asyncio.run(_run())
+
+        for mock in (mock_client, mock_async_client):
+            limits = mock.call_args.kwargs["limits"]
+            assert limits.max_connections == 300
+            assert limits.max_keepalive_connections == 150
+            assert limits.keepalive_expiry == 60.0
+
+
+class TestCustomTransport:
+
+    def setup_method(self):
+        http_client.configure(
+            transport=httpx.MockTransport(_ok_handler),
+            async_transport=httpx.MockTransport(_ok_handler),
+        )
+
+    def teardown_method(self):
+        http_client.configure()
+
+    def test_sync_requests_use_transport(self):
+        resp = http_client.get("https://example.com/sync")
+        assert resp.json() == {"path": "/sync"}
+
+    def test_async_requests_use_transport(self):
+        async def _run():
+            return await http_client.async_post("https://example.com/async", json={})
+
+        resp = asyncio.run(_run())
+        assert resp.json() == {"path": "/async"}
+
+    def test_configure_drops_existing_clients(self):
+        http_client.get("https://example.com/sync")
+        first = http_client._sync_client
+        http_client.configure(limits=httpx.Limits(max_connections=1))
+        assert http_client._sync_client is None
+        http_client.configure(transport=httpx.MockTransport(_ok_handler))
+        http_client.get("https://example.com/sync")
+        assert http_client._sync_client is not first
+
+
+class TestHttp2:
+
+    def setup_method(self):
+        http_client.configure()
+
+    def teardown_method(self):
+        http_client.configure()
+
+    def test_disabled_by_default(self):
+        with patch("polyapi.config.CONFIG_OPTIONS", {}), \
+                patch("polyapi.http_client.httpx.Client") as mock_client:
+            http_client._get_sync_client()
+        assert mock_client.call_args.kwargs["http2"] is False
+
+    def test_enabled_from_env(self):
+        with patch.dict("os.environ", {"POLY_HTTP2": "true"}), \
+                patch.dict("sys.modules", {"h2": object()}), \
+                patch("polyapi.http_client.httpx.AsyncClient") as mock_async_client:
+            async def _run():
+                http_client._get_async_client()
+
+            asyncio.run(_run())
+        assert mock_async_client.call_args.kwargs["http2"] is True
+
+    def test_falls_back_without_h2(self):
+        with patch.dict("os.environ", {"POLY_HTTP2": "true"}), \
+                patch.dict("sys.modules", {"h2": None}), \
+                patch("polyapi.http_client.httpx.Client") as mock_client:
+            http_client._get_sync_client()
+        assert mock_client.call_args.kwargs["http2"] is False
+
+
+class TestThreadingStrategy:
+    THREADS = 64
+    CALLS_PER_THREAD = 50
+
+    def setup_method(self):
+        http_client.configure(transport=httpx.MockTransport(_ok_handler))
+
+    def teardown_method(self):
+        http_client.configure()
+
+    def _hammer(self):
+        """ fire THREADS * CALLS_PER_THREAD requests, started together, and return the clients each thread used """
+        real_client = httpx.Client
+        created = []
+
+        def slow_client(*args, **kwargs):
+            # widen the window in which racing threads could each build a client
+            time.sleep(0.01)
+            client = real_client(*args, **kwargs)
+            created.append(client)
+            return client
+
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(n):
+            barrier.wait()
+            used = set()
+            for i in range(self.CALLS_PER_THREAD):
+                resp = http_client.get(f"https://example.com/{n}/{i}")
+                assert resp.json() == {"path": f"/{n}/{i}"}
+                used.add(id(http_client._get_sync_client()))
+            return used
+
+        with patch("polyapi.http_client.httpx.Client", side_effect=slow_client), \
+                ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            used = list(pool.map(worker, range(self.THREADS)))
+        return created, used
+
+    def test_shared_client_created_once(self):
+        with patch.dict("os.environ", {"POLY_HTTP_CLIENT_STRATEGY": "shared"}):
+            created, used = self._hammer()
+        assert len(created) == 1
+        assert all(u == {id(created[0])} for u in used)
+
+    def test_thread_local_clients(self):
+        with patch.dict("os.environ", {"POLY_HTTP_CLIENT_STRATEGY": "thread_local"}):
+            created, used = self._hammer()
+            assert http_client._sync_client is None
+            assert len(created) == self.THREADS
+            assert all(len(u) == 1 for u in used)
+            assert len(set().union(*used)) == self.THREADS
+
+            http_client.close()
+            assert all(c.is_closed for c in created)
+            # a closed thread-local client is replaced on next use
+            http_client.get("https://example.com/again")
+            assert not http_client._get_sync_client().is_closed
+
+    def test_invalid_strategy(self):
+        with patch.dict("os.environ", {"POLY_HTTP_CLIENT_STRATEGY": "per_request"}), \
+                pytest.raises(ValueError, match="http_client_strategy"):
+            http_client.get("https://example.com/")
+
+
+def _flaky_handler(statuses, exc_first=None):
+    """ respond with statuses in turn (then 200), optionally raising exc_first on the first call """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if exc_first is not None and len(calls) == 1:
+            raise exc_first("boom", request=request)
+        status = statuses[len(calls) - 1] if len(calls) <= len(statuses) else 200
+        return httpx.Response(status, json={"attempt": len(calls)})
+
+    return handler, calls
+
+
+_FAST = http_client.RetryPolicy(max_attempts=3, backoff_base=0, backoff_max=0)
+
+
+class TestRetryPolicy:
+
+    def setup_method(self):
+        http_client.reset_retry_stats()
+
+    def teardown_method(self):
+        http_client.configure()
+
+    def _configure(self, handler, policy=_FAST, budget=None):
+        http_client.configure(
+            transport=httpx.MockTransport(handler),
+            async_transport=httpx.MockTransport(handler),
+            retry_policy=policy,
+            retry_budget=budget,
+        )
+
+    def test_idempotent_get_retried_on_503(self):
+        handler, calls = _flaky_handler([503, 502])
+        self._configure(handler)
+        resp = http_client.get("https://example.com/variables/v/value")
+        assert resp.status_code == 200
+        assert len(calls) == 3
+        assert http_client.get_retry_stats()["retries"] == 2
+
+    def test_post_not_retried_on_503(self):
+        handler, calls = _flaky_handler([503])
+        self._configure(handler)
+        assert http_client.post("https://example.com/functions/server/x/execute", json={}).status_code == 503
+        assert len(calls) == 1
+
+    def test_post_marked_idempotent_is_retried(self):
+        handler, calls = _flaky_handler([504])
+        self._configure(handler)
+        assert http_client.post("https://example.com/tables/t/select", json={}, idempotent=True).status_code == 200
+        assert len(calls) == 2
+
+    def test_connect_errors_retried_for_any_method(self):
+        handler, calls = _flaky_handler([], exc_first=httpx.ConnectError)
+        self._configure(handler)
+        assert http_client.post("https://example.com/", json={}).status_code == 200
+        assert len(calls) == 2
+
+    def test_read_errors_only_retried_when_idempotent(self):
+        handler, calls = _flaky_handler([], exc_first=httpx.ReadError)
+        self._configure(handler)
+        with pytest.raises(httpx.ReadError):
+            http_client.post("https://example.com/", json={})
+        assert http_client.get("https://example.com/").status_code == 200
+
+    def test_gives_up_after_max_attempts(self):
+        handler, calls = _flaky_handler([503] * 10)
+        self._configure(handler)
+        assert http_client.get("https://example.com/").status_code == 503
+        assert len(calls) == 3
+        assert http_client.get_retry_stats()["retries_exhausted"] == 1
+
+    def test_per_call_override(self):
+        handler, calls = _flaky_handler([503])
+        self._configure(handler)
+        assert http_client.get("https://example.com/", retry=http_client.NO_RETRY).status_code == 503
+        assert len(calls) == 1
+
+    def test_budget_limits_retries(self):
+        handler, calls = _flaky_handler([503] * 10)
+        self._configure(handler, budget=http_client.RetryBudget(ratio=0, burst=1))
+        http_client.get("https://example.com/")
+        http_client.get("https://example.com/")
+        # one retry for the first request, then the budget is empty
+        assert len(calls) == 3
+        assert http_client.get_retry_stats()["budget_exhausted"] == 2
+
+    def test_delay_honors_retry_after(self):
+        policy = http_client.RetryPolicy(backoff_base=0.01, backoff_max=5)
+        assert policy.delay(1) <= 0.01
+        assert policy.delay(1, httpx.Response(503, headers={"Retry-After": "3"})) == 3
+        assert policy.delay(1, httpx.Response(503, headers={"Retry-After": "60"})) == 5
+
+    def test_async_retries(self):
+        handler, calls = _flaky_handler([503])
+        self._configure(handler)
+
+        async def _run():
+            return await http_client.async_get("https://example.com/")
+
+        assert asyncio.run(_run()).status_code == 200
+        assert len(calls) == 2
+
+    def test_async_hedging(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+            return httpx.Response(200, json={"attempt": len(calls)})
+
+        self._configure(handler, policy=http_client.RetryPolicy(hedge_after=0.02))
+
+        async def _run():
+            return await http_client.async_get("https://example.com/")
+
+        start = time.monotonic()
+        resp = asyncio.run(_run())
+        assert time.monotonic() - start < 0.5
+        assert resp.json() == {"attempt": 2}
+        stats = http_client.get_retry_stats()
+        assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+    def test_non_idempotent_requests_not_hedged(self):
+        handler, calls = _flaky_handler([])
+        self._configure(handler, policy=http_client.RetryPolicy(hedge_after=0))
+
+        async def _run():
+            return await http_client.async_post("https://example.com/", json={})
+
+        asyncio.run(_run())
+        assert len(calls) == 1
+        assert http_client.get_retry_stats()["hedges"] == 0
+
+
+@contextlib.contextmanager
+def _options(**env):
+    # the compression options are resolved once, so drop them on the way in and out
+    with patch.dict("os.environ", env):
+        reset_execution_context()
+        try:
+            yield
+        finally:
+            reset_execution_context()
+
+
+class TestRequestCompression:
+
+    def setup_method(self):
+        self.requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return httpx.Response(200, content=gzip.compress(b'{"ok": true}'), headers={"Content-Encoding": "gzip"})
+
+        http_client.configure(transport=httpx.MockTransport(handler), async_transport=httpx.MockTransport(handler))
+
+    def teardown_method(self):
+        http_client.configure()
+
+    def test_off_by_default(self):
+        with patch("polyapi.config.CONFIG_OPTIONS", {}), _options():
+            http_client.post("https://example.com/", json={"rows": ["x" * 5000]})
+        assert "Content-Encoding" not in self.requests[0].headers
+
+    def test_large_bodies_gzipped(self):
+        body = {"rows": [{"id": i, "name": f"row {i}"} for i in range(1000)]}
+        with _options(POLY_HTTP_REQUEST_COMPRESSION="gzip"):
+            resp = http_client.post("https://example.com/", json=body)
+        request = self.requests[0]
+        assert request.headers["Content-Encoding"] == "gzip"
+        assert request.headers["Content-Type"] == "application/json"
+        assert int(request.headers["Content-Length"]) == len(request.content)
+        assert json.loads(gzip.decompress(request.content)) == body
+        # compressed responses are advertised and decoded transparently
+        assert "gzip" in request.headers["Accept-Encoding"]
+        assert resp.json() == {"ok": True}
+
+    def test_small_bodies_sent_as_is(self):
+        with _options(POLY_HTTP_REQUEST_COMPRESSION="gzip", POLY_HTTP_REQUEST_COMPRESSION_MIN_BYTES="1024"):
+            http_client.patch("https://example.com/", json={"value": 1})
+        assert "Content-Encoding" not in self.requests[0].headers
+        assert self.requests[0].content == b'{"value":1}'
+
+    def test_async_and_existing_encoding_kept(self):
+        content = gzip.compress(b"x" * 5000)
+        with _options(POLY_HTTP_REQUEST_COMPRESSION="gzip", POLY_HTTP_REQUEST_COMPRESSION_MIN_BYTES="0"):
+            asyncio.run(http_client.async_post("https://example.com/", json={"a": "b" * 10}))
+            http_client.post("https://example.com/", content=content, headers={"Content-Encoding": "gzip"})
+        assert gzip.decompress(self.requests[0].content) == b'{"a":"bbbbbbbbbb"}'
+        assert self.requests[1].content == content
+
+    def test_zstd(self):
+        zstandard = pytest.importorskip("zstandard")
+        with _options(POLY_HTTP_REQUEST_COMPRESSION="zstd", POLY_HTTP_REQUEST_COMPRESSION_MIN_BYTES="0"):
+            http_client.post("https://example.com/", json={"a": 1})
+        assert self.requests[0].headers["Content-Encoding"] == "zstd"
+        assert zstandard.ZstdDecompressor().decompress(self.requests[0].content) == b'{"a":1}'
+
+    def test_unknown_algorithm(self):
+        with _options(POLY_HTTP_REQUEST_COMPRESSION="brotli"):
+            with pytest.raises(ValueError, match="http_request_compression"):
+                http_client.post("https://example.com/", json={"a": 1})
+
+
+class TestWarmup:
+
+    def setup_method(self):
+        self.requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return httpx.Response(404)
+
+        http_client.configure(transport=httpx.MockTransport(handler), async_transport=httpx.MockTransport(handler))
+
+    def teardown_method(self):
+        http_client.configure()
+
+    @patch("polyapi.http_client.get_execution_context", return_value=ExecutionContext("key", "https://api.example.com/"))
+    def test_sync_and_async(self, _):
+        assert polyapi.warmup(connections=3) == 3
+        assert asyncio.run(polyapi.warmup_async(connections=2)) == 2
+        assert {(r.method, str(r.url)) for r in self.requests} == {("HEAD", "https://api.example.com/")}
+        assert len(self.requests) == 5
+
+    @patch("polyapi.http_client.get_execution_context", return_value=ExecutionContext("key", "https://api.example.com"))
+    def test_failures_are_counted_not_raised(self, _):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        http_client.configure(transport=httpx.MockTransport(handler))
+        assert http_client.warmup(connections=2) == 0
+        thread = http_client.warmup_in_background()
+        thread.join(5)
+        assert not thread.is_alive()
+
+    @patch("polyapi.http_client.get_execution_context", return_value=ExecutionContext(None, None))
+    def test_requires_base_url(self, _):
+        with pytest.raises(ValueError, match="not configured"):
+            http_client.warmup()
+
+    def test_warmup_config(self):
+        for value, expected in (("false", 0), ("true", 1), ("4", 4)):
+            with patch.dict("os.environ", {"POLY_WARMUP_ON_IMPORT": value}):
+                assert get_warmup_config() == expected
@@ -1,6 +1,7 @@
 import unittest
+from unittest.mock import Mock, patch
 
-from polyapi.utils import to_type_module_alias
+from polyapi.utils import CODE_IMPORTS, to_type_module_alias
 
 from .test_api import TWILIO
 from polyapi.server import render_server_function
@@ -110,6 +111,14 @@ class T(unittest.TestCase):
         self.assertIn("conversationSID: str", func_str)
         self.assertIn("authToken: str", func_str)
         self.assertIn(f"-> {to_type_module_alias(name)}.ResponseType", func_str)
+        self.assertIn(f"def {name}_batch(", func_str)
+        self.assertIn(f"async def {name}_batch_async(", func_str)
+        self.assertIn(f"-> List[{to_type_module_alias(name)}.ResponseType]", func_str)
+        self.assertIn("'conversationSID': call['conversationSID']", func_str)
+        self.assertIn(f"def {name}_stream(", func_str)
+        self.assertIn(f"def {name}_stream_async(", func_str)
+        self.assertIn(f'return execute_stream("server", "{TWILIO["id"]}"', func_str)
+        self.assertIn(f'{name}.function_id = "{TWILIO["id"]}"', func_str)
 
     def test_render_function_get_products_count(self):
         return_type = GET_PRODUCTS_COUNT["function"]["returnType"]
@@ -176,7 +185,7 @@ class T(unittest.TestCase):
 
         self.assertIn("-> str | None", func_str)
         self.assertIn("try:\n        return resp.text", func_str)
-        self.assertNotIn("return resp.json()", func_str)
+        self.assertNotIn("return decode_response(resp)", func_str)
 
     def test_render_function_mixed_string_union_returns_json(self):
         function_name = "getMaybePayload"
@@ -192,7 +201,7 @@ class T(unittest.TestCase):
         )
 
         self.assertIn("-> str | Dict", func_str)
-        self.assertIn("try:\n        return resp.json()", func_str)
+        self.assertIn("try:\n        return decode_response(resp)", func_str)
 
     def test_render_function_number_nullable_returns_json(self):
         function_name = "getMaybeCount"
@@ -208,4 +217,24 @@ class T(unittest.TestCase):
         )
 
         self.assertIn("-> float | None", func_str)
-        self.assertIn("try:\n        return resp.json()", func_str)
+        self.assertIn("try:\n        return decode_response(resp)", func_str)
+
+    def test_batch_checks_call_arguments(self):
+        arguments = [
+            {"name": "sku", "required": True, "type": {"kind": "primitive", "type": "string"}},
+            {"name": "limit", "required": False, "type": {"kind": "primitive", "type": "number"}},
+        ]
+        func_str, _ = render_server_function("serverFunction", "getStock", "fn-stock", "", arguments, {"kind": "plain", "value": "number"})
+        scope = {}
+        exec(CODE_IMPORTS + func_str, scope)
+        execute_many = Mock(return_value=[])
+        with patch.dict(scope, {"execute_many": execute_many}):
+            scope["getStock_batch"]([{"sku": "a"}, {"sku": "b", "limit": 3}])
+            with self.assertRaisesRegex(TypeError, "call 1: .*'skus'"):
+                scope["getStock_batch"]([{"sku": "a"}, {"sku": "b", "skus": "c"}])
+            with self.assertRaisesRegex(TypeError, "call 0: missing .*'sku'"):
+                scope["getStock_batch"]([{"limit": 3}])
+        execute_many.assert_called_once_with([
+            ("server", "fn-stock", {"sku": "a", "limit": None}),
+            ("server", "fn-stock", {"sku": "b", "limit": 3}),
+        ], 10)
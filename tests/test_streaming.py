@@ -0,0 +1,245 @@
+import asyncio
+import gzip
+import io
+import json
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from polyapi import http_client
+from polyapi.config import ExecutionContext
+from polyapi.exceptions import PolyApiException
+from polyapi.execute import direct_execute_stream, execute_stream, execute_stream_async
+from polyapi.streaming import JsonArrayParser
+
+_CONFIG_PATCH = patch("polyapi.execute.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com"))
+
+ROWS = [{"id": i, "name": f"row, ]{i}", "score": i * 1.5, "tags": [i, None, True]} for i in range(200)]
+
+
+def _feed_in_chunks(parser, text, size):
+    items = []
+    for i in range(0, len(text), size):
+        items += parser.feed(text[i:i + size])
+    return items + parser.feed("", final=True)
+
+
+class TestJsonArrayParser:
+
+    @pytest.mark.parametrize("size", [1, 7, 64, 100000])
+    def test_top_level_array(self, size):
+        text = json.dumps(ROWS, indent=2)
+        assert _feed_in_chunks(JsonArrayParser(), text, size) == ROWS
+
+    @pytest.mark.parametrize("size", [1, 13, 100000])
+    def test_array_under_key(self, size):
+        text = json.dumps({"meta": {"skip": [1, {"x": "]"}]}, "data": ROWS, "after": [1, 2]})
+        assert _feed_in_chunks(JsonArrayParser("data"), text, size) == ROWS
+
+    def test_numbers_split_across_chunks(self):
+        assert _feed_in_chunks(JsonArrayParser(), "[12345, 678]", 3) == [12345, 678]
+
+    @pytest.mark.parametrize("text", ['[1, 2.5, -3e2, 4E+1, 0.25e-1, true, "x", {"n": 12.5}]', '{"data": [10, 2.75, 6e-3]}'])
+    def test_split_at_every_offset(self, text):
+        key = "data" if text.startswith("{") else None
+        expected = json.loads(text) if key is None else json.loads(text)[key]
+        for split in range(1, len(text)):
+            parser = JsonArrayParser(key)
+            items = parser.feed(text[:split]) + parser.feed(text[split:-1])
+            items += parser.feed(text[-1:], final=True)
+            assert items == expected, split
+
+    @pytest.mark.parametrize("chunks, expected", [(["[1, 2", ".", "5]"], [1, 2.5]), (["[3", "e", "2]"], [300.0])])
+    def test_number_continued_by_a_single_character(self, chunks, expected):
+        parser = JsonArrayParser()
+        items = [item for chunk in chunks for item in parser.feed(chunk)]
+        assert items + parser.feed("", final=True) == expected
+
+    def test_empty_array(self):
+        assert JsonArrayParser().feed(" [ ] ", final=True) == []
+
+    @pytest.mark.parametrize("text, key", [
+        ('{"data": 1}', None),
+        ('{"other": []}', "data"),
+        ("[1, 2", None),
+        ("[1 2]", None),
+    ])
+    def test_invalid(self, text, key):
+        with pytest.raises(ValueError):
+            JsonArrayParser(key).feed(text, final=True)
+
+
+def _streaming_handler(body: bytes, status: int = 200):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        # a byte stream so the client really reads it in chunks
+        chunks = [body[i:i + 100] for i in range(0, len(body), 100)]
+        return httpx.Response(status, stream=_Chunks(chunks))
+
+    return handler, requests
+
+
+class _Chunks(httpx.SyncByteStream, httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        yield from self.chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class TestExecuteStream:
+
+    def teardown_method(self):
+        http_client.configure()
+
+    @_CONFIG_PATCH
+    def test_iter_items(self, _):
+        handler, requests = _streaming_handler(json.dumps(ROWS).encode())
+        http_client.configure(transport=httpx.MockTransport(handler))
+        with execute_stream("server", "fn-1", {"a": 1}) as stream:
+            assert stream.status_code == 200
+            assert list(stream.iter_items()) == ROWS
+        assert requests[0].url.path == "/functions/server/fn-1/execute"
+        assert json.loads(requests[0].content) == {"a": 1}
+
+    @_CONFIG_PATCH
+    def test_iter_records(self, _):
+        body = "\n".join(json.dumps(row) for row in ROWS).encode() + b"\n"
+        handler, _ = _streaming_handler(body)
+        http_client.configure(transport=httpx.MockTransport(handler))
+        assert list(execute_stream("server", "fn-1", {}).iter_records()) == ROWS
+
+    @_CONFIG_PATCH
+    def test_iter_bytes_and_lazy_open(self, _):
+        body = json.dumps(ROWS).encode()
+        handler, requests = _streaming_handler(body)
+        http_client.configure(transport=httpx.MockTransport(handler))
+        stream = execute_stream("server", "fn-1", {})
+        assert requests == []
+        assert b"".join(stream.iter_bytes()) == body
+        assert stream.response.is_closed
+
+    @_CONFIG_PATCH
+    def test_error_raises(self, _):
+        handler, _ = _streaming_handler(b"boom", status=500)
+        http_client.configure(transport=httpx.MockTransport(handler))
+        with pytest.raises(PolyApiException, match="500: boom"):
+            with execute_stream("server", "fn-1", {}):
+                pass
+
+    @_CONFIG_PATCH
+    def test_async(self, _):
+        handler, _ = _streaming_handler(json.dumps({"data": ROWS}).encode())
+        http_client.configure(async_transport=httpx.MockTransport(handler))
+
+        async def _run():
+            async with execute_stream_async("api", "fn-1", {}) as stream:
+                return [item async for item in stream.iter_items("data")]
+
+        assert asyncio.run(_run()) == ROWS
+
+    @_CONFIG_PATCH
+    def test_direct_execute(self, _):
+        endpoint = {"url": "https://target.example.com/rows", "method": "GET", "headers": {"X-Key": "k"}}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "api.example.com":
+                return httpx.Response(200, json=endpoint)
+            assert request.method == "GET" and request.headers["X-Key"] == "k"
+            return httpx.Response(200, json=ROWS)
+
+        http_client.configure(transport=httpx.MockTransport(handler))
+        with patch("polyapi.execute.get_mtls_config", return_value=(False, None, None, None)):
+            with direct_execute_stream("api", "fn-1", {}) as stream:
+                assert list(stream.iter_items()) == ROWS
+
+
+class TestDownload:
+
+    def setup_method(self):
+        self.body = bytes(range(256)) * 4000
+        handler, _ = _streaming_handler(self.body)
+        transport = httpx.MockTransport(handler)
+        http_client.configure(transport=transport, async_transport=transport)
+
+    def teardown_method(self):
+        http_client.configure()
+
+    @_CONFIG_PATCH
+    def test_download_to_path(self, _, tmp_path):
+        path = tmp_path / "out.bin"
+        assert execute_stream("api", "fn-1", {}).download(path) == len(self.body)
+        assert path.read_bytes() == self.body
+        assert not (tmp_path / "out.bin.part").exists()
+
+    @_CONFIG_PATCH
+    def test_download_to_file_object(self, _):
+        out = io.BytesIO()
+        stream = execute_stream("api", "fn-1", {})
+        stream.download(out)
+        assert out.getvalue() == self.body
+        assert stream.response.is_closed
+
+    @_CONFIG_PATCH
+    def test_failed_download_leaves_no_file(self, _, tmp_path):
+        path = tmp_path / "out.bin"
+        stream = execute_stream("api", "fn-1", {})
+        with patch.object(stream, "_write_body", side_effect=httpx.ReadError("reset")):
+            with pytest.raises(httpx.ReadError):
+                stream.download(path)
+        assert list(tmp_path.iterdir()) == []
+
+    @_CONFIG_PATCH
+    def test_readinto(self, _):
+        buffer = bytearray(len(self.body) + 10)
+        assert execute_stream("api", "fn-1", {}).readinto(buffer) == len(self.body)
+        assert buffer[:len(self.body)] == self.body
+
+    @_CONFIG_PATCH
+    def test_readinto_too_small(self, _):
+        stream = execute_stream("api", "fn-1", {})
+        with pytest.raises(ValueError, match="larger than the buffer"):
+            stream.readinto(memoryview(bytearray(100)))
+        assert stream.response.is_closed
+
+    @_CONFIG_PATCH
+    def test_gzip_body(self, _, tmp_path):
+        # incompressible, so Content-Length (compressed) is larger than the body written
+        body = os.urandom(50_000)
+        compressed = gzip.compress(body)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            headers = {"Content-Encoding": "gzip", "Content-Length": str(len(compressed))}
+            return httpx.Response(200, headers=headers, stream=_Chunks([compressed[i:i + 1000] for i in range(0, len(compressed), 1000)]))
+
+        transport = httpx.MockTransport(handler)
+        http_client.configure(transport=transport, async_transport=transport)
+        buffer = bytearray(len(body))
+        assert execute_stream("api", "fn-1", {}).readinto(buffer) == len(body)
+        assert buffer == body
+        path = tmp_path / "out.bin"
+        assert execute_stream("api", "fn-1", {}).download(path) == len(body)
+        assert path.read_bytes() == body
+        async_buffer = bytearray(len(body))
+        assert asyncio.run(execute_stream_async("api", "fn-1", {}).readinto(async_buffer)) == len(body)
+        assert async_buffer == body
+
+    @_CONFIG_PATCH
+    def test_async(self, _, tmp_path):
+        path = tmp_path / "out.bin"
+        buffer = bytearray(len(self.body))
+
+        async def _run():
+            written = await execute_stream_async("api", "fn-1", {}).download(str(path))
+            return written, await execute_stream_async("api", "fn-1", {}).readinto(buffer)
+
+        assert asyncio.run(_run()) == (len(self.body), len(self.body))
+        assert path.read_bytes() == self.body == buffer
@@ -1,6 +1,16 @@
+import asyncio
+import importlib.util
+import inspect
+import json
 import unittest
-from unittest.mock import Mock, patch
-from polyapi.poly_tables import _render_table, TABI_MODULE_IMPORTS, execute_query
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+
+from polyapi import http_client
+from polyapi.config import ExecutionContext
+from polyapi.exceptions import PolyApiException
+from polyapi.poly_tables import _column_kind, _render_table, TABI_MODULE_IMPORTS, bulk_write, columnar_results, bulk_write_async, execute_query, execute_query_async, iter_table_batches, iter_table_rows, iter_table_rows_async, to_arrow, to_numpy
 from polyapi.typedefs import TableSpecDto
 import re
 
@@ -107,12 +117,30 @@ class MyTableSelectManyQuery(TypedDict):
     order_by: NotRequired[Dict[MyTableColumns, SortOrder]]
     limit: NotRequired[int]
     offset: NotRequired[int]
+    select: NotRequired[List[MyTableColumns]]
+
+
+
+class MyTableSelectManyProjectedQuery(TypedDict):
+    select: List[MyTableColumns]
+    where: NotRequired[MyTableWhereFilter]
+    order_by: NotRequired[Dict[MyTableColumns, SortOrder]]
+    limit: NotRequired[int]
+    offset: NotRequired[int]
 
 
 
 class MyTableSelectOneQuery(TypedDict):
     where: NotRequired[MyTableWhereFilter]
     order_by: NotRequired[Dict[MyTableColumns, SortOrder]]
+    select: NotRequired[List[MyTableColumns]]
+
+
+
+class MyTableSelectOneProjectedQuery(TypedDict):
+    select: List[MyTableColumns]
+    where: NotRequired[MyTableWhereFilter]
+    order_by: NotRequired[Dict[MyTableColumns, SortOrder]]
 
 
 
@@ -143,6 +171,13 @@ class MyTableQueryResults(TypedDict):
 
 
 
+class MyTablePartialQueryResults(TypedDict):
+    # rows of a query with select, only the selected columns are present
+    results: List[MyTableSubset]
+    pagination: None
+
+
+
 class MyTableCountQuery(TypedDict):
     where: NotRequired[MyTableWhereFilter]
 
@@ -155,6 +190,7 @@ class MyTable:
          - If user is active on the platform
     """
     table_id = "123456789"
+    column_types = {'id': 'string', 'createdAt': 'string', 'updatedAt': 'string', 'name': 'string', 'age': 'integer', 'active': 'boolean', 'optional': 'object'}
 
     @overload
     @staticmethod
@@ -173,15 +209,45 @@ class MyTable:
             query = kwargs
         return execute_query(MyTable.table_id, "count", transform_query(query))
 
+    @overload
+    @staticmethod
+    async def count_async(query: MyTableCountQuery) -> PolyCountResult: ...
+    @overload
+    @staticmethod
+    async def count_async(*, where: Optional[MyTableWhereFilter]) -> PolyCountResult: ...
+
+    @staticmethod
+    async def count_async(*args, **kwargs) -> PolyCountResult:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return await execute_query_async(MyTable.table_id, "count", transform_query(query))
+
+
+    @overload
+    @staticmethod
+    def select_many(query: MyTableSelectManyProjectedQuery) -> MyTablePartialQueryResults: ...
     @overload
     @staticmethod
     def select_many(query: MyTableSelectManyQuery) -> MyTableQueryResults: ...
     @overload
     @staticmethod
+    def select_many(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]], limit: Optional[int], offset: Optional[int], select: List[MyTableColumns]) -> MyTablePartialQueryResults: ...
+    @overload
+    @staticmethod
     def select_many(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]], limit: Optional[int], offset: Optional[int]) -> MyTableQueryResults: ...
+    @overload
+    @staticmethod
+    def select_many(query: MyTableSelectManyQuery, *, format: ColumnarFormat) -> Any: ...
+    @overload
+    @staticmethod
+    def select_many(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]], limit: Optional[int], offset: Optional[int], select: Optional[List[MyTableColumns]] = None, format: ColumnarFormat) -> Any: ...
 
     @staticmethod
-    def select_many(*args, **kwargs) -> MyTableQueryResults:
+    def select_many(*args, format: TableFormat = "rows", **kwargs) -> Any:
         if args:
             if len(args) != 1 or not isinstance(args[0], dict):
                 raise TypeError("Expected query as a single argument or as kwargs")
@@ -192,13 +258,86 @@ class MyTable:
             query['limit'] = 1000
         if query['limit'] > 1000:
             raise ValueError("Cannot select more than 1000 rows at a time.")
-        return execute_query(MyTable.table_id, "select", transform_query(query))
+        results = execute_query(MyTable.table_id, "select", transform_query(query))
+        return results if format == "rows" else columnar_results(results, format, MyTable.column_types, query.get("select"))
 
+    @overload
+    @staticmethod
+    async def select_many_async(query: MyTableSelectManyProjectedQuery) -> MyTablePartialQueryResults: ...
+    @overload
+    @staticmethod
+    async def select_many_async(query: MyTableSelectManyQuery) -> MyTableQueryResults: ...
+    @overload
+    @staticmethod
+    async def select_many_async(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]], limit: Optional[int], offset: Optional[int], select: List[MyTableColumns]) -> MyTablePartialQueryResults: ...
+    @overload
+    @staticmethod
+    async def select_many_async(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]], limit: Optional[int], offset: Optional[int]) -> MyTableQueryResults: ...
+    @overload
+    @staticmethod
+    async def select_many_async(query: MyTableSelectManyQuery, *, format: ColumnarFormat) -> Any: ...
+    @overload
+    @staticmethod
+    async def select_many_async(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]], limit: Optional[int], offset: Optional[int], select: Optional[List[MyTableColumns]] = None, format: ColumnarFormat) -> Any: ...
+
+    @staticmethod
+    async def select_many_async(*args, format: TableFormat = "rows", **kwargs) -> Any:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        if query.get('limit') is None:
+            query['limit'] = 1000
+        if query['limit'] > 1000:
+            raise ValueError("Cannot select more than 1000 rows at a time.")
+        results = await execute_query_async(MyTable.table_id, "select", transform_query(query))
+        return results if format == "rows" else columnar_results(results, format, MyTable.column_types, query.get("select"))
+
+    @overload
+    @staticmethod
+    def iter_rows(*, where: Optional[MyTableWhereFilter] = None, order_by: Optional[Dict[MyTableColumns, SortOrder]] = None, page_size: int = 1000, select: None = None) -> Iterator[MyTableRow]: ...
+    @overload
+    @staticmethod
+    def iter_rows(*, where: Optional[MyTableWhereFilter] = None, order_by: Optional[Dict[MyTableColumns, SortOrder]] = None, page_size: int = 1000, select: List[MyTableColumns]) -> Iterator[MyTableSubset]: ...
+
+    @staticmethod
+    def iter_rows(*, where: Optional[MyTableWhereFilter] = None, order_by: Optional[Dict[MyTableColumns, SortOrder]] = None, page_size: int = 1000, select: Optional[List[MyTableColumns]] = None) -> Iterator[Any]:
+        """Yield every matching row, fetching page_size rows at a time (keyset paginated, next page prefetched)."""
+        return iter_table_rows(MyTable.table_id, where, order_by, page_size, ('id', 'createdAt', 'updatedAt', 'name', 'age'), select)  # type: ignore
+
+    @overload
+    @staticmethod
+    def iter_rows_async(*, where: Optional[MyTableWhereFilter] = None, order_by: Optional[Dict[MyTableColumns, SortOrder]] = None, page_size: int = 1000, select: None = None) -> AsyncIterator[MyTableRow]: ...
+    @overload
+    @staticmethod
+    def iter_rows_async(*, where: Optional[MyTableWhereFilter] = None, order_by: Optional[Dict[MyTableColumns, SortOrder]] = None, page_size: int = 1000, select: List[MyTableColumns]) -> AsyncIterator[MyTableSubset]: ...
+
+    @staticmethod
+    def iter_rows_async(*, where: Optional[MyTableWhereFilter] = None, order_by: Optional[Dict[MyTableColumns, SortOrder]] = None, page_size: int = 1000, select: Optional[List[MyTableColumns]] = None) -> AsyncIterator[Any]:
+        return iter_table_rows_async(MyTable.table_id, where, order_by, page_size, ('id', 'createdAt', 'updatedAt', 'name', 'age'), select)  # type: ignore
+
+    @staticmethod
+    def iter_batches(*, where: Optional[MyTableWhereFilter] = None, order_by: Optional[Dict[MyTableColumns, SortOrder]] = None, batch_size: int = 1000, format: ColumnarFormat = "columns", select: Optional[List[MyTableColumns]] = None) -> Iterator[Any]:
+        """Like iter_rows, but yields each page as columns, numpy arrays or a pyarrow Table."""
+        return iter_table_batches(MyTable.table_id, MyTable.column_types, where, order_by, batch_size, format, ('id', 'createdAt', 'updatedAt', 'name', 'age'), select)  # type: ignore
+
+    @staticmethod
+    def iter_batches_async(*, where: Optional[MyTableWhereFilter] = None, order_by: Optional[Dict[MyTableColumns, SortOrder]] = None, batch_size: int = 1000, format: ColumnarFormat = "columns", select: Optional[List[MyTableColumns]] = None) -> AsyncIterator[Any]:
+        return iter_table_batches_async(MyTable.table_id, MyTable.column_types, where, order_by, batch_size, format, ('id', 'createdAt', 'updatedAt', 'name', 'age'), select)  # type: ignore
+
+    @overload
+    @staticmethod
+    def select_one(query: MyTableSelectOneProjectedQuery) -> MyTableSubset: ...
     @overload
     @staticmethod
     def select_one(query: MyTableSelectOneQuery) -> MyTableRow: ...
     @overload
     @staticmethod
+    def select_one(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]], select: List[MyTableColumns]) -> MyTableSubset: ...
+    @overload
+    @staticmethod
     def select_one(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]]) -> MyTableRow: ...
 
     @staticmethod
@@ -212,6 +351,30 @@ class MyTable:
         query['limit'] = 1
         return first_result(execute_query(MyTable.table_id, "select", transform_query(query)))
 
+    @overload
+    @staticmethod
+    async def select_one_async(query: MyTableSelectOneProjectedQuery) -> MyTableSubset: ...
+    @overload
+    @staticmethod
+    async def select_one_async(query: MyTableSelectOneQuery) -> MyTableRow: ...
+    @overload
+    @staticmethod
+    async def select_one_async(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]], select: List[MyTableColumns]) -> MyTableSubset: ...
+    @overload
+    @staticmethod
+    async def select_one_async(*, where: Optional[MyTableWhereFilter], order_by: Optional[Dict[MyTableColumns, SortOrder]]) -> MyTableRow: ...
+
+    @staticmethod
+    async def select_one_async(*args, **kwargs) -> MyTableRow:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        query['limit'] = 1
+        return first_result(await execute_query_async(MyTable.table_id, "select", transform_query(query)))
+
     @overload
     @staticmethod
     def insert_many(query: MyTableInsertManyQuery) -> MyTableQueryResults: ...
@@ -231,6 +394,25 @@ class MyTable:
             raise ValueError("Cannot insert more than 1000 rows at a time.")
         return execute_query(MyTable.table_id, "insert", query)
 
+    @overload
+    @staticmethod
+    async def insert_many_async(query: MyTableInsertManyQuery) -> MyTableQueryResults: ...
+    @overload
+    @staticmethod
+    async def insert_many_async(*, data: List[MyTableSubset]) -> MyTableQueryResults: ...
+
+    @staticmethod
+    async def insert_many_async(*args, **kwargs) -> MyTableQueryResults:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        if len(query['data']) > 1000:
+            raise ValueError("Cannot insert more than 1000 rows at a time.")
+        return await execute_query_async(MyTable.table_id, "insert", query)
+
     @overload
     @staticmethod
     def insert_one(query: MyTableInsertOneQuery) -> MyTableRow: ...
@@ -248,6 +430,23 @@ class MyTable:
             query = kwargs
         return first_result(execute_query(MyTable.table_id, "insert", { 'data': [query['data']] }))
 
+    @overload
+    @staticmethod
+    async def insert_one_async(query: MyTableInsertOneQuery) -> MyTableRow: ...
+    @overload
+    @staticmethod
+    async def insert_one_async(*, data: MyTableSubset) -> MyTableRow: ...
+
+    @staticmethod
+    async def insert_one_async(*args, **kwargs) -> MyTableRow:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return first_result(await execute_query_async(MyTable.table_id, "insert", { 'data': [query['data']] }))
+
     @overload
     @staticmethod
     def upsert_many(query: MyTableInsertManyQuery) -> MyTableQueryResults: ...
@@ -263,10 +462,47 @@ class MyTable:
             query = args[0]
         else:
             query = kwargs
-        if len(data) > 1000:
+        if len(query['data']) > 1000:
             raise ValueError("Cannot upsert more than 1000 rows at a time.")
         return execute_query(MyTable.table_id, "upsert", query)
 
+    @overload
+    @staticmethod
+    async def upsert_many_async(query: MyTableInsertManyQuery) -> MyTableQueryResults: ...
+    @overload
+    @staticmethod
+    async def upsert_many_async(*, data: List[MyTableSubset]) -> MyTableQueryResults: ...
+
+    @staticmethod
+    async def upsert_many_async(*args, **kwargs) -> MyTableQueryResults:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        if len(query['data']) > 1000:
+            raise ValueError("Cannot upsert more than 1000 rows at a time.")
+        return await execute_query_async(MyTable.table_id, "upsert", query)
+
+    @staticmethod
+    def bulk_insert(rows: Iterable[MyTableSubset], chunk_size: int = 1000, max_in_flight: int = 4) -> BulkWriteResult:
+        """Insert any number of rows, chunk_size per request and max_in_flight requests at a time. Failed chunks are reported, not raised."""
+        return bulk_write(MyTable.table_id, "insert", rows, chunk_size, max_in_flight)  # type: ignore
+
+    @staticmethod
+    async def bulk_insert_async(rows: Iterable[MyTableSubset], chunk_size: int = 1000, max_in_flight: int = 4) -> BulkWriteResult:
+        return await bulk_write_async(MyTable.table_id, "insert", rows, chunk_size, max_in_flight)  # type: ignore
+
+    @staticmethod
+    def bulk_upsert(rows: Iterable[MyTableSubset], chunk_size: int = 1000, max_in_flight: int = 4) -> BulkWriteResult:
+        """Upsert any number of rows, chunk_size per request and max_in_flight requests at a time. Failed chunks are reported, not raised."""
+        return bulk_write(MyTable.table_id, "upsert", rows, chunk_size, max_in_flight)  # type: ignore
+
+    @staticmethod
+    async def bulk_upsert_async(rows: Iterable[MyTableSubset], chunk_size: int = 1000, max_in_flight: int = 4) -> BulkWriteResult:
+        return await bulk_write_async(MyTable.table_id, "upsert", rows, chunk_size, max_in_flight)  # type: ignore
+
     @overload
     @staticmethod
     def upsert_one(query: MyTableInsertOneQuery) -> MyTableRow: ...
@@ -284,6 +520,23 @@ class MyTable:
             query = kwargs
         return first_result(execute_query(MyTable.table_id, "upsert", { 'data': [query['data']] }))
 
+    @overload
+    @staticmethod
+    async def upsert_one_async(query: MyTableInsertOneQuery) -> MyTableRow: ...
+    @overload
+    @staticmethod
+    async def upsert_one_async(*, data: MyTableSubset) -> MyTableRow: ...
+
+    @staticmethod
+    async def upsert_one_async(*args, **kwargs) -> MyTableRow:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return first_result(await execute_query_async(MyTable.table_id, "upsert", { 'data': [query['data']] }))
+
     @overload
     @staticmethod
     def update_many(query: MyTableUpdateManyQuery) -> MyTableQueryResults: ...
@@ -301,6 +554,23 @@ class MyTable:
             query = kwargs
         return execute_query(MyTable.table_id, "update", transform_query(query))
 
+    @overload
+    @staticmethod
+    async def update_many_async(query: MyTableUpdateManyQuery) -> MyTableQueryResults: ...
+    @overload
+    @staticmethod
+    async def update_many_async(*, where: Optional[MyTableWhereFilter], data: MyTableSubset) -> MyTableQueryResults: ...
+
+    @staticmethod
+    async def update_many_async(*args, **kwargs) -> MyTableQueryResults:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return await execute_query_async(MyTable.table_id, "update", transform_query(query))
+
     @overload
     @staticmethod
     def update_one(id: str, query: MyTableUpdateManyQuery) -> MyTableRow: ...
@@ -325,6 +595,30 @@ class MyTable:
             query.pop("id", None)
         return first_result(execute_query(MyTable.table_id, "update", transform_query(query)))
 
+    @overload
+    @staticmethod
+    async def update_one_async(id: str, query: MyTableUpdateManyQuery) -> MyTableRow: ...
+    @overload
+    @staticmethod
+    async def update_one_async(*, id: str, where: Optional[MyTableWhereFilter], data: MyTableSubset) -> MyTableRow: ...
+
+    @staticmethod
+    async def update_one_async(*args, **kwargs) -> MyTableRow:
+        if args:
+            if len(args) != 2 or not isinstance(args[0], str) or not isinstance(args[1], dict):
+                raise TypeError("Expected id and query as arguments or as kwargs")
+            query = args[1]
+            if not isinstance(query["where"], dict):
+                query["where"] = {}
+            query["where"]["id"] = args[0]
+        else:
+            query = kwargs
+            if not isinstance(query["where"], dict):
+                query["where"] = {}
+            query["where"]["id"] = kwargs["id"]
+            query.pop("id", None)
+        return first_result(await execute_query_async(MyTable.table_id, "update", transform_query(query)))
+
     @overload
     @staticmethod
     def delete_many(query: MyTableDeleteQuery) -> PolyDeleteResults: ...
@@ -342,6 +636,23 @@ class MyTable:
             query = kwargs
         return execute_query(MyTable.table_id, "delete", transform_query(query))
 
+    @overload
+    @staticmethod
+    async def delete_many_async(query: MyTableDeleteQuery) -> PolyDeleteResults: ...
+    @overload
+    @staticmethod
+    async def delete_many_async(*, where: Optional[MyTableWhereFilter]) -> PolyDeleteResults: ...
+
+    @staticmethod
+    async def delete_many_async(*args, **kwargs) -> PolyDeleteResults:
+        if args:
+            if len(args) != 1 or not isinstance(args[0], dict):
+                raise TypeError("Expected query as a single argument or as kwargs")
+            query = args[0]
+        else:
+            query = kwargs
+        return await execute_query_async(MyTable.table_id, "delete", transform_query(query))
+
     @overload
     @staticmethod
     def delete_one(query: MyTableDeleteQuery) -> PolyDeleteResult: ...
@@ -365,6 +676,30 @@ class MyTable:
             query["where"]["id"] = kwargs["id"]
             query.pop("id", None)
         return delete_one_response(execute_query(MyTable.table_id, "delete", transform_query(query)))
+
+    @overload
+    @staticmethod
+    async def delete_one_async(query: MyTableDeleteQuery) -> PolyDeleteResult: ...
+    @overload
+    @staticmethod
+    async def delete_one_async(*, where: Optional[MyTableWhereFilter]) -> PolyDeleteResult: ...
+
+    @staticmethod
+    async def delete_one_async(*args, **kwargs) -> PolyDeleteResult:
+        if args:
+            if len(args) != 2 or not isinstance(args[0], str) or not isinstance(args[1], dict):
+                raise TypeError("Expected id and query as arguments or as kwargs")
+            query = args[1]
+            if not isinstance(query["where"], dict):
+                query["where"] = {}
+            query["where"]["id"] = args[0]
+        else:
+            query = kwargs
+            if not isinstance(query["where"], dict):
+                query["where"] = {}
+            query["where"]["id"] = kwargs["id"]
+            query.pop("id", None)
+        return delete_one_response(await execute_query_async(MyTable.table_id, "delete", transform_query(query)))
 '''
 
 TABLE_SPEC_COMPLEX: TableSpecDto = {
@@ -692,8 +1027,8 @@ class T(unittest.TestCase):
 
         with (
             patch(
-                "polyapi.poly_tables.get_api_key_and_url",
-                return_value=("test-api-key", "https://na1.polyapi.io"),
+                "polyapi.poly_tables.get_execution_context",
+                return_value=ExecutionContext("test-api-key", "https://na1.polyapi.io"),
             ),
             patch(
                 "polyapi.http_client.post", return_value=response
@@ -728,3 +1063,255 @@ class T(unittest.TestCase):
         self.maxDiff = 20000
         output = _render_table(TABLE_SPEC_COMPLEX)
         self.assertEqual(output, EXPECTED_COMPLEX)
+
+
+def _matches(row, where):
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "AND":
+            if not all(_matches(row, w) for w in condition if w):
+                return False
+        elif key == "OR":
+            if not any(_matches(row, w) for w in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = row.get(key)
+            for op, operand in condition.items():
+                if op == "equals" and value != operand:
+                    return False
+                if op == "gt" and (value is None or value <= operand):
+                    return False
+                if op == "lt" and (value is None or value >= operand):
+                    return False
+        elif row.get(key) != condition:
+            return False
+    return True
+
+
+class FakeTable:
+    """ a stand-in for the tables api, evaluating the query subset iter_rows uses """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)
+        self.queries.append(query)
+        rows = [row for row in self.rows if _matches(row, query.get("where"))]
+        for column, direction in reversed(list((query.get("orderBy") or {}).items())):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=direction == "desc")
+        offset = query.get("offset") or 0
+        rows = rows[offset:offset + query["limit"]]
+        if query.get("select"):
+            rows = [{column: row.get(column) for column in query["select"]} for row in rows]
+        return httpx.Response(200, json={"results": rows, "pagination": None})
+
+
+class TestIterRows(unittest.TestCase):
+    def setUp(self):
+        self.table = FakeTable([{"id": f"{i:04}", "age": i % 7, "name": None if i % 5 else "x"} for i in range(53)])
+        transport = httpx.MockTransport(self.table.handler)
+        http_client.configure(transport=transport, async_transport=transport)
+        context = patch("polyapi.poly_tables.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com"))
+        context.start()
+        self.addCleanup(context.stop)
+        self.addCleanup(http_client.configure)
+
+    def test_keyset_pages(self):
+        rows = list(iter_table_rows("t", order_by={"age": "desc"}, page_size=10, keyset_columns=("id", "age")))
+        expected = sorted(self.table.rows, key=lambda row: (-row["age"], row["id"]))
+        self.assertEqual([row["id"] for row in rows], [row["id"] for row in expected])
+        self.assertEqual(len(self.table.queries), 6)
+        self.assertTrue(all("offset" not in query for query in self.table.queries))
+        self.assertEqual(self.table.queries[1]["orderBy"], {"age": "desc", "id": "asc"})
+
+    def test_where_is_kept(self):
+        rows = list(iter_table_rows("t", where={"age": 3}, page_size=2))
+        self.assertEqual([row["id"] for row in rows], [row["id"] for row in self.table.rows if row["age"] == 3])
+
+    def test_nullable_sort_column_pages_with_offset(self):
+        rows = list(iter_table_rows("t", order_by={"name": "asc"}, page_size=10, keyset_columns=("id", "age")))
+        self.assertEqual(sorted(row["id"] for row in rows), [row["id"] for row in self.table.rows])
+        self.assertEqual([query.get("offset") for query in self.table.queries], [None, 10, 20, 30, 40, 50])
+
+    def test_batches(self):
+        batches = list(iter_table_batches("t", {"id": "string", "age": "integer"}, where={"age": 3}, batch_size=5))
+        self.assertEqual([len(batch["id"]) for batch in batches], [5, 3])
+        self.assertEqual(set(batches[0]), {"id", "age"})
+        self.assertEqual(set(batches[1]["age"]), {3})
+
+    def test_select_fetches_sort_columns_too(self):
+        rows = list(iter_table_rows("t", order_by={"age": "asc"}, page_size=20, keyset_columns=("id", "age"), select=["name"]))
+        self.assertEqual(len(rows), 53)
+        self.assertEqual(set(rows[0]), {"name", "age", "id"})
+        self.assertTrue(all(query["select"] == ["name", "age", "id"] for query in self.table.queries))
+        batch = next(iter_table_batches("t", {"id": "string", "age": "integer", "name": "string"}, select=["name"]))
+        self.assertEqual(list(batch), ["name"])
+
+    def test_boolean_sort_column_pages_with_offset(self):
+        for row in self.table.rows:
+            row["active"] = row["age"] % 2 == 0
+        scope = {}
+        exec(f"{TABI_MODULE_IMPORTS}\n\n\n{_render_table(TABLE_SPEC_SIMPLE)}", scope)
+        rows = list(scope["MyTable"].iter_rows(order_by={"active": "asc"}, page_size=10))
+        self.assertEqual(sorted(row["id"] for row in rows), [row["id"] for row in self.table.rows])
+        self.assertEqual([query.get("offset") for query in self.table.queries], [None, 10, 20, 30, 40, 50])
+
+    def test_async(self):
+        async def collect():
+            return [row["id"] async for row in iter_table_rows_async("t", page_size=10)]
+
+        self.assertEqual(asyncio.run(collect()), [row["id"] for row in self.table.rows])
+
+    def test_errors_raise(self):
+        http_client.configure(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+        with self.assertRaises(PolyApiException):
+            list(iter_table_rows("t"))
+
+
+class TestBulkWrite(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            rows = json.loads(request.content)["data"]
+            self.requests.append((request.url.path, len(rows)))
+            if any(row.get("bad") for row in rows):
+                return httpx.Response(400, json={"message": "bad row"})
+            return httpx.Response(200, json={"results": rows, "pagination": None})
+
+        http_client.configure(async_transport=httpx.MockTransport(handler))
+        context = patch("polyapi.poly_tables.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com"))
+        context.start()
+        self.addCleanup(context.stop)
+        self.addCleanup(http_client.configure)
+
+    def test_streams_chunks_and_reports_failures(self):
+        rows = ({"n": i, "bad": i == 2500} for i in range(4321))
+        result = bulk_write("t", "insert", rows, chunk_size=1000, max_in_flight=3)
+        self.assertEqual(sorted(size for _, size in self.requests), [321, 1000, 1000, 1000, 1000])
+        self.assertEqual((result.rows, result.chunks, result.ok), (3321, 5, False))
+        failed, = result.failed
+        self.assertEqual((failed.index, failed.offset, failed.rows[0]["n"], result.failed_rows), (2, 2000, 2000, 1000))
+        self.assertIsInstance(failed.error, PolyApiException)
+
+    def test_async_upsert(self):
+        result = asyncio.run(bulk_write_async("t", "upsert", [{"n": i} for i in range(5)], chunk_size=2))
+        self.assertEqual((result.rows, result.chunks, result.ok), (5, 3, True))
+        self.assertTrue(all(path.endswith("/upsert") for path, _ in self.requests))
+
+    def test_chunk_size_is_capped(self):
+        with self.assertRaises(ValueError):
+            bulk_write("t", "insert", [], chunk_size=1001)
+
+    def test_generated_upsert_many(self):
+        scope = {}
+        exec(f"{TABI_MODULE_IMPORTS}\n\n\n{_render_table(TABLE_SPEC_SIMPLE)}", scope)
+        with patch.dict(scope, {"execute_query": Mock(return_value={"results": []})}):
+            scope["MyTable"].upsert_many(data=[{"name": "a"}])
+            scope["execute_query"].assert_called_once_with("123456789", "upsert", {"data": [{"name": "a"}]})
+            with self.assertRaises(ValueError):
+                scope["MyTable"].upsert_many(data=[{}] * 1001)
+
+
+class TestAsyncTableMethods(unittest.TestCase):
+    def setUp(self):
+        self.scope = {}
+        exec(f"{TABI_MODULE_IMPORTS}\n\n\n{_render_table(TABLE_SPEC_SIMPLE)}", self.scope)
+        self.table = self.scope["MyTable"]
+
+    def test_async_methods_transform_queries_like_sync_ones(self):
+        execute_query_async = AsyncMock(return_value={"results": [{"id": "a"}], "pagination": None})
+        with patch.dict(self.scope, {"execute_query_async": execute_query_async}):
+            results = asyncio.run(self.table.select_many_async(where={"name": {"not_in": ["x"]}}, order_by={"age": "desc"}))
+            row = asyncio.run(self.table.update_one_async("a", {"where": None, "data": {"age": 3}}))
+            deleted = asyncio.run(self.table.delete_one_async(id="a", where=None))
+        self.assertEqual(results["results"], [{"id": "a"}])
+        self.assertEqual(row, {"id": "a"})
+        self.assertEqual(deleted, {"deleted": False})
+        self.assertEqual(execute_query_async.await_args_list[0].args, ("123456789", "select", {
+            "where": {"name": {"notIn": ["x"]}}, "order_by": {"age": "desc"}, "orderBy": {"age": "desc"}, "limit": 1000,
+        }))
+        self.assertEqual(execute_query_async.await_args_list[1].args[1:], ("update", {"where": {"id": "a"}, "data": {"age": 3}, "orderBy": None}))
+
+    def test_every_sync_method_has_an_async_variant(self):
+        methods = [name for name in vars(self.table) if not name.startswith("_") and callable(getattr(self.table, name))]
+        for name in methods:
+            if not name.endswith("_async"):
+                self.assertIn(f"{name}_async", methods)
+                self.assertTrue(inspect.iscoroutinefunction(getattr(self.table, f"{name}_async")) or name.startswith("iter_"))
+
+    def test_execute_query_async(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"count": 3})
+
+        http_client.configure(async_transport=httpx.MockTransport(handler))
+        self.addCleanup(http_client.configure)
+        with patch("polyapi.poly_tables.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com")):
+            self.assertEqual(asyncio.run(execute_query_async("t", "count", {})), {"count": 3})
+
+
+class TestColumnar(unittest.TestCase):
+    COLUMN_TYPES = {"id": "string", "age": "integer", "score": "number", "active": "boolean", "tags": "object"}
+    ROWS = [
+        {"id": "a", "age": 1, "score": 0.5, "active": True, "tags": ["x"]},
+        {"id": "b", "age": None, "score": None, "active": False, "tags": None},
+    ]
+
+    def test_column_types_come_from_the_schema(self):
+        source = f"{TABI_MODULE_IMPORTS}\n\n\n{_render_table(TABLE_SPEC_SIMPLE)}"
+        scope = {}
+        exec(source, scope)
+        self.assertEqual(scope["MyTable"].column_types["age"], "integer")
+        self.assertEqual(scope["MyTable"].column_types["optional"], "object")
+        self.assertEqual(_column_kind({"type": ["string", "null"]}), "string")
+        self.assertEqual(_column_kind({"type": ["string", "integer"]}), "object")
+
+    def test_generated_select_many_format(self):
+        scope = {}
+        exec(f"{TABI_MODULE_IMPORTS}\n\n\n{_render_table(TABLE_SPEC_SIMPLE)}", scope)
+        rows = [{"id": "a", "name": "n", "age": 3}]
+        with patch.dict(scope, {"execute_query": Mock(return_value={"results": rows, "pagination": None})}):
+            self.assertEqual(scope["MyTable"].select_many(limit=1)["results"], rows)
+            columns = scope["MyTable"].select_many({"limit": 1}, format="columns")
+            with self.assertRaises(ValueError):
+                scope["MyTable"].select_many(limit=1, format="csv")
+        self.assertEqual(columns["age"], [3])
+        self.assertEqual(columns["active"], [None])
+
+    def test_generated_select_projection(self):
+        scope = {}
+        exec(f"{TABI_MODULE_IMPORTS}\n\n\n{_render_table(TABLE_SPEC_SIMPLE)}", scope)
+        execute_query = Mock(return_value={"results": [{"name": "n", "age": 3}], "pagination": None})
+        with patch.dict(scope, {"execute_query": execute_query}):
+            columns = scope["MyTable"].select_many(select=["name", "age"], limit=1, format="columns")
+            scope["MyTable"].select_one({"select": ["name"], "where": {"age": 3}})
+        self.assertEqual(columns, {"name": ["n"], "age": [3]})
+        self.assertEqual(execute_query.call_args_list[0].args[2]["select"], ["name", "age"])
+        self.assertEqual(execute_query.call_args_list[1].args[2]["select"], ["name"])
+
+    def test_errors_raise(self):
+        with self.assertRaises(PolyApiException):
+            columnar_results({"error": "boom", "message": "boom"}, "columns", self.COLUMN_TYPES)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy not installed")
+    def test_numpy(self):
+        import numpy as np
+
+        columns = to_numpy(self.ROWS, self.COLUMN_TYPES)
+        self.assertEqual(columns["age"].dtype, np.float64)
+        self.assertTrue(np.isnan(columns["age"][1]))
+        self.assertEqual(columns["active"].dtype, np.bool_)
+        self.assertEqual(columns["tags"][0], ["x"])
+        self.assertEqual(to_numpy(self.ROWS[:1], self.COLUMN_TYPES)["age"].dtype, np.int64)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_arrow(self):
+        import pyarrow as pa
+
+        table = to_arrow(self.ROWS, self.COLUMN_TYPES)
+        self.assertEqual(table.schema.field("age").type, pa.int64())
+        self.assertEqual(table.column("age").to_pylist(), [1, None])
+        self.assertEqual(table.column("tags").to_pylist(), [["x"], None])
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from polyapi.config import ExecutionContext
+from polyapi.variable_events import NAMESPACE, VariableChangeSubscriber
+
+
+class FakeSocket:
+    """ the parts of socketio.AsyncClient the subscriber uses """
+
+    instances = []
+
+    def __init__(self):
+        self.handlers = {}
+        self.emitted = []
+        self.connects = 0
+        FakeSocket.instances.append(self)
+
+    def on(self, event, handler, namespace=None):
+        assert namespace == NAMESPACE
+        self.handlers[event] = handler
+
+    async def connect(self, url, transports=None, namespaces=None):
+        self.url = url
+        self.connects += 1
+        if "connect" in self.handlers:
+            await self.handlers["connect"]()
+
+    async def emit(self, event, data, namespace=None):
+        self.emitted.append((event, data))
+
+    async def disconnect(self):
+        pass
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+_CONTEXT_PATCH = patch("polyapi.variable_events.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com"))
+
+
+class TestVariableChangeSubscriber:
+
+    def setup_method(self):
+        FakeSocket.instances = []
+        self.changed = []
+        self.disconnects = 0
+
+        def on_disconnect():
+            self.disconnects += 1
+
+        self.subscriber = VariableChangeSubscriber(self.changed.append, on_disconnect, socket_factory=FakeSocket)
+
+    @_CONTEXT_PATCH
+    def test_one_connection_for_all_variables(self, _):
+        self.subscriber.subscribe("var-1")
+        self.subscriber.subscribe("var-2")
+        self.subscriber.subscribe("var-1")
+        wait_for(lambda: FakeSocket.instances and len(FakeSocket.instances[0].emitted) == 2)
+
+        socket, = FakeSocket.instances
+        assert socket.connects == 1
+        assert socket.url == "https://api.example.com"
+        assert sorted(data["variableId"] for _, data in socket.emitted) == ["var-1", "var-2"]
+        assert all(event == "registerVariableChangeEventHandler" and data["apiKey"] == "fake-key" for event, data in socket.emitted)
+
+        socket.handlers["handleVariableChangeEvent:var-2"]({"id": "var-2"})
+        assert self.changed == ["var-2"]
+
+    @_CONTEXT_PATCH
+    def test_reregisters_after_reconnect(self, _):
+        self.subscriber.subscribe("var-1")
+        wait_for(lambda: FakeSocket.instances and FakeSocket.instances[0].emitted)
+        socket = FakeSocket.instances[0]
+
+        socket.handlers["disconnect"]()
+        assert self.disconnects == 1
+        asyncio.run(socket.handlers["connect"]())
+        assert [data["variableId"] for _, data in socket.emitted] == ["var-1", "var-1"]
+
+    def test_failed_connection_is_retried_on_next_subscribe(self):
+        with patch("polyapi.variable_events.get_execution_context", side_effect=RuntimeError("offline")):
+            self.subscriber.subscribe("var-1")
+            wait_for(lambda: not self.subscriber.variables)
+        with _CONTEXT_PATCH:
+            self.subscriber.subscribe("var-1")
+            wait_for(lambda: FakeSocket.instances[-1].emitted)
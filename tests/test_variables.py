@@ -1,5 +1,14 @@
+import asyncio
+import sys
+import types
 import unittest
-from polyapi.variables import render_variable
+from unittest.mock import patch
+
+import httpx
+
+from polyapi import http_client
+from polyapi.config import ExecutionContext
+from polyapi.variables import VARI_CODE_IMPORTS, get_many, get_many_async, render_variable
 
 EXAMPLE = {
         "type": "serverVariable",
@@ -25,4 +34,43 @@ EXAMPLE = {
 class T(unittest.TestCase):
     def test_render_variable(self):
         variable_str = render_variable(EXAMPLE)
-        self.assertIn("class test", variable_str)
\ No newline at end of file
+        self.assertIn("class test", variable_str)
+
+
+def _context_module(name: str, code: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    sys.modules[name] = module
+    exec(code, module.__dict__)
+    return module
+
+
+class TestGetMany(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return httpx.Response(200, text=request.url.path.split("/")[2].upper())
+
+        http_client.configure(transport=httpx.MockTransport(handler), async_transport=httpx.MockTransport(handler))
+        context = patch("polyapi.execute.get_execution_context", return_value=ExecutionContext("fake-key", "https://api.example.com"))
+        context.start()
+        self.addCleanup(context.stop)
+        self.addCleanup(http_client.configure)
+
+    def test_get_many(self):
+        self.assertEqual(get_many(["a", "b", "a"]), {"a": "A", "b": "B"})
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(asyncio.run(get_many_async(["c"])), {"c": "C"})
+
+    def test_generated_prefetch(self):
+        variable = "class {name}:\n    variable_id = '{id}'\n\n    @staticmethod\n    def get():\n        pass\n"
+        try:
+            sub = _context_module("vari_test.ctx.sub", VARI_CODE_IMPORTS + variable.format(name="port", id="port-id"))
+            ctx = _context_module("vari_test.ctx", VARI_CODE_IMPORTS + variable.format(name="host", id="host-id") + "class secret:\n    variable_id = 'secret-id'\n")
+            ctx.sub = sub
+            self.assertEqual(ctx.prefetch(), {"host-id": "HOST-ID", "port-id": "PORT-ID"})
+            self.assertEqual(asyncio.run(ctx.prefetch_async(recursive=False)), {"host-id": "HOST-ID"})
+        finally:
+            sys.modules.pop("vari_test.ctx", None)
+            sys.modules.pop("vari_test.ctx.sub", None)